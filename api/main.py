@@ -10,7 +10,7 @@ from dotenv import load_dotenv
 # Load .env file before any other imports
 load_dotenv(Path(__file__).parent.parent / ".env")
 
-from fastapi import FastAPI  # noqa: E402
+from fastapi import FastAPI, Response  # noqa: E402
 from fastapi.middleware.cors import CORSMiddleware  # noqa: E402
 from fastapi.responses import FileResponse  # noqa: E402
 from fastapi.staticfiles import StaticFiles  # noqa: E402
@@ -184,6 +184,9 @@ async def startup():
                 _seed_data_if_empty()
             except Exception as seed_err:
                 logger.warning(f"Seed data skipped (will retry on next restart): {seed_err}")
+            # Start reloading uploaded sources now rather than on the first query
+            from .services.duckdb_service import get_duckdb_service
+            get_duckdb_service()
             logger.info("Startup complete.")
             return
         except Exception as e:
@@ -217,6 +220,17 @@ async def health():
     return {"status": "healthy"}
 
 
+@app.get("/ready")
+async def ready(response: Response):
+    """Readiness check: 503 until sources behind published dashboards and
+    recently queried sources have been reloaded after startup."""
+    from .services.duckdb_service import get_duckdb_service
+    status = get_duckdb_service().reload_status()
+    if not status["ready"]:
+        response.status_code = 503
+    return status
+
+
 @app.get("/api/providers")
 async def list_providers():
     """List available LLM providers."""
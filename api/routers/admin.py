@@ -6,6 +6,9 @@ from fastapi import APIRouter, Depends, HTTPException, Request
 from pydantic import BaseModel
 
 from api.auth_simple import get_current_user
+from api.services.duckdb_service import get_duckdb_service
+from api.services.query_executor import get_query_executor, run_blocking
+from api.services.query_registry import get_query_registry
 from api.services.metadata_db import (
     list_all_users, update_user_role, update_user_status, delete_user,
     create_invite, list_invites, delete_invite,
@@ -144,3 +147,44 @@ async def update_settings(
         if key in ADMIN_SETTING_KEYS:
             set_admin_setting(key, str(value))
     return {key: get_admin_setting(key) for key in ADMIN_SETTING_KEYS}
+
+
+# ── Query Engine ─────────────────────────────────────────────────────────────
+
+@router.get("/query-executor")
+async def get_query_executor_metrics(user: dict = Depends(require_admin)):
+    """Query executor pool size, queue depth, and wait-time metrics."""
+    return get_query_executor().metrics()
+
+
+@router.get("/result-cache")
+async def get_result_cache_metrics(user: dict = Depends(require_admin)):
+    """Query result cache hit/miss counts, entries, and memory use."""
+    return get_duckdb_service().result_cache_metrics()
+
+
+@router.get("/query-coalescing")
+async def get_query_coalescing_metrics(user: dict = Depends(require_admin)):
+    """How many identical concurrent queries shared one execution instead of running again."""
+    return get_duckdb_service().coalescing_metrics()
+
+
+@router.get("/queries")
+async def list_running_queries(user: dict = Depends(require_admin)):
+    """In-flight DuckDB queries with their class, owner, elapsed time and deadline."""
+    registry = get_query_registry()
+    return {"queries": registry.list(), **registry.metrics()}
+
+
+@router.delete("/queries/{query_id}")
+async def cancel_query(query_id: str, user: dict = Depends(require_admin)):
+    """Interrupt a running DuckDB query."""
+    if not get_query_registry().cancel(query_id):
+        raise HTTPException(status_code=404, detail="Query not found")
+    return {"cancelled": True}
+
+
+@router.get("/duckdb-memory")
+async def get_duckdb_memory(user: dict = Depends(require_admin)):
+    """DuckDB memory settings, current usage, spill files, and estimated size per table."""
+    return await run_blocking(get_duckdb_service().memory_usage)
@@ -9,15 +9,19 @@ import csv
 import io
 import traceback
 from pathlib import Path
+from typing import Literal
 
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel, Field
 
 from ..auth_simple import get_current_user
-from ..services.duckdb_service import get_duckdb_service, q
+from ..services.duckdb_service import q
+from ..services import query_executor
+from ..services.query_registry import QueryCancelledError
+from ..services.etags import etag_matches, strong_etag
 from ..services.chart_storage import save_chart, load_chart, list_charts, delete_chart, update_chart, _validate_id
 
 from engine.v2.schema_analyzer import DataProfile, ColumnProfile
@@ -164,6 +168,7 @@ class ChartDataResponse(BaseModel):
     chart: SavedChartResponse
     data: list[dict]
     columns: list[str]
+    column_data: list[list] | None = None  # format=columnar: one list per column, data left empty
 
 
 class UpdateChartRequest(BaseModel):
@@ -267,11 +272,9 @@ async def build_query(request: BuildQueryRequest, user: dict = Depends(get_curre
             error=f"Invalid time grain: {request.time_grain}. Must be one of {VALID_TIME_GRAINS}",
         )
 
-    db = get_duckdb_service()
-
     # Validate source exists and columns are valid
     try:
-        schema = db.get_schema(request.source_id)
+        schema = await query_executor.get_schema(request.source_id)
     except Exception as e:
         return BuildQueryResponse(success=False, error=f"Source not found: {e}")
 
@@ -407,7 +410,7 @@ async def build_query(request: BuildQueryRequest, user: dict = Depends(get_curre
 
     # Execute
     try:
-        result = db.execute_query(sql, request.source_id)
+        result = await query_executor.execute_query(sql, request.source_id, user=user)
         return BuildQueryResponse(
             success=True,
             sql=_format_sql(sql),
@@ -428,11 +431,9 @@ async def propose(request: ProposeRequest, user: dict = Depends(get_current_user
     2. Sends schema to LLM → gets chart type, SQL, title
     3. Executes SQL → returns chart config + data
     """
-    db = get_duckdb_service()
-
     # Get schema profile
     try:
-        schema = db.get_schema(request.source_id)
+        schema = await query_executor.get_schema(request.source_id)
     except Exception as e:
         raise HTTPException(status_code=404, detail=f"Source not found: {e}")
 
@@ -477,7 +478,9 @@ async def propose(request: ProposeRequest, user: dict = Depends(get_current_user
         if not first_kw or first_kw.group(1).upper() not in ("SELECT", "WITH"):
             return ProposeResponse(success=False, error="AI generated non-SELECT SQL")
         try:
-            result = db.execute_query(proposal.sql, request.source_id)
+            result = await query_executor.execute_query(
+                proposal.sql, request.source_id, query_class="ai", user=user
+            )
             data = result.rows
             columns = result.columns
         except Exception as e:
@@ -572,33 +575,54 @@ async def list_all(status: str = Query("active", pattern="^(active|archived|all)
 
 
 @router.get("/{chart_id}", response_model=ChartDataResponse)
-async def get_chart(chart_id: str):
-    """Get a saved chart with its data (re-executes SQL)."""
+async def get_chart(chart_id: str, request: Request, response: Response, format: Literal["rows", "columnar"] = "rows"):
+    """Get a saved chart with its data (re-executes SQL).
+
+    ``format=columnar`` returns the data as ``column_data`` (one list per
+    column) instead of row objects, which is much cheaper for large results.
+    The response carries an ETag; a matching ``If-None-Match`` gets a 304
+    without running the SQL.
+    """
     chart = load_chart(chart_id)
     if not chart:
         raise HTTPException(status_code=404, detail="Chart not found")
 
-    db = get_duckdb_service()
+    chart_response = _chart_to_response(chart)
+    etag = None
+    version = await query_executor.data_version(chart.sql, chart.source_id) if chart.sql else ()
+    if version is not None:
+        etag = strong_etag("chart", chart_response, format, version)
+        if etag_matches(request, etag):
+            return Response(status_code=304, headers={"ETag": etag})
 
     data = []
     columns = []
+    column_data = None
     if chart.sql:
         try:
-            result = db.execute_query(chart.sql, chart.source_id)
-            data = result.rows
+            result = await query_executor.execute_query(chart.sql, chart.source_id, request=request)
             columns = result.columns
+            if format == "columnar":
+                column_data = result.column_data
+            else:
+                data = result.rows
+        except QueryCancelledError as e:
+            raise HTTPException(status_code=408, detail=str(e))
         except Exception as e:
             raise HTTPException(status_code=422, detail=f"Failed to execute chart SQL: {e}")
 
+    if etag:
+        response.headers["ETag"] = etag
     return ChartDataResponse(
-        chart=_chart_to_response(chart),
+        chart=chart_response,
         data=data,
         columns=columns,
+        column_data=column_data,
     )
 
 
 @router.get("/{chart_id}/data.csv")
-async def download_csv(chart_id: str):
+async def download_csv(chart_id: str, request: Request):
     """Download the chart's underlying data as a CSV file.
 
     Re-executes the chart's SQL query and streams the result as CSV.
@@ -615,9 +639,10 @@ async def download_csv(chart_id: str):
     if not chart.sql:
         raise HTTPException(status_code=422, detail="Chart has no SQL query")
 
-    db = get_duckdb_service()
     try:
-        result = db.execute_query(chart.sql, chart.source_id)
+        result = await query_executor.execute_query(chart.sql, chart.source_id, request=request)
+    except QueryCancelledError as e:
+        raise HTTPException(status_code=408, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=422, detail=f"Failed to execute chart SQL: {e}")
 
@@ -748,14 +773,19 @@ async def restore_chart(chart_id: str, user: dict = Depends(get_current_user)):
 
 
 @router.get("/{chart_id}/public", response_model=SavedChartResponse)
-async def get_public_chart(chart_id: str):
+async def get_public_chart(chart_id: str, request: Request, response: Response):
     """Get a published chart (no auth required). Returns 403 for drafts."""
     chart = load_chart(chart_id)
     if not chart:
         raise HTTPException(status_code=404, detail="Chart not found")
     if chart.status != "published":
         raise HTTPException(status_code=403, detail="Chart is not published")
-    return _chart_to_response(chart)
+    chart_response = _chart_to_response(chart)
+    etag = strong_etag("public-chart", chart_response)
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return chart_response
 
 
 # ── Snapshot (static PNG fallback) ────────────────────────────────────────
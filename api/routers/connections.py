@@ -30,6 +30,7 @@ from ..services.credential_store import (
     delete_credentials,
 )
 from ..services.duckdb_service import get_duckdb_service
+from ..services import query_executor
 
 
 router = APIRouter(prefix="/connections", tags=["connections"])
@@ -432,27 +433,7 @@ async def sync_tables(connection_id: str, request: SyncRequest, user: dict = Dep
             detail=f"Sync failed: {e}",
         )
 
-    # Persist each synced table as CSV in uploads/ so it survives server restarts
-    # (connectors write to parquet/memory; this converts to the standard CSV path).
-    for r in sync_results:
-        sid = r["source_id"]
-        table_name = f"src_{sid}"
-        csv_filename = f"{r['filename']}.csv" if not r["filename"].endswith(".csv") else r["filename"]
-        try:
-            import io as _io
-            import csv as _csv
-            rows = db._conn.execute(f"SELECT * FROM {table_name}").fetchall()
-            cols = [desc[0] for desc in db._conn.execute(f"SELECT * FROM {table_name} LIMIT 0").description]
-            buf = _io.StringIO()
-            writer = _csv.writer(buf)
-            writer.writerow(cols)
-            for row in rows:
-                writer.writerow(row)
-            storage_key = f"uploads/{sid}/{csv_filename}"
-            db._storage.write(storage_key, buf.getvalue().encode("utf-8"))
-        except Exception as e:
-            print(f"[sync] Warning: failed to persist synced table {sid} as CSV: {e}")
-
+    # Synced tables are persisted by ingest_parquet as uploads/<id>/<table>.parquet
     return SyncResponse(
         sources=[
             SyncedSource(
@@ -658,8 +639,7 @@ async def sync_query_result(connection_id: str, request: QuerySyncRequest, user:
         raise HTTPException(status_code=400, detail="Query returned no data")
 
     # Write results to a persistent CSV via ingest_csv so the source is stored
-    # in uploads/ and automatically reloaded after server restarts — same
-    # pattern as query_as_source() in data.py.
+    # in uploads/ and automatically reloaded after server restarts.
     import csv as _csv
     import io as _io
 
@@ -681,20 +661,9 @@ async def sync_query_result(connection_id: str, request: QuerySyncRequest, user:
         tmp_path.write_bytes(csv_bytes)
         db = get_duckdb_service()
 
-        # Replace existing source with same filename rather than creating a duplicate.
-        existing_id = db.find_source_by_filename(safe_hint)
-        reuse_id: str | None = None
-        if existing_id:
-            table_name = f"src_{existing_id}"
-            with db._lock:
-                try:
-                    db._conn.execute(f"DROP TABLE IF EXISTS {table_name}")
-                except Exception:
-                    pass
-                db._sources.pop(existing_id, None)
-            from api.services.storage import get_storage as _get_storage
-            _get_storage().delete_tree(f"uploads/{existing_id}")
-            reuse_id = existing_id
+        # Replace existing source with same filename rather than creating a duplicate;
+        # its table keeps serving until the new one is swapped in.
+        reuse_id = await query_executor.find_source_by_filename(safe_hint)
 
         schema = db.ingest_csv(tmp_path, safe_hint, source_id=reuse_id)
     except Exception as e:
@@ -5,24 +5,30 @@ A dashboard is an ordered collection of chart references rendered in a grid.
 
 from __future__ import annotations
 
+import asyncio
 import difflib
+import os
 import re
 import threading
 import traceback
 from datetime import datetime, timezone
+from typing import Literal
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from pydantic import BaseModel, Field
 
 from ..auth_simple import get_current_user
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, StreamingResponse
+from pydantic_core import to_json
 
 from ..services.dashboard_storage import (
     save_dashboard, load_dashboard, list_dashboards,
-    update_dashboard, delete_dashboard,
+    update_dashboard, delete_dashboard, chart_filter_names,
 )
 from ..services.chart_storage import load_chart
 from ..services.duckdb_service import get_duckdb_service
+from ..services import query_executor
+from ..services.etags import etag_matches, strong_etag
 from ..services.static_export import export_dashboard_html
 from ..services.metadata_db import (
     get_dashboard_meta, set_dashboard_meta, update_dashboard_visibility,
@@ -75,6 +81,13 @@ class FilterQueryRequest(BaseModel):
     params: dict[str, str | int | float] = {}
 
 
+class DashboardRefreshRequest(BaseModel):
+    """Current filter values and the ``data_hash`` the client holds for each chart."""
+    filters: dict[str, str | int | float] = {}
+    known: dict[str, str] = Field(default_factory=dict, description="chart_id -> data_hash from an earlier response")
+    format: Literal["rows", "columnar"] = "rows"
+
+
 class DashboardResponse(BaseModel):
     id: str
     title: str
@@ -101,6 +114,7 @@ class ChartWithData(BaseModel):
     config: dict | None
     data: list[dict]
     columns: list[str]
+    column_data: list[list] | None = None  # format=columnar: one list per column, data left empty
     error: str | None = None
     # 11.2: Data freshness
     data_ingested_at: str | None = None
@@ -113,6 +127,9 @@ class ChartWithData(BaseModel):
     health_issues: list[str] = []
     # Grid layout position
     layout: dict | None = None
+    # Fingerprint of the chart's inputs (config, SQL, its filters, source versions);
+    # send back to POST /{id}/refresh. None when the data cannot be fingerprinted.
+    data_hash: str | None = None
 
 
 class DashboardWithDataResponse(BaseModel):
@@ -126,6 +143,12 @@ class DashboardWithDataResponse(BaseModel):
     has_stale_data: bool = False
 
 
+class DashboardRefreshResponse(BaseModel):
+    id: str
+    charts: list[ChartWithData]  # only charts whose data_hash changed (or cannot be computed)
+    unchanged: list[str]  # chart_ids the client already has current data for
+
+
 class ChartHealthResult(BaseModel):
     chart_id: str
     health_status: str
@@ -154,6 +177,19 @@ def _compute_freshness(ingested_at: datetime | None) -> str | None:
         return "stale"
 
 
+def _source_freshness(source_id: str) -> tuple[str | None, str | None]:
+    """Return (data_ingested_at, freshness) for a chart's source.
+
+    Blocking: may wait for the source to finish its startup reload.
+    """
+    db = get_duckdb_service()
+    # CSV uploads are static data, never stale
+    is_csv = db.is_csv_source(source_id)
+    ingested_at = db.get_ingested_at(source_id)
+    freshness = "fresh" if is_csv else _compute_freshness(ingested_at)
+    return (ingested_at.isoformat() if ingested_at else None), freshness
+
+
 _SCHEMA_CHANGE_PATTERNS = [
     re.compile(r'does not have a column with name "([^"]+)"', re.IGNORECASE),
     re.compile(r'Referenced column "([^"]+)" not found', re.IGNORECASE),
@@ -290,113 +326,281 @@ async def list_all():
     return [_dashboard_to_response(d) for d in dashboards]
 
 
+def _chart_concurrency() -> int:
+    """Read DASHBOARD_CHART_CONCURRENCY (default 8): charts of one dashboard loaded at once."""
+    raw = os.environ.get("DASHBOARD_CHART_CONCURRENCY", "").strip()
+    try:
+        value = int(raw) if raw else 8
+    except ValueError:
+        value = 8
+    return max(1, value)
+
+
+def _chart_config(ref: dict, chart) -> dict:
+    """Layout and display fields of one dashboard chart (``chart`` None if it no longer exists)."""
+    chart_id = ref.get("chart_id", "")
+    if not chart:
+        return dict(
+            chart_id=chart_id,
+            width=ref.get("width", "half"),
+            chart_type="BarChart",
+            title=None, subtitle=None, source=None,
+            x=None, y=None, series=None,
+            horizontal=False, sort=True, config=None,
+            layout=ref.get("layout"),
+        )
+    return dict(
+        chart_id=chart.id,
+        width=ref.get("width", "half"),
+        chart_type=chart.chart_type,
+        title=chart.title,
+        subtitle=chart.subtitle,
+        source=chart.source,
+        x=chart.x,
+        y=chart.y,
+        series=chart.series,
+        horizontal=chart.horizontal,
+        sort=chart.sort,
+        config=chart.config,
+        layout=ref.get("layout"),
+    )
+
+
+async def _run_chart(
+    ref: dict,
+    chart,
+    params: dict[str, str | int | float],
+    format: str,
+    request: Request | None,
+    freshness: tuple[str | None, str | None],
+    data_hash: str | None = None,
+) -> ChartWithData:
+    """Run one dashboard chart's SQL and attach its data, freshness and health.
+
+    ``params`` are the filter values the chart references (see _chart_params),
+    so its result cache and single-flight keys ignore unrelated filters.
+    ``freshness`` comes from _chart_freshness and ``data_hash`` (from
+    _chart_hash) is echoed back unless the chart errors.
+    """
+    if not chart:
+        chart_id = ref.get("chart_id", "")
+        return ChartWithData(
+            **_chart_config(ref, None),
+            data=[], columns=[],
+            error=f"Chart {chart_id} not found",
+            error_type="chart_not_found",
+            health_status="error",
+            health_issues=[f"Chart {chart_id} not found"],
+        )
+
+    data: list[dict] = []
+    columns: list[str] = []
+    column_data: list[list] | None = None
+    row_count = 0
+    error: str | None = None
+    error_type: str | None = None
+    error_suggestion: str | None = None
+
+    if chart.sql:
+        try:
+            result = await query_executor.execute_query(
+                chart.sql, chart.source_id, params=params or None, request=request
+            )
+            columns = result.columns
+            row_count = result.row_count
+            if format == "columnar":
+                column_data = result.column_data
+            else:
+                data = result.rows
+        except Exception as e:
+            traceback.print_exc()
+            error, error_type, error_suggestion = await query_executor.run_blocking(
+                _classify_sql_error, str(e), chart.source_id
+            )
+
+    ingested_at_iso, freshness_bucket = freshness
+
+    # Health
+    health_status, health_issues = _compute_health_status(
+        error, error_type, freshness_bucket, row_count
+    )
+
+    return ChartWithData(
+        **_chart_config(ref, chart),
+        data=data,
+        columns=columns,
+        column_data=column_data,
+        error=error,
+        data_ingested_at=ingested_at_iso,
+        freshness=freshness_bucket,
+        error_type=error_type,
+        error_suggestion=error_suggestion,
+        health_status=health_status,
+        health_issues=health_issues,
+        data_hash=None if error else data_hash,
+    )
+
+
+def _parse_filters(filters: str | None) -> dict[str, str | int | float]:
+    """Parse the JSON-encoded ``filters`` query parameter ({name: value})."""
+    import json as _json
+    if not filters:
+        return {}
+    try:
+        parsed = _json.loads(filters)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="filters must be valid JSON")
+    if not isinstance(parsed, dict):
+        raise HTTPException(status_code=400, detail="filters must be a JSON object")
+    return parsed
+
+
+def _chart_params(dashboard, chart, filter_params: dict[str, str | int | float]) -> dict[str, str | int | float]:
+    """The subset of ``filter_params`` that ``chart`` references (via the dashboard's filter index)."""
+    if not chart or not filter_params:
+        return {}
+    names = chart_filter_names(dashboard, chart)
+    return {name: value for name, value in filter_params.items() if name in names}
+
+
+async def _chart_freshness(chart) -> tuple[str | None, str | None]:
+    """(data_ingested_at, freshness) of a chart's source; (None, None) for missing charts."""
+    if not chart:
+        return None, None
+    return await query_executor.run_blocking(_source_freshness, chart.source_id)
+
+
+async def _chart_hash(
+    chart,
+    params: dict[str, str | int | float],
+    format: str,
+    freshness: tuple[str | None, str | None],
+) -> str | None:
+    """Fingerprint of the data a chart would return, computed without running its SQL.
+
+    Covers the chart's config and SQL, ``params`` (only the filters it
+    references, see _chart_params), ``format``, the version of every source
+    it reads and ``freshness`` (from _chart_freshness), which is returned
+    with the data. None for missing charts and for data that cannot be
+    fingerprinted (see DuckDBService.data_version).
+    """
+    if not chart:
+        return None
+    version = await query_executor.data_version(chart.sql, chart.source_id) if chart.sql else ()
+    if version is None:
+        return None
+    return strong_etag("chart-data", chart, params, format, version, freshness)
+
+
+async def _load_charts(refs: list[dict], slots: asyncio.Semaphore) -> list:
+    """Load the saved charts behind dashboard refs (None where a chart is missing), in order."""
+    async def load(ref: dict):
+        async with slots:
+            return await asyncio.to_thread(load_chart, ref.get("chart_id", ""))
+
+    return list(await asyncio.gather(*(load(ref) for ref in refs)))
+
+
+async def _dashboard_stream(
+    dashboard,
+    filter_params: dict[str, str | int | float],
+    format: str,
+    request: Request | None,
+):
+    """Yield a dashboard as NDJSON: the layout and chart configs, then each chart as its query finishes."""
+    slots = asyncio.Semaphore(_chart_concurrency())
+
+    charts = await _load_charts(dashboard.charts, slots)
+    yield to_json({
+        "type": "dashboard",
+        "id": dashboard.id,
+        "title": dashboard.title,
+        "description": dashboard.description,
+        "filters": dashboard.filters or [],
+        "created_at": dashboard.created_at,
+        "updated_at": dashboard.updated_at,
+        "charts": [
+            {"index": i, **_chart_config(ref, chart)}
+            for i, (ref, chart) in enumerate(zip(dashboard.charts, charts))
+        ],
+    }) + b"\n"
+
+    async def run(index: int, ref: dict, chart) -> tuple[int, ChartWithData]:
+        async with slots:
+            params = _chart_params(dashboard, chart, filter_params)
+            freshness = await _chart_freshness(chart)
+            data_hash = await _chart_hash(chart, params, format, freshness)
+            return index, await _run_chart(ref, chart, params, format, request, freshness, data_hash)
+
+    tasks = [
+        asyncio.create_task(run(i, ref, chart))
+        for i, (ref, chart) in enumerate(zip(dashboard.charts, charts))
+    ]
+    any_stale = False
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            index, chart_data = await next_done
+            any_stale = any_stale or chart_data.freshness == "stale"
+            yield to_json({"type": "chart", "index": index, "chart": chart_data}) + b"\n"
+    finally:
+        # The client went away: stop queries that have not finished
+        for task in tasks:
+            task.cancel()
+    yield to_json({"type": "done", "has_stale_data": any_stale}) + b"\n"
+
+
 @router.get("/{dashboard_id}", response_model=DashboardWithDataResponse)
-async def get_dashboard(dashboard_id: str, filters: str | None = None):
+async def get_dashboard(
+    dashboard_id: str,
+    filters: str | None = None,
+    format: Literal["rows", "columnar"] = "rows",
+    request: Request = None,
+    response: Response = None,
+):
     """Get a dashboard with all chart data (re-executes SQL for each chart).
 
     Args:
         dashboard_id: The dashboard to load.
         filters: Optional JSON-encoded dict of filter params ({name: value}).
+        format: "columnar" returns each chart's data as ``column_data``
+            (one list per column) instead of row objects.
+
+    The response carries an ETag when every chart loads without error; a
+    matching ``If-None-Match`` gets a 304 without running any SQL.
     """
     dashboard = load_dashboard(dashboard_id)
     if not dashboard:
         raise HTTPException(status_code=404, detail="Dashboard not found")
 
-    # Parse filter params from query string
-    import json as _json
-    filter_params: dict[str, str | int | float] = {}
-    if filters:
-        try:
-            parsed = _json.loads(filters)
-            if not isinstance(parsed, dict):
-                raise HTTPException(status_code=400, detail="filters must be a JSON object")
-            filter_params = parsed
-        except (ValueError, TypeError):
-            raise HTTPException(status_code=400, detail="filters must be valid JSON")
-
-    db = get_duckdb_service()
-    charts_with_data: list[ChartWithData] = []
-    any_stale = False
-
-    for ref in dashboard.charts:
-        chart_id = ref.get("chart_id", "")
-        width = ref.get("width", "half")
-        layout = ref.get("layout")
-
-        chart = load_chart(chart_id)
-        if not chart:
-            charts_with_data.append(ChartWithData(
-                chart_id=chart_id,
-                width=width,
-                chart_type="BarChart",
-                title=None, subtitle=None, source=None,
-                x=None, y=None, series=None,
-                horizontal=False, sort=True, config=None,
-                data=[], columns=[],
-                error=f"Chart {chart_id} not found",
-                error_type="chart_not_found",
-                health_status="error",
-                health_issues=[f"Chart {chart_id} not found"],
-                layout=layout,
-            ))
-            continue
-
-        data: list[dict] = []
-        columns: list[str] = []
-        error: str | None = None
-        error_type: str | None = None
-        error_suggestion: str | None = None
-
-        if chart.sql:
-            try:
-                result = db.execute_query(chart.sql, chart.source_id, params=filter_params or None)
-                data = result.rows
-                columns = result.columns
-            except Exception as e:
-                traceback.print_exc()
-                error, error_type, error_suggestion = _classify_sql_error(
-                    str(e), chart.source_id
-                )
-
-        # Freshness — CSV uploads are static data, never stale
-        ingested_at = db.get_ingested_at(chart.source_id)
-        ingested_at_iso = ingested_at.isoformat() if ingested_at else None
-        is_csv = db.is_csv_source(chart.source_id)
-        freshness = "fresh" if is_csv else _compute_freshness(ingested_at)
-        if freshness == "stale":
-            any_stale = True
-
-        # Health
-        row_count = len(data)
-        health_status, health_issues = _compute_health_status(
-            error, error_type, freshness, row_count
-        )
-
-        charts_with_data.append(ChartWithData(
-            chart_id=chart.id,
-            width=width,
-            chart_type=chart.chart_type,
-            title=chart.title,
-            subtitle=chart.subtitle,
-            source=chart.source,
-            x=chart.x,
-            y=chart.y,
-            series=chart.series,
-            horizontal=chart.horizontal,
-            sort=chart.sort,
-            config=chart.config,
-            data=data,
-            columns=columns,
-            error=error,
-            data_ingested_at=ingested_at_iso,
-            freshness=freshness,
-            error_type=error_type,
-            error_suggestion=error_suggestion,
-            health_status=health_status,
-            health_issues=health_issues,
-            layout=layout,
-        ))
-
+    filter_params = _parse_filters(filters)
+
+    # Load charts concurrently (bounded per dashboard); gather keeps layout order
+    slots = asyncio.Semaphore(_chart_concurrency())
+    charts = await _load_charts(dashboard.charts, slots)
+
+    params = [_chart_params(dashboard, chart, filter_params) for chart in charts]
+    freshness = await asyncio.gather(*(_chart_freshness(c) for c in charts))
+    hashes = await asyncio.gather(*(
+        _chart_hash(c, p, format, f) for c, p, f in zip(charts, params, freshness)
+    ))
+    etag = None
+    if all(h is not None for chart, h in zip(charts, hashes) if chart):
+        etag = strong_etag("dashboard", dashboard, hashes)
+        if etag_matches(request, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+
+    async def run(ref: dict, chart, chart_params: dict, chart_freshness: tuple, data_hash: str | None) -> ChartWithData:
+        async with slots:
+            return await _run_chart(ref, chart, chart_params, format, request, chart_freshness, data_hash)
+
+    charts_with_data = list(await asyncio.gather(*(
+        run(*item) for item in zip(dashboard.charts, charts, params, freshness, hashes)
+    )))
+    any_stale = any(c.freshness == "stale" for c in charts_with_data)
+
+    # Errors may be transient (timeouts, sources still loading): never let a 304 pin one
+    if etag and response is not None and not any(c.error for c in charts_with_data):
+        response.headers["ETag"] = etag
     return DashboardWithDataResponse(
         id=dashboard.id,
         title=dashboard.title,
@@ -409,6 +613,74 @@ async def get_dashboard(dashboard_id: str, filters: str | None = None):
     )
 
 
+@router.get("/{dashboard_id}/stream")
+async def stream_dashboard(
+    dashboard_id: str,
+    filters: str | None = None,
+    format: Literal["rows", "columnar"] = "rows",
+    request: Request = None,
+):
+    """Stream a dashboard as NDJSON so charts can render as soon as their data is ready.
+
+    The first line (``"type": "dashboard"``) carries the layout and every
+    chart's config; then one ``"type": "chart"`` line per chart, in
+    completion order, with its ``index`` in the layout and the same fields
+    as ``GET /{dashboard_id}`` (including errors and health); a final
+    ``"type": "done"`` line carries ``has_stale_data``.
+    """
+    dashboard = load_dashboard(dashboard_id)
+    if not dashboard:
+        raise HTTPException(status_code=404, detail="Dashboard not found")
+    filter_params = _parse_filters(filters)
+    return StreamingResponse(
+        _dashboard_stream(dashboard, filter_params, format, request),
+        media_type="application/x-ndjson",
+    )
+
+
+@router.post("/{dashboard_id}/refresh", response_model=DashboardRefreshResponse)
+async def refresh_dashboard(dashboard_id: str, body: DashboardRefreshRequest, request: Request):
+    """Re-run only the charts whose data may differ from what the client holds.
+
+    The client sends the current filter values and the ``data_hash`` of each
+    chart it has. A chart is re-executed and returned only if its hash has
+    changed: it references a filter whose value changed, a source it reads was
+    refreshed, or the chart itself was edited. Charts that cannot be
+    fingerprinted (volatile SQL, errors) are always returned.
+    """
+    dashboard = load_dashboard(dashboard_id)
+    if not dashboard:
+        raise HTTPException(status_code=404, detail="Dashboard not found")
+
+    slots = asyncio.Semaphore(_chart_concurrency())
+    charts = await _load_charts(dashboard.charts, slots)
+    params = [_chart_params(dashboard, chart, body.filters) for chart in charts]
+    freshness = await asyncio.gather(*(_chart_freshness(c) for c in charts))
+    hashes = await asyncio.gather(*(
+        _chart_hash(c, p, body.format, f) for c, p, f in zip(charts, params, freshness)
+    ))
+
+    unchanged: list[str] = []
+    stale: list[tuple[dict, object, dict, tuple, str | None]] = []
+    for ref, chart, chart_params, chart_freshness, data_hash in zip(dashboard.charts, charts, params, freshness, hashes):
+        chart_id = ref.get("chart_id", "")
+        if data_hash is not None and body.known.get(chart_id) == data_hash:
+            unchanged.append(chart_id)
+        else:
+            stale.append((ref, chart, chart_params, chart_freshness, data_hash))
+
+    async def run(ref: dict, chart, chart_params: dict, chart_freshness: tuple, data_hash: str | None) -> ChartWithData:
+        async with slots:
+            return await _run_chart(ref, chart, chart_params, body.format, request, chart_freshness, data_hash)
+
+    changed = list(await asyncio.gather(*(run(*item) for item in stale)))
+    return DashboardRefreshResponse(
+        id=dashboard.id,
+        charts=changed,
+        unchanged=unchanged,
+    )
+
+
 @router.post("/{dashboard_id}/health-check", response_model=HealthCheckResponse)
 async def run_health_check(dashboard_id: str, user: dict = Depends(get_current_user)):
     """Run data-level health checks for all charts in a dashboard."""
@@ -543,8 +815,25 @@ async def remove_dashboard(dashboard_id: str, user: dict = Depends(get_current_u
 # ── Publish / Unpublish ──────────────────────────────────────────────────────
 
 @router.get("/{dashboard_id}/public", response_model=DashboardWithDataResponse)
-async def get_public_dashboard(dashboard_id: str):
+async def get_public_dashboard(dashboard_id: str, request: Request, response: Response):
     """Get a public dashboard (no auth). Returns 403 for non-public dashboards."""
+    _load_public_dashboard(dashboard_id)
+    # Reuse get_dashboard logic to load chart data (and answer If-None-Match)
+    return await get_dashboard(dashboard_id, request=request, response=response)
+
+
+@router.get("/{dashboard_id}/public/stream")
+async def stream_public_dashboard(dashboard_id: str, request: Request):
+    """Stream a public dashboard as NDJSON (no auth); see stream_dashboard for the format."""
+    dashboard = _load_public_dashboard(dashboard_id)
+    return StreamingResponse(
+        _dashboard_stream(dashboard, {}, "rows", request),
+        media_type="application/x-ndjson",
+    )
+
+
+def _load_public_dashboard(dashboard_id: str):
+    """Load a dashboard, raising 404 if missing and 403 if it is not public."""
     dashboard = load_dashboard(dashboard_id)
     if not dashboard:
         raise HTTPException(status_code=404, detail="Dashboard not found")
@@ -553,8 +842,7 @@ async def get_public_dashboard(dashboard_id: str):
     is_public = (meta and meta["visibility"] == "public") or dashboard.status == "published"
     if not is_public:
         raise HTTPException(status_code=403, detail="Dashboard is not public")
-    # Reuse get_dashboard logic to load chart data
-    return await get_dashboard(dashboard_id)
+    return dashboard
 
 
 @router.put("/{dashboard_id}/publish", response_model=DashboardResponse)
@@ -2,16 +2,31 @@
 Data router: CSV upload, schema inspection, and query execution.
 """
 
+import asyncio
+import hashlib
+import os
 import tempfile
+import uuid
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import Awaitable, Callable, Literal
 
-from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException, Response
+import duckdb
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from pydantic import BaseModel, Field
 
+try:
+    from python_multipart.multipart import MultipartParseError, MultipartParser, parse_options_header
+except ImportError:  # python-multipart < 0.0.13
+    from multipart.multipart import MultipartParseError, MultipartParser, parse_options_header
+
 from ..auth_simple import get_current_user
 
-from ..services.duckdb_service import get_duckdb_service, _SAFE_SOURCE_ID_RE
+from ..services.duckdb_service import (
+    QueryResult, SourceSchema, UPLOAD_SUFFIXES, get_duckdb_service, split_upload_name, _SAFE_SOURCE_ID_RE,
+)
+from ..services import query_executor, upload_sessions
+from ..services.query_registry import QueryCancelledError
 from ..services.connectors.google_sheets import parse_sheets_url, build_export_url, fetch_sheet_csv
 from ..services.data_cache import get_cached, set_cached
 from ..services.storage import get_storage
@@ -19,6 +34,39 @@ from ..services.storage import get_storage
 
 router = APIRouter(prefix="/data", tags=["data"])
 
+# Uploads are streamed to storage in chunks of this size
+_UPLOAD_CHUNK_BYTES = 1024 * 1024
+# Form fields sent alongside the file are short flags (e.g. replace=true)
+_UPLOAD_FIELD_MAX_BYTES = 1024
+
+# /upload parses its body itself (see _stream_upload), so describe the form for the docs
+_UPLOAD_FORM_SCHEMA = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["file"],
+                    "properties": {
+                        "file": {"type": "string", "format": "binary"},
+                        "replace": {"type": "string", "description": "\"true\" to replace a source with the same name"},
+                    },
+                },
+            },
+        },
+    },
+}
+
+
+def _max_upload_mb() -> int:
+    """Read UPLOAD_MAX_MB (default 100)."""
+    raw = os.environ.get("UPLOAD_MAX_MB", "").strip()
+    try:
+        return max(1, int(raw)) if raw else 100
+    except ValueError:
+        return 100
+
 
 # ── Response Schemas ─────────────────────────────────────────────────────────
 
@@ -38,11 +86,38 @@ class UploadResponse(BaseModel):
     filename: str = Field(..., examples=["sales_data.csv"], description="Original filename")
     row_count: int = Field(..., examples=[1500], description="Number of rows in the dataset")
     columns: list[ColumnInfoResponse] = Field(..., description="Column schema information")
+    sha256: str | None = Field(None, description="SHA-256 of the uploaded file")
+
+
+class UploadSessionRequest(BaseModel):
+    filename: str = Field(..., examples=["events_2024.csv"], description="CSV filename")
+    size: int = Field(..., gt=0, description="Total file size in bytes")
+    replace: bool = Field(False, description="Replace an existing source with the same filename")
+
+
+class UploadSessionResponse(BaseModel):
+    session_id: str
+    filename: str
+    size: int
+    chunk_size: int = Field(..., description="Bytes per chunk (the last chunk may be shorter)")
+    total_chunks: int
+    received_ranges: list[list[int]] = Field(..., description="Received bytes as [start, end) ranges")
+    received_bytes: int
+    missing_chunks: list[int]
+    state: Literal["open", "finalizing", "complete", "failed"]
+    source_id: str | None = Field(None, description="Ingested source (once complete)")
+    error: str | None = None
+    created_at: str
+    expires_at: str
 
 
 class QueryRequest(BaseModel):
     source_id: str = Field(..., examples=["abc123def456"], description="Source to query against")
     sql: str = Field(..., examples=["SELECT name, revenue FROM {{source}} ORDER BY revenue DESC"], description="SQL query (use {{source}} as table placeholder)")
+    format: Literal["rows", "columnar", "arrow"] = Field(
+        "rows",
+        description="rows: list of row objects; columnar: {columns, data: [[col0...], ...]}; arrow: Arrow IPC stream",
+    )
 
 
 class QueryResponse(BaseModel):
@@ -51,6 +126,12 @@ class QueryResponse(BaseModel):
     row_count: int
 
 
+class ColumnarQueryResponse(BaseModel):
+    columns: list[str]
+    data: list[list]  # one list per column, in `columns` order
+    row_count: int
+
+
 class PreviewResponse(BaseModel):
     columns: list[str]
     rows: list[dict]
@@ -123,9 +204,9 @@ async def list_sources(user: dict = Depends(get_current_user)):
     """List all data sources currently loaded in DuckDB, newest first."""
     service = get_duckdb_service()
     results: list[tuple[datetime, SourceSummary]] = []
-    for source_id in list(service._sources):
+    for source_id in await query_executor.list_source_ids():
         try:
-            schema = service.get_schema(source_id)
+            schema = await query_executor.get_schema(source_id)
             ingested_at = service.get_ingested_at(source_id)
             results.append((
                 ingested_at or datetime.min.replace(tzinfo=timezone.utc),
@@ -146,9 +227,9 @@ async def list_tables(user: dict = Depends(get_current_user)):
     """List all loaded DuckDB tables with their internal names, newest first."""
     service = get_duckdb_service()
     results: list[tuple[datetime, TableInfo]] = []
-    for source_id in list(service._sources):
+    for source_id in await query_executor.list_source_ids():
         try:
-            schema = service.get_schema(source_id)
+            schema = await query_executor.get_schema(source_id)
             ingested_at = service.get_ingested_at(source_id)
             results.append((
                 ingested_at or datetime.min.replace(tzinfo=timezone.utc),
@@ -176,9 +257,9 @@ async def tables_schema(user: dict = Depends(get_current_user)):
     """
     service = get_duckdb_service()
     result: dict[str, list[str]] = {}
-    for source_id in list(service._sources):
+    for source_id in await query_executor.list_source_ids():
         try:
-            schema = service.get_schema(source_id)
+            schema = await query_executor.get_schema(source_id)
             cols = [c.name for c in schema.columns]
             view_name = service.get_view_name(source_id)
             # Use friendly name as primary, src_ as fallback
@@ -194,86 +275,54 @@ async def delete_source(source_id: str, user: dict = Depends(get_current_user)):
     if not _SAFE_SOURCE_ID_RE.match(source_id):
         raise HTTPException(status_code=400, detail="Invalid source_id")
 
-    service = get_duckdb_service()
-
-    if source_id not in service._sources:
+    if not await query_executor.has_source(source_id):
         raise HTTPException(status_code=404, detail="Source not found")
 
     # Drop the friendly view and DuckDB table, remove from in-memory registry
-    service._drop_friendly_view(source_id)
-    table_name = f"src_{source_id}"
-    with service._lock:
-        try:
-            service._conn.execute(f"DROP TABLE IF EXISTS {table_name}")
-        except Exception:
-            pass
-        # Remove inside lock to avoid race with concurrent iterators
-        service._sources.pop(source_id, None)
+    await query_executor.drop_source(source_id)
 
     # Delete upload directory from storage
     storage = get_storage()
-    storage.delete_tree(f"uploads/{source_id}")
+    await query_executor.run_blocking(storage.delete_tree, f"uploads/{source_id}")
 
     return {"deleted": True}
 
 
 @router.post("/sources/{source_id}/query-as-source", response_model=QueryAsSourceResponse)
 async def query_as_source(source_id: str, request: QueryAsSourceRequest, user: dict = Depends(get_current_user)):
-    """Run SQL against a local DuckDB source and materialize the result as a persistent CSV.
+    """Run SQL against a local DuckDB source and materialize the result as a new source.
 
     Used by the "Chart this" flow when the original source is a CSV: the user
-    may have written a WHERE / GROUP BY / JOIN query in the workbench; we run
-    it locally, write the result as a CSV to storage, and ingest it — exactly
-    like a regular upload so the source survives server restarts.
+    may have written a WHERE / GROUP BY / JOIN query in the workbench. The
+    result is built as a table inside DuckDB (keeping its column types) and
+    stored as Parquet, so the source survives server restarts.
     """
-    import csv as _csv
-    import io as _io
-
     if not _SAFE_SOURCE_ID_RE.match(source_id):
         raise HTTPException(status_code=400, detail="Invalid source_id")
 
-    service = get_duckdb_service()
-    if source_id not in service._sources:
+    if not await query_executor.has_source(source_id):
         raise HTTPException(status_code=404, detail="Source not found")
 
+    hint = request.source_name or "query_result"
+    if hint.lower().endswith(".csv"):
+        hint = hint[:-4]
+
     try:
-        query_result = service.execute_query(request.sql, source_id)
+        schema = await query_executor.ingest_query(request.sql, source_id, hint, user=user)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
+    except QueryCancelledError as e:
+        raise HTTPException(status_code=408, detail=str(e))
+    except duckdb.Error as e:
         raise HTTPException(status_code=400, detail=f"Query execution failed: {e}")
-
-    if not query_result.columns or not query_result.rows:
-        raise HTTPException(status_code=400, detail="Query returned no data")
-
-    # Write results to a temp CSV file and ingest via ingest_csv so the source
-    # is stored in uploads/ and automatically reloaded after server restarts.
-    hint = request.source_name or "query_result"
-    safe_hint = hint if hint.lower().endswith(".csv") else f"{hint}.csv"
-
-    buf = _io.StringIO()
-    writer = _csv.DictWriter(buf, fieldnames=query_result.columns)
-    writer.writeheader()
-    writer.writerows(query_result.rows)
-    csv_bytes = buf.getvalue().encode("utf-8")
-
-    tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".csv")
-    tmp_path = Path(tmp.name)
-    tmp.close()
-
-    try:
-        tmp_path.write_bytes(csv_bytes)
-        schema = service.ingest_csv(tmp_path, safe_hint)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create source: {e}")
-    finally:
-        tmp_path.unlink(missing_ok=True)
 
     return QueryAsSourceResponse(source_id=schema.source_id, row_count=schema.row_count)
 
 
 @router.post("/query-raw", response_model=RawQueryResponse)
-async def query_raw(request: RawQueryRequest, user: dict = Depends(get_current_user)):
+async def query_raw(request: RawQueryRequest, http_request: Request, user: dict = Depends(get_current_user)):
     """Execute user-written SQL directly on DuckDB, bypassing table name substitution."""
     service = get_duckdb_service()
 
@@ -299,18 +348,21 @@ async def query_raw(request: RawQueryRequest, user: dict = Depends(get_current_u
     if not _re.search(r'\bLIMIT\s+\d', sql, _re.IGNORECASE):
         sql = sql + " LIMIT 10000"
 
-    try:
-        with service._lock:
-            result = service._conn.execute(sql)
-            if result.description:
-                col_names = [desc[0] for desc in result.description]
-                col_types = [str(desc[1]) for desc in result.description]
-                rows_raw = result.fetchall()
-                rows = [dict(zip(col_names, row)) for row in rows_raw]
-            else:
+    def _run() -> tuple[list[str], list[str], list[dict]]:
+        with service.query_cursor() as cursor:
+            result = cursor.execute(sql)
+            if not result.description:
                 # Non-SELECT statements (INSERT, UPDATE, DELETE) have no description
-                col_names, col_types, rows = [], [], []
+                return [], [], []
+            col_names = [desc[0] for desc in result.description]
+            col_types = [str(desc[1]) for desc in result.description]
+            rows_raw = result.fetchall()
+        return col_names, col_types, [dict(zip(col_names, row)) for row in rows_raw]
 
+    try:
+        col_names, col_types, rows = await query_executor.run_query(
+            _run, sql=sql, query_class="adhoc", user=user, request=http_request
+        )
         return RawQueryResponse(
             success=True,
             columns=col_names,
@@ -322,79 +374,93 @@ async def query_raw(request: RawQueryRequest, user: dict = Depends(get_current_u
         return RawQueryResponse(success=False, error=str(e))
 
 
-@router.post("/upload", response_model=UploadResponse)
-async def upload_csv(file: UploadFile = File(...), replace: str = Form(""), user: dict = Depends(get_current_user)):
-    """Upload a CSV file, load into DuckDB, return schema info.
-
-    If a source with the same filename already exists and ``replace`` is not
-    set, returns 409 with the existing source_id so the frontend can prompt
-    the user before overwriting.
-    """
-    if not file.filename:
-        raise HTTPException(status_code=400, detail="No filename provided")
-
-    if not file.filename.lower().endswith('.csv'):
-        raise HTTPException(status_code=400, detail="Only CSV files are supported")
+@router.post("/upload", response_model=UploadResponse, openapi_extra=_UPLOAD_FORM_SCHEMA)
+async def upload_csv(request: Request, user: dict = Depends(get_current_user)):
+    """Upload a data file, load into DuckDB, return schema info.
 
-    service = get_duckdb_service()
+    Expects ``multipart/form-data`` with a ``file`` part and an optional
+    ``replace`` field. Accepts CSV, gzip/zstd-compressed CSV (``.csv.gz``,
+    ``.csv.zst``), Parquet, JSON and NDJSON. If a source with the same name
+    already exists and ``replace`` is not set, returns 409 with the existing
+    source_id so the frontend can prompt the user before overwriting.
 
-    # Check for existing source with the same filename
-    existing_id = service.find_source_by_filename(file.filename)
-    if existing_id and replace != "true":
-        raise HTTPException(
-            status_code=409,
-            detail={
-                "code": "DUPLICATE_FILENAME",
-                "existing_source_id": existing_id,
-                "filename": file.filename,
-            },
-        )
-
-    # If replacing, delete the old source first
-    if existing_id and replace == "true":
-        table_name = f"src_{existing_id}"
-        with service._lock:
-            try:
-                service._conn.execute(f"DROP TABLE IF EXISTS {table_name}")
-            except Exception:
-                pass
-            service._sources.pop(existing_id, None)
-        storage = get_storage()
-        storage.delete_tree(f"uploads/{existing_id}")
-
-    # Write uploaded file to temp location, then ingest
-    MAX_UPLOAD_BYTES = 100 * 1024 * 1024  # 100 MB
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.csv') as tmp:
-        tmp_path = Path(tmp.name)
-        content = await file.read()
-        if len(content) > MAX_UPLOAD_BYTES:
-            tmp_path.unlink(missing_ok=True)
+    The body is parsed as it arrives and the file is written straight to its
+    staging file (size limit: ``UPLOAD_MAX_MB``, default 100, enforced while
+    streaming); DuckDB then reads it directly. A CSV is staged at its final
+    storage location; other types are read natively and stored as Parquet.
+    """
+    max_mb = _max_upload_mb()
+    storage = get_storage()
+    existing_id: str | None = None
+    source_id: str | None = None
+    staged: Path | None = None
+
+    async def stage(filename: str) -> Path:
+        nonlocal existing_id, source_id, staged
+        stem, suffix = split_upload_name(filename)
+        if suffix is None:
             raise HTTPException(
-                status_code=413,
-                detail="File too large. Maximum upload size is 100 MB.",
+                status_code=400,
+                detail=f"Unsupported file type. Supported: {', '.join(sorted(UPLOAD_SUFFIXES))}",
             )
-        tmp.write(content)
-
-    # Reuse the old source_id when replacing so existing charts keep working
-    reuse_id = existing_id if (existing_id and replace == "true") else None
+        # Check for existing source with the same filename (by stem for non-CSV
+        # files, which are stored as <stem>.parquet). Whether to replace it is
+        # only known once the form has been read, but staging in its directory
+        # is harmless either way.
+        existing_id = await query_executor.find_source_by_filename(filename if suffix == ".csv" else stem)
+        source_id = existing_id or uuid.uuid4().hex[:12]
+        if suffix == ".csv":
+            staged = await query_executor.run_blocking(
+                storage.staging_path, f"uploads/{source_id}/{Path(filename).name}"
+            )
+        else:
+            # Native readers detect compression from the suffix
+            fd, tmp_name = tempfile.mkstemp(suffix=suffix)
+            os.close(fd)
+            staged = Path(tmp_name)
+        return staged
 
     try:
-        schema = service.ingest_csv(tmp_path, file.filename, source_id=reuse_id)
-    except ValueError as e:
-        # User-friendly message from ingest_csv retry logic
-        raise HTTPException(status_code=422, detail=str(e))
-    except Exception:
-        raise HTTPException(
-            status_code=422,
-            detail=f"Could not parse \"{file.filename}\". Check that the file is a valid CSV with a header row.",
-        )
+        try:
+            filename, fields, digest = await _stream_upload(request, max_mb, stage)
+        except BaseException:
+            # Staging a new source's CSV created its directory
+            if source_id and not existing_id:
+                storage.delete_tree(f"uploads/{source_id}")
+            raise
+
+        replace = fields.get("replace", "")
+        if existing_id and replace != "true":
+            raise HTTPException(
+                status_code=409,
+                detail={
+                    "code": "DUPLICATE_FILENAME",
+                    "existing_source_id": existing_id,
+                    "filename": filename,
+                },
+            )
+
+        # Reuse the old source_id when replacing so existing charts keep working;
+        # the old table keeps serving until the new one is swapped in
+        try:
+            schema = await query_executor.ingest_file(staged, filename, source_id=source_id)
+        except ValueError as e:
+            # User-friendly message from ingest_csv / ingest_file
+            raise HTTPException(status_code=422, detail=str(e))
+        except Exception:
+            raise HTTPException(
+                status_code=422,
+                detail=f"Could not parse \"{filename}\". Check that the file is valid and not truncated.",
+            )
     finally:
-        tmp_path.unlink(missing_ok=True)
+        if staged is not None:
+            staged.unlink(missing_ok=True)
 
     return UploadResponse(
         source_id=schema.source_id,
         filename=schema.filename,
         row_count=schema.row_count,
+        sha256=digest,
         columns=[
             ColumnInfoResponse(
                 name=c.name,
@@ -411,6 +477,267 @@ async def upload_csv(file: UploadFile = File(...), replace: str = Form(""), user
     )
 
 
+async def _stream_upload(
+    request: Request, max_mb: int, stage: Callable[[str], Awaitable[Path]],
+) -> tuple[str, dict[str, str], str]:
+    """Parse a ``multipart/form-data`` body as it arrives, writing the file part to disk.
+
+    The ``file`` part goes straight to the path ``stage(filename)`` returns,
+    written off the event loop in chunks of _UPLOAD_CHUNK_BYTES, so the body
+    is never spooled or copied. Raises 413 as soon as the file passes
+    ``max_mb``. Returns (filename, other form fields, SHA-256 hex digest).
+    """
+    content_type, options = parse_options_header(request.headers.get("content-type", ""))
+    boundary = options.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise HTTPException(status_code=400, detail="Expected a multipart/form-data upload")
+
+    # The parser's callbacks only record events; they are acted on between
+    # chunks so staging and writing can be awaited
+    events: list[tuple] = []
+    headers: dict[bytes, bytes] = {}
+    header = [b"", b""]
+
+    def on_header_field(data: bytes, start: int, end: int) -> None:
+        header[0] += data[start:end]
+
+    def on_header_value(data: bytes, start: int, end: int) -> None:
+        header[1] += data[start:end]
+
+    def on_header_end() -> None:
+        headers[header[0].lower()] = header[1]
+        header[0] = header[1] = b""
+
+    def on_headers_finished() -> None:
+        _, disposition = parse_options_header(headers.pop(b"content-disposition", b""))
+        headers.clear()
+        events.append(("part", disposition.get(b"name", b""), disposition.get(b"filename")))
+
+    parser = MultipartParser(boundary, {
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": lambda data, start, end: events.append(("data", data[start:end])),
+        "on_part_end": lambda: events.append(("end",)),
+        "on_end": lambda: events.append(("done",)),
+    })
+
+    limit = max_mb * 1024 * 1024
+    digest = hashlib.sha256()
+    fields: dict[str, bytearray] = {}
+    filename: str | None = None
+    out = None
+    part: str | None = None  # "file", a field name, or None for a part that is ignored
+    buffer = bytearray()
+    size = 0
+    done = False
+
+    async def flush() -> None:
+        await query_executor.run_blocking(_write_upload_chunk, out, digest, bytes(buffer))
+        buffer.clear()
+
+    async def handle() -> None:
+        nonlocal filename, out, part, size, done
+        for event in events:
+            if event[0] == "part":
+                name, part_filename = event[1].decode("utf-8", "replace"), event[2]
+                if name == "file" and part_filename is not None and filename is None:
+                    filename = Path(part_filename.decode("utf-8", "replace")).name
+                    if not filename:
+                        raise HTTPException(status_code=400, detail="No filename provided")
+                    out = await query_executor.run_blocking(open, await stage(filename), "wb")
+                    part = "file"
+                else:
+                    part = name if part_filename is None else None
+                    if part:
+                        fields.setdefault(part, bytearray())
+            elif event[0] == "data" and part == "file":
+                size += len(event[1])
+                if size > limit:
+                    raise HTTPException(status_code=413, detail=f"File too large. Maximum upload size is {max_mb} MB.")
+                buffer.extend(event[1])
+                if len(buffer) >= _UPLOAD_CHUNK_BYTES:
+                    await flush()
+            elif event[0] == "data" and part:
+                fields[part].extend(event[1])
+                if len(fields[part]) > _UPLOAD_FIELD_MAX_BYTES:
+                    raise HTTPException(status_code=413, detail=f"Form field {part!r} is too large")
+            elif event[0] == "end":
+                if part == "file":
+                    await flush()
+                part = None
+            elif event[0] == "done":
+                done = True
+        events.clear()
+
+    try:
+        async for chunk in request.stream():
+            try:
+                parser.write(chunk)
+            except MultipartParseError as e:
+                raise HTTPException(status_code=400, detail=f"Malformed upload: {e}")
+            await handle()
+        parser.finalize()
+        await handle()
+    finally:
+        if out is not None:
+            await query_executor.run_blocking(out.close)
+
+    if filename is None:
+        raise HTTPException(status_code=400, detail="No file provided")
+    if not done:
+        raise HTTPException(status_code=400, detail="Upload was incomplete")
+    return filename, {k: v.decode("utf-8", "replace") for k, v in fields.items()}, digest.hexdigest()
+
+
+def _write_upload_chunk(out, digest, data: bytes) -> None:
+    digest.update(data)
+    out.write(data)
+
+
+# ── Resumable uploads ────────────────────────────────────────────────────────
+
+def _get_upload_session(session_id: str, user: dict) -> upload_sessions.UploadSession:
+    session = upload_sessions.load_session(session_id)
+    if session is None or (session.user_id and session.user_id != user.get("id")):
+        raise HTTPException(status_code=404, detail="Upload session not found")
+    return session
+
+
+@router.post("/uploads", response_model=UploadSessionResponse, status_code=201)
+async def create_upload_session(request: UploadSessionRequest, user: dict = Depends(get_current_user)):
+    """Start a resumable upload for a large CSV file.
+
+    PUT each chunk to ``/uploads/{session_id}/chunks/{index}``, check progress
+    with GET, then POST ``/uploads/{session_id}/complete`` to ingest. Returns
+    409 for a duplicate filename unless ``replace`` is set, like ``/upload``.
+    """
+    if not request.filename.lower().endswith(".csv"):
+        raise HTTPException(status_code=400, detail="Only CSV files are supported")
+    max_bytes = upload_sessions.max_session_bytes()
+    if request.size > max_bytes:
+        raise HTTPException(
+            status_code=413,
+            detail=f"File too large. Maximum upload size is {max_bytes // (1024 * 1024)} MB.",
+        )
+
+    existing_id = await query_executor.find_source_by_filename(request.filename)
+    if existing_id and not request.replace:
+        raise HTTPException(
+            status_code=409,
+            detail={
+                "code": "DUPLICATE_FILENAME",
+                "existing_source_id": existing_id,
+                "filename": request.filename,
+            },
+        )
+
+    session = await asyncio.to_thread(
+        upload_sessions.create_session,
+        request.filename,
+        request.size,
+        source_id=existing_id if request.replace else None,
+        replace=request.replace,
+        user_id=user.get("id"),
+    )
+    return session.to_dict()
+
+
+@router.get("/uploads/{session_id}", response_model=UploadSessionResponse)
+async def get_upload_session(session_id: str, user: dict = Depends(get_current_user)):
+    """Report which byte ranges of an upload have been received."""
+    return _get_upload_session(session_id, user).to_dict()
+
+
+@router.put("/uploads/{session_id}/chunks/{index}", response_model=UploadSessionResponse)
+async def put_upload_chunk(session_id: str, index: int, request: Request, user: dict = Depends(get_current_user)):
+    """Upload chunk ``index`` (0-based) as the raw request body.
+
+    Chunks may be sent in any order or in parallel; re-sending a chunk
+    replaces it.
+    """
+    session = _get_upload_session(session_id, user)
+    if not 0 <= index < session.total_chunks:
+        raise HTTPException(status_code=400, detail=f"Chunk index must be between 0 and {session.total_chunks - 1}")
+    expected = session.chunk_length(index)
+    data = bytearray()
+    async for part in request.stream():
+        data.extend(part)
+        if len(data) > expected:
+            raise HTTPException(status_code=413, detail=f"Chunk {index} must be exactly {expected} bytes")
+
+    try:
+        session = await asyncio.to_thread(upload_sessions.write_chunk, session, index, bytes(data))
+    except ValueError as e:
+        raise HTTPException(status_code=409 if "session" in str(e) else 400, detail=str(e))
+    except FileNotFoundError:
+        raise HTTPException(status_code=409, detail="Upload session is no longer open")
+    return session.to_dict()
+
+
+@router.post("/uploads/{session_id}/complete", response_model=UploadResponse)
+async def complete_upload_session(session_id: str, user: dict = Depends(get_current_user)):
+    """Assemble a fully received upload and ingest it as a source.
+
+    Returns 409 while chunks are missing (see ``missing_chunks``). If the
+    client disconnects during ingest, GET the session to find the result.
+    """
+    session = _get_upload_session(session_id, user)
+    existing_id = await query_executor.find_source_by_filename(session.filename)
+    if existing_id and existing_id != session.source_id:
+        raise HTTPException(
+            status_code=409,
+            detail={
+                "code": "DUPLICATE_FILENAME",
+                "existing_source_id": existing_id,
+                "filename": session.filename,
+            },
+        )
+
+    schema = await query_executor.run_blocking(_finalize_upload_session, session.id)
+    return _build_upload_response(schema)
+
+
+def _finalize_upload_session(session_id: str) -> SourceSchema:
+    """Assemble and ingest a fully received upload, recording the outcome on its session.
+
+    Runs start to finish on the query executor: if the request awaiting it
+    is cancelled, the session still leaves "finalizing" once the ingest ends.
+    """
+    try:
+        session = upload_sessions.begin_finalize(session_id)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Could not assemble upload: {e}")
+
+    error = "Ingest was interrupted"
+    try:
+        schema = get_duckdb_service().ingest_stored_csv(
+            session.storage_key, session.filename, source_id=session.source_id,
+        )
+        error = None
+    except Exception as e:
+        error = str(e) if isinstance(e, ValueError) else (
+            f"Could not parse \"{session.filename}\". Check that the file is a valid CSV with a header row."
+        )
+        raise HTTPException(status_code=422, detail=error)
+    finally:
+        upload_sessions.finish_session(session, error=error)
+    return schema
+
+
+@router.delete("/uploads/{session_id}")
+async def abort_upload_session(session_id: str, user: dict = Depends(get_current_user)):
+    """Abort an upload and discard the chunks received so far."""
+    session = _get_upload_session(session_id, user)
+    if session.state == "finalizing":
+        raise HTTPException(status_code=409, detail="Upload is being ingested")
+    await asyncio.to_thread(upload_sessions.abort_session, session)
+    return {"deleted": True}
+
+
 @router.post("/paste", response_model=UploadResponse)
 async def paste_data(request: PasteRequest, user: dict = Depends(get_current_user)):
     """Ingest pasted tabular data (CSV/TSV), load into DuckDB, return schema info."""
@@ -430,8 +757,6 @@ async def paste_data(request: PasteRequest, user: dict = Depends(get_current_use
         tmp_path = Path(tmp.name)
 
     try:
-        service = get_duckdb_service()
-
         # Determine filename: use user-provided name or fall back to sentinel.
         if request.name and request.name.strip():
             paste_filename = request.name.strip()
@@ -441,17 +766,11 @@ async def paste_data(request: PasteRequest, user: dict = Depends(get_current_use
             paste_filename = "__paste__.csv"
 
         # Replace previous source with same filename if it exists.
-        existing_paste_id = service.find_source_by_filename(paste_filename)
+        existing_paste_id = await query_executor.find_source_by_filename(paste_filename)
         if existing_paste_id:
-            table_name = f"src_{existing_paste_id}"
-            with service._lock:
-                try:
-                    service._conn.execute(f"DROP TABLE IF EXISTS {table_name}")
-                except Exception:
-                    pass
-                service._sources.pop(existing_paste_id, None)
-
-        schema = service.ingest_csv(tmp_path, paste_filename)
+            await query_executor.drop_source(existing_paste_id)
+
+        schema = await query_executor.ingest_csv(tmp_path, paste_filename)
     except ValueError as e:
         raise HTTPException(status_code=422, detail=str(e))
     except Exception:
@@ -497,20 +816,11 @@ async def rename_source(source_id: str, request: RenameRequest, user: dict = Dep
         name = name + '.csv'
 
     service = get_duckdb_service()
-    meta = service._sources.get(source_id)
-    if not meta:
+    if not await query_executor.has_source(source_id):
         raise HTTPException(status_code=404, detail="Source not found")
 
     # Rename the file via storage backend
-    old_path = meta.path
-    safe_new_name = Path(name).name  # sanitize
-    new_path = old_path.parent / safe_new_name
-    if old_path != new_path:
-        storage = get_storage()
-        old_key = f"uploads/{source_id}/{old_path.name}"
-        new_key = f"uploads/{source_id}/{safe_new_name}"
-        storage.rename(old_key, new_key)
-        meta.path = new_path
+    new_path = service.rename_source(source_id, name)
 
     return {"ok": True, "filename": new_path.name}
 
@@ -521,9 +831,8 @@ async def preview_data(source_id: str, limit: int = 10, user: dict = Depends(get
     if not _SAFE_SOURCE_ID_RE.match(source_id):
         raise HTTPException(status_code=400, detail="Invalid source_id")
     limit = max(1, min(limit, 10_000))  # Clamp to prevent DoS
-    service = get_duckdb_service()
     try:
-        result = service.get_preview(source_id, limit)
+        result = await query_executor.get_preview(source_id, limit)
     except Exception:
         raise HTTPException(status_code=404, detail="Source not found")
 
@@ -535,16 +844,23 @@ async def preview_data(source_id: str, limit: int = 10, user: dict = Depends(get
 
 
 @router.post("/query", response_model=QueryResponse)
-async def execute_query(request: QueryRequest, user: dict = Depends(get_current_user)):
+async def execute_query(request: QueryRequest, http_request: Request, user: dict = Depends(get_current_user)):
     """Execute SQL against an uploaded data source."""
     if not _SAFE_SOURCE_ID_RE.match(request.source_id):
         raise HTTPException(status_code=400, detail="Invalid source_id")
-    service = get_duckdb_service()
     try:
-        result = service.execute_query(request.sql, request.source_id)
+        result = await query_executor.execute_query(
+            request.sql, request.source_id, query_class="adhoc", user=user, request=http_request
+        )
+    except QueryCancelledError as e:
+        raise HTTPException(status_code=408, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=422, detail=f"Query failed: {e}")
 
+    if request.format == "columnar":
+        return columnar_response(result)
+    if request.format == "arrow":
+        return arrow_response(result)
     return QueryResponse(
         columns=result.columns,
         rows=result.rows,
@@ -555,9 +871,8 @@ async def execute_query(request: QueryRequest, user: dict = Depends(get_current_
 @router.get("/schema/{source_id}", response_model=UploadResponse)
 async def get_schema(source_id: str, user: dict = Depends(get_current_user)):
     """Get schema information for an uploaded source."""
-    service = get_duckdb_service()
     try:
-        schema = service.get_schema(source_id)
+        schema = await query_executor.get_schema(source_id)
     except Exception as e:
         raise HTTPException(status_code=404, detail=f"Source not found: {e}")
 
@@ -581,6 +896,17 @@ async def get_schema(source_id: str, user: dict = Depends(get_current_user)):
     )
 
 
+def columnar_response(result: QueryResult) -> Response:
+    """JSON ``{columns, data, row_count}`` serialized by pydantic without per-row dicts."""
+    body = ColumnarQueryResponse.model_construct(**result.to_columnar())
+    return Response(content=body.model_dump_json(), media_type="application/json")
+
+
+def arrow_response(result: QueryResult) -> Response:
+    """Arrow IPC stream of the result (read with apache-arrow's tableFromIPC)."""
+    return Response(content=result.to_arrow_ipc(), media_type="application/vnd.apache.arrow.stream")
+
+
 def _build_upload_response(schema) -> UploadResponse:
     """Helper to build UploadResponse from a SourceSchema."""
     return UploadResponse(
@@ -642,21 +968,11 @@ async def import_google_sheets(request: GoogleSheetsRequest, response: Response,
     if not filename.lower().endswith(".csv"):
         filename += ".csv"
 
-    service = get_duckdb_service()
-
-    # Replace existing source with same name
-    existing_id = service.find_source_by_filename(filename)
-    if existing_id:
-        table_name = f"src_{existing_id}"
-        with service._lock:
-            try:
-                service._conn.execute(f"DROP TABLE IF EXISTS {table_name}")
-            except Exception:
-                pass
-            service._sources.pop(existing_id, None)
+    # Replace existing source with same name (swapped in once the new data has loaded)
+    existing_id = await query_executor.find_source_by_filename(filename)
 
     try:
-        schema = service.ingest_csv(csv_path, filename, source_id=existing_id)
+        schema = await query_executor.ingest_csv(csv_path, filename, source_id=existing_id)
     except Exception as e:
         raise HTTPException(status_code=422, detail=f"Could not parse sheet data: {e}")
     finally:
@@ -668,7 +984,7 @@ async def import_google_sheets(request: GoogleSheetsRequest, response: Response,
 
 @router.post("/import/url", response_model=UploadResponse)
 async def import_from_url(request: UrlSourceRequest, response: Response, user: dict = Depends(get_current_user)):
-    """Import CSV or JSON data from an external URL.
+    """Import CSV, compressed CSV, Parquet, JSON or NDJSON data from an external URL.
 
     Optionally pass custom HTTP headers for authenticated endpoints.
     """
@@ -705,65 +1021,46 @@ async def import_from_url(request: UrlSourceRequest, response: Response, user: d
         set_cached(url, content, headers, etag=etag)
         staleness = 0
 
-    # Convert JSON array-of-objects to CSV
-    import json as _json
+    # Pick the reader from the URL's extension, else the content type (default CSV)
+    from urllib.parse import urlparse as _urlparse
+
+    url_stem, suffix = split_upload_name(_urlparse(url).path)
+    if suffix is None:
+        if "ndjson" in content_type or "jsonl" in content_type:
+            suffix = ".ndjson"
+        elif "json" in content_type:
+            suffix = ".json"
+        elif "parquet" in content_type:
+            suffix = ".parquet"
+        else:
+            suffix = ".csv"
 
-    if "json" in content_type or url.endswith(".json"):
-        try:
-            data = _json.loads(content)
-            if isinstance(data, list) and len(data) > 0 and isinstance(data[0], dict):
-                import csv as _csv
-                import io as _io
-
-                cols = list(data[0].keys())
-                buf = _io.StringIO()
-                writer = _csv.DictWriter(buf, fieldnames=cols)
-                writer.writeheader()
-                writer.writerows(data)
-                content = buf.getvalue().encode("utf-8")
-            else:
-                raise HTTPException(
-                    status_code=422,
-                    detail="JSON must be an array of objects [{...}, ...]",
-                )
-        except _json.JSONDecodeError as e:
-            raise HTTPException(status_code=422, detail=f"Invalid JSON: {e}")
-
-    # Write to temp file
-    tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".csv")
+    # Write to temp file (keeping the suffix so compression is detected)
+    tmp = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
     tmp.write(content)
     tmp.close()
-    csv_path = Path(tmp.name)
+    data_path = Path(tmp.name)
 
     # Determine filename
-    filename = request.name
-    if not filename:
-        from urllib.parse import urlparse as _urlparse
-
-        path = _urlparse(url).path
-        filename = Path(path).stem or "url_import"
-    if not filename.lower().endswith(".csv"):
-        filename += ".csv"
+    if request.name:
+        # Only strip a recognised data suffix: "Q1.2024 sales" keeps its full name
+        name_stem, name_suffix = split_upload_name(request.name)
+        if name_suffix is None:
+            name_stem = request.name
+    else:
+        name_stem = url_stem or "url_import"
+    filename = f"{name_stem}{suffix}"
 
-    service = get_duckdb_service()
-
-    # Replace existing source with same name
-    existing_id = service.find_source_by_filename(filename)
-    if existing_id:
-        table_name = f"src_{existing_id}"
-        with service._lock:
-            try:
-                service._conn.execute(f"DROP TABLE IF EXISTS {table_name}")
-            except Exception:
-                pass
-            service._sources.pop(existing_id, None)
+    # Replace existing source with same name (non-CSV data is stored as <stem>.parquet);
+    # the new data is swapped in once it has loaded
+    existing_id = await query_executor.find_source_by_filename(filename if suffix == ".csv" else name_stem)
 
     try:
-        schema = service.ingest_csv(csv_path, filename, source_id=existing_id)
+        schema = await query_executor.ingest_file(data_path, filename, source_id=existing_id)
     except Exception as e:
         raise HTTPException(status_code=422, detail=f"Could not parse data: {e}")
     finally:
-        csv_path.unlink(missing_ok=True)
+        data_path.unlink(missing_ok=True)
 
     response.headers["X-Data-Staleness"] = str(staleness)
     return _build_upload_response(schema)
@@ -57,7 +57,7 @@ def _validate_source(source_id: str) -> None:
     if not _SAFE_SOURCE_ID_RE.match(source_id):
         raise HTTPException(400, "Invalid source_id")
     svc = get_duckdb_service()
-    if source_id not in svc._sources:
+    if not svc.has_source(source_id):
         raise HTTPException(404, f"Source {source_id!r} not found")
 
 
@@ -104,8 +104,8 @@ def geocode_preview(
     table = f"src_{source_id}"
     # Escape double-quotes in identifier (defense in depth)
     safe_column = req.column.replace('"', '""')
-    with svc._lock:
-        result = svc._conn.execute(
+    with svc.query_cursor() as cursor:
+        result = cursor.execute(
             f'SELECT DISTINCT "{safe_column}" FROM {table} WHERE "{safe_column}" IS NOT NULL LIMIT 20'
         ).fetchall()
 
@@ -125,11 +125,11 @@ def _run_geocode_full(job_id: str, source_id: str, column: str, geo_type: str, c
     """Background task: geocode all rows, write _lat/_lon columns back.
 
     CSV sources: read/geocode/write file so changes persist across restarts.
-    Parquet/sync-query sources: geocode in-place inside DuckDB (no file to persist).
+    Parquet/sync-query sources: geocode in-place inside DuckDB, then re-export the Parquet copy.
     """
     try:
         svc = get_duckdb_service()
-        meta = svc._sources.get(source_id)
+        meta = svc.get_source_meta(source_id)
         if not meta:
             raise ValueError(f"Source {source_id!r} not found")
 
@@ -170,8 +170,8 @@ def _run_geocode_full(job_id: str, source_id: str, column: str, geo_type: str, c
             svc.reload_source(source_id)
         else:
             # ── Parquet / sync-query path: geocode directly in DuckDB ──
-            with svc._lock:
-                rows_raw = svc._conn.execute(
+            with svc.query_cursor() as cursor:
+                rows_raw = cursor.execute(
                     f'SELECT DISTINCT CAST("{safe_col}" AS VARCHAR) FROM {table_name} '
                     f'WHERE "{safe_col}" IS NOT NULL'
                 ).fetchall()
@@ -183,6 +183,8 @@ def _run_geocode_full(job_id: str, source_id: str, column: str, geo_type: str, c
             lookup = {r.value: (r.lat, r.lon) for r in results if r.matched}
             resolved = len(lookup)
 
+            # ALTER TABLE needs a real table, not a lazily registered Parquet view
+            svc.materialize_source(source_id)
             with svc._lock:
                 # Add columns if not already present (DuckDB ignores IF NOT EXISTS on ADD COLUMN)
                 existing = {row[0] for row in svc._conn.execute(f"DESCRIBE {table_name}").fetchall()}
@@ -197,6 +199,10 @@ def _run_geocode_full(job_id: str, source_id: str, column: str, geo_type: str, c
                         f'WHERE CAST("{safe_col}" AS VARCHAR) = ?',
                         [lat, lon, val],
                     )
+            # Table altered in place: the cached profile lacks _lat/_lon, and
+            # the stored Parquet copy must pick up the new columns
+            svc.mark_source_changed(source_id)
+            svc.persist_source(source_id)
 
         geo.update_job_progress(job_id, resolved=resolved, total=len(unique_values), status="complete")
     except Exception as e:
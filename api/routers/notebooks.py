@@ -24,6 +24,7 @@ from ..services.notebook_storage import (
 )
 from ..services.kernel_manager import get_kernel_manager
 from ..services.duckdb_service import get_duckdb_service
+from ..services import query_executor
 from ..services.settings_storage import load_settings
 
 logger = logging.getLogger(__name__)
@@ -153,6 +154,7 @@ async def delete_notebook_endpoint(
     # Shut down kernel if running
     km = get_kernel_manager()
     km.shutdown_kernel(notebook_id)
+    await query_executor.run_blocking(get_duckdb_service().close_notebook_session, notebook_id)
 
     deleted = delete_notebook(notebook_id)
     if not deleted:
@@ -231,7 +233,7 @@ def _inject_sources_if_new(session) -> None:
     try:
         service = get_duckdb_service()
         sources = []
-        for source_id in list(service._sources):
+        for source_id in service.list_source_ids():
             try:
                 schema = service.get_schema(source_id)
                 sources.append({
@@ -265,7 +267,7 @@ async def execute_cell_endpoint(
     is_new = km.get_kernel(notebook_id) is None
     session = km.start_kernel(notebook_id)
     if is_new:
-        _inject_sources_if_new(session)
+        await query_executor.run_blocking(_inject_sources_if_new, session)
     result = session.execute(body.code)
     return result
 
@@ -282,12 +284,13 @@ async def execute_all_endpoint(
 
     km = get_kernel_manager()
 
-    # Shut down existing kernel and start fresh
+    # Shut down existing kernel and SQL session and start fresh
+    service = get_duckdb_service()
     km.shutdown_kernel(notebook_id)
+    await query_executor.run_blocking(service.close_notebook_session, notebook_id)
     session = km.start_kernel(notebook_id)
-    _inject_sources_if_new(session)
+    await query_executor.run_blocking(_inject_sources_if_new, session)
 
-    service = get_duckdb_service()
     cell_results: list[dict] = []
 
     for cell in data.get("cells", []):
@@ -308,9 +311,10 @@ async def execute_all_endpoint(
         if is_sql:
             # Execute SQL cell via DuckDB, inject result as DataFrame
             try:
-                db_result = service._conn.execute(source)
-                columns = [desc[0] for desc in db_result.description]
-                rows = db_result.fetchall()
+                columns, rows = await query_executor.run_query(
+                    service.execute_notebook_sql, notebook_id, source,
+                    sql=source, query_class="adhoc", user=user,
+                )
 
                 html = '<table class="dataframe"><thead><tr>'
                 for col in columns:
@@ -385,10 +389,13 @@ async def execute_sql_endpoint(
         return {"status": "ok", "outputs": [], "execution_count": None}
 
     service = get_duckdb_service()
+
     try:
-        result = service._conn.execute(sql_code)
-        columns = [desc[0] for desc in result.description]
-        rows = result.fetchall()
+        # Cells share one DuckDB session per notebook, so TEMP tables and SET persist
+        columns, rows = await query_executor.run_query(
+            service.execute_notebook_sql, notebook_id, sql_code,
+            sql=sql_code, query_class="adhoc", user=user,
+        )
 
         # Build HTML table matching pandas DataFrame output format
         html = '<table class="dataframe"><thead><tr>'
@@ -410,7 +417,7 @@ async def execute_sql_endpoint(
         is_new = km.get_kernel(notebook_id) is None
         session = km.start_kernel(notebook_id)
         if is_new:
-            _inject_sources_if_new(session)
+            await query_executor.run_blocking(_inject_sources_if_new, session)
 
         # Pick next sql_N variable name
         df_var = _next_sql_var(session)
@@ -465,9 +472,10 @@ async def restart_kernel_endpoint(
     notebook_id: str,
     user: dict = Depends(get_current_user),
 ):
-    """Restart the kernel (clears all variables)."""
+    """Restart the kernel (clears all variables, including SQL session state)."""
     km = get_kernel_manager()
     session = km.restart_kernel(notebook_id)
+    await query_executor.run_blocking(get_duckdb_service().close_notebook_session, notebook_id)
     if session is None:
         raise HTTPException(status_code=404, detail="No active kernel for this notebook")
     return {"ok": True}
@@ -478,9 +486,10 @@ async def shutdown_kernel_endpoint(
     notebook_id: str,
     user: dict = Depends(get_current_user),
 ):
-    """Shut down the kernel."""
+    """Shut down the kernel and the notebook's SQL session."""
     km = get_kernel_manager()
     km.shutdown_kernel(notebook_id)
+    await query_executor.run_blocking(get_duckdb_service().close_notebook_session, notebook_id)
     return {"ok": True}
 
 
@@ -615,9 +624,9 @@ async def notebook_ai_assist(
     try:
         service = get_duckdb_service()
         lines = ["Available data sources:"]
-        for source_id in list(service._sources):
+        for source_id in await query_executor.list_source_ids():
             try:
-                schema = service.get_schema(source_id)
+                schema = await query_executor.get_schema(source_id)
                 view_name = service.get_view_name(source_id)
                 table_label = view_name or f"src_{source_id}"
                 cols = ", ".join(f"{c.name} ({c.type})" for c in schema.columns[:20])
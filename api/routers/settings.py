@@ -12,6 +12,7 @@ from .admin import require_admin
 
 from ..services.settings_storage import load_settings, save_settings, mask_key
 from ..services.duckdb_service import get_duckdb_service
+from ..services import query_executor
 from ..services.connection_service import list_connections
 
 
@@ -85,9 +86,9 @@ async def list_data_sources(user: dict = Depends(get_current_user)):
 
     # Uploaded CSVs from DuckDB service
     db = get_duckdb_service()
-    for source_id in list(db._sources.keys()):
+    for source_id in await query_executor.list_source_ids():
         try:
-            schema = db.get_schema(source_id)
+            schema = await query_executor.get_schema(source_id)
             ingested_at = db.get_ingested_at(source_id)
             ts = ingested_at.timestamp() if ingested_at else 0.0
             csvs.append((ts, DataSourceInfo(
@@ -1,4 +1,8 @@
-"""Data transform endpoints -- modify source CSV in-place and re-ingest."""
+"""Data transform endpoints -- modify source CSV in-place and re-ingest.
+
+CSV read/write and the DuckDB reload run on the query executor so a large
+transform does not block the event loop.
+"""
 from __future__ import annotations
 
 import csv
@@ -11,6 +15,7 @@ from pydantic import BaseModel
 from ..auth_simple import get_current_user
 
 from ..services.duckdb_service import get_duckdb_service, _SAFE_SOURCE_ID_RE
+from ..services.query_executor import run_blocking
 from ..services.storage import get_storage
 
 router = APIRouter(prefix="/data", tags=["transforms"])
@@ -61,14 +66,16 @@ def _validate_source_id(source_id: str) -> None:
 
 
 def _get_source_info(source_id: str) -> tuple[Path, str]:
-    """Find the CSV file for a source_id. Returns (local_path, storage_key)."""
+    """Find the CSV file for a source_id. Returns (local_path, storage_key).
+
+    Parquet-only sources (synced tables) get a CSV exported on first use.
+    """
     _validate_source_id(source_id)
     svc = get_duckdb_service()
-    meta = svc._sources.get(source_id)
+    meta = svc.get_source_meta(source_id)
     if not meta:
         raise HTTPException(404, f"Source {source_id} not found")
-    storage_key = f"uploads/{source_id}/{meta.path.name}"
-    return meta.path, storage_key
+    return svc.ensure_csv(source_id)
 
 
 def _get_source_path(source_id: str) -> Path:
@@ -119,8 +126,8 @@ def _reingest_and_preview(source_id: str, path: Path | None = None, limit: int =
 @router.post("/{source_id}/transform/transpose")
 async def transpose(source_id: str, user: dict = Depends(get_current_user)):
     """Transpose the data: rows become columns and columns become rows."""
-    path, key = _get_source_info(source_id)
-    columns, rows = _read_csv(key)
+    path, key = await run_blocking(_get_source_info, source_id)
+    columns, rows = await run_blocking(_read_csv, key)
     if not rows:
         raise HTTPException(400, "No data to transpose")
 
@@ -136,15 +143,15 @@ async def transpose(source_id: str, user: dict = Depends(get_current_user)):
             new_row[new_cols[i + 1]] = row.get(col, "")
         new_rows.append(new_row)
 
-    _write_csv(key, new_cols, new_rows)
-    return _reingest_and_preview(source_id, path)
+    await run_blocking(_write_csv, key, new_cols, new_rows)
+    return await run_blocking(_reingest_and_preview, source_id, path)
 
 
 @router.post("/{source_id}/transform/rename-column")
 async def rename_column(source_id: str, req: RenameColumnRequest, user: dict = Depends(get_current_user)):
     """Rename a single column."""
-    path, key = _get_source_info(source_id)
-    columns, rows = _read_csv(key)
+    path, key = await run_blocking(_get_source_info, source_id)
+    columns, rows = await run_blocking(_read_csv, key)
     if req.old not in columns:
         raise HTTPException(404, f"Column '{req.old}' not found")
 
@@ -153,43 +160,43 @@ async def rename_column(source_id: str, req: RenameColumnRequest, user: dict = D
         {(req.new if k == req.old else k): v for k, v in row.items()}
         for row in rows
     ]
-    _write_csv(key, new_columns, new_rows)
-    return _reingest_and_preview(source_id, path)
+    await run_blocking(_write_csv, key, new_columns, new_rows)
+    return await run_blocking(_reingest_and_preview, source_id, path)
 
 
 @router.post("/{source_id}/transform/delete-column")
 async def delete_column(source_id: str, req: DeleteColumnRequest, user: dict = Depends(get_current_user)):
     """Delete a column from the dataset."""
-    path, key = _get_source_info(source_id)
-    columns, rows = _read_csv(key)
+    path, key = await run_blocking(_get_source_info, source_id)
+    columns, rows = await run_blocking(_read_csv, key)
     if req.column not in columns:
         raise HTTPException(404, f"Column '{req.column}' not found")
 
     new_columns = [c for c in columns if c != req.column]
     new_rows = [{k: v for k, v in row.items() if k != req.column} for row in rows]
-    _write_csv(key, new_columns, new_rows)
-    return _reingest_and_preview(source_id, path)
+    await run_blocking(_write_csv, key, new_columns, new_rows)
+    return await run_blocking(_reingest_and_preview, source_id, path)
 
 
 @router.post("/{source_id}/transform/reorder-columns")
 async def reorder_columns(source_id: str, req: ReorderColumnsRequest, user: dict = Depends(get_current_user)):
     """Reorder columns to match the provided order."""
-    path, key = _get_source_info(source_id)
-    columns, rows = _read_csv(key)
+    path, key = await run_blocking(_get_source_info, source_id)
+    columns, rows = await run_blocking(_read_csv, key)
     for col in req.columns:
         if col not in columns:
             raise HTTPException(404, f"Column '{col}' not found")
 
     new_rows = [{c: row.get(c, "") for c in req.columns} for row in rows]
-    _write_csv(key, req.columns, new_rows)
-    return _reingest_and_preview(source_id, path)
+    await run_blocking(_write_csv, key, req.columns, new_rows)
+    return await run_blocking(_reingest_and_preview, source_id, path)
 
 
 @router.post("/{source_id}/transform/round")
 async def round_column(source_id: str, req: RoundRequest, user: dict = Depends(get_current_user)):
     """Round numeric values in a column to N decimal places."""
-    path, key = _get_source_info(source_id)
-    columns, rows = _read_csv(key)
+    path, key = await run_blocking(_get_source_info, source_id)
+    columns, rows = await run_blocking(_read_csv, key)
     if req.column not in columns:
         raise HTTPException(404, f"Column '{req.column}' not found")
 
@@ -198,45 +205,45 @@ async def round_column(source_id: str, req: RoundRequest, user: dict = Depends(g
             row[req.column] = str(round(float(row[req.column]), req.decimals))
         except (ValueError, TypeError):
             pass  # Leave non-numeric values as-is
-    _write_csv(key, columns, rows)
-    return _reingest_and_preview(source_id, path)
+    await run_blocking(_write_csv, key, columns, rows)
+    return await run_blocking(_reingest_and_preview, source_id, path)
 
 
 @router.post("/{source_id}/transform/prepend-append")
 async def prepend_append(source_id: str, req: PrependAppendRequest, user: dict = Depends(get_current_user)):
     """Prepend and/or append text to all values in a column."""
-    path, key = _get_source_info(source_id)
-    columns, rows = _read_csv(key)
+    path, key = await run_blocking(_get_source_info, source_id)
+    columns, rows = await run_blocking(_read_csv, key)
     if req.column not in columns:
         raise HTTPException(404, f"Column '{req.column}' not found")
 
     for row in rows:
         val = row.get(req.column, "")
         row[req.column] = f"{req.prepend}{val}{req.append}"
-    _write_csv(key, columns, rows)
-    return _reingest_and_preview(source_id, path)
+    await run_blocking(_write_csv, key, columns, rows)
+    return await run_blocking(_reingest_and_preview, source_id, path)
 
 
 @router.post("/{source_id}/transform/edit-cell")
 async def edit_cell(source_id: str, req: EditCellRequest, user: dict = Depends(get_current_user)):
     """Edit a single cell value by row index and column name."""
-    path, key = _get_source_info(source_id)
-    columns, rows = _read_csv(key)
+    path, key = await run_blocking(_get_source_info, source_id)
+    columns, rows = await run_blocking(_read_csv, key)
     if req.column not in columns:
         raise HTTPException(404, f"Column '{req.column}' not found")
     if req.row < 0 or req.row >= len(rows):
         raise HTTPException(400, f"Row {req.row} out of range (0-{len(rows) - 1})")
 
     rows[req.row][req.column] = "" if req.value is None else str(req.value)
-    _write_csv(key, columns, rows)
-    return _reingest_and_preview(source_id, path)
+    await run_blocking(_write_csv, key, columns, rows)
+    return await run_blocking(_reingest_and_preview, source_id, path)
 
 
 @router.post("/{source_id}/transform/cast-type")
 async def cast_type(source_id: str, req: CastTypeRequest, user: dict = Depends(get_current_user)):
     """Cast a column to a different type (text, number, date)."""
-    path, key = _get_source_info(source_id)
-    columns, rows = _read_csv(key)
+    path, key = await run_blocking(_get_source_info, source_id)
+    columns, rows = await run_blocking(_read_csv, key)
     if req.column not in columns:
         raise HTTPException(404, f"Column '{req.column}' not found")
 
@@ -250,5 +257,5 @@ async def cast_type(source_id: str, req: CastTypeRequest, user: dict = Depends(g
         elif req.type == "text":
             row[req.column] = str(val)
         # "date" -- leave as-is; DuckDB handles date parsing on ingest
-    _write_csv(key, columns, rows)
-    return _reingest_and_preview(source_id, path)
+    await run_blocking(_write_csv, key, columns, rows)
+    return await run_blocking(_reingest_and_preview, source_id, path)
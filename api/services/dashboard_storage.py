@@ -37,6 +37,7 @@ class SavedDashboard:
     updated_at: str
     filters: list[dict] | None = None  # list of FilterSpec as dicts
     status: str = "draft"  # "draft" | "published"
+    filter_index: dict | None = None  # see build_filter_index()
 
 
 def save_dashboard(
@@ -57,6 +58,7 @@ def save_dashboard(
         created_at=now,
         updated_at=now,
         filters=filters,
+        filter_index=build_filter_index(charts or []),
     )
 
     _storage.write_text(f"dashboards/{dashboard_id}.json", json.dumps(asdict(dashboard), indent=2))
@@ -128,11 +130,61 @@ def update_dashboard(dashboard_id: str, **fields) -> SavedDashboard | None:
         if key_name in _UPDATABLE:
             data[key_name] = value
 
+    data["filter_index"] = build_filter_index(data.get("charts") or [])
     data["updated_at"] = now
     _storage.write_text(key, json.dumps(data, indent=2))
     return _safe_load_dashboard(data)
 
 
+# ── Filter dependency index ─────────────────────────────────────────────────
+#
+# Which ``${inputs.name}`` filters each chart's SQL references, computed when
+# the dashboard is saved so the query path can hand each chart only the
+# params it uses (and leave everything else out of its cache keys):
+#
+#   {"charts":  {chart_id: {"filters": [...], "source_id": ..., "chart_updated_at": ...}},
+#    "filters": {name: {"charts": [...], "sources": [...]}}}
+#
+# A chart edited after the dashboard was saved has a newer updated_at than
+# its entry; chart_filter_names() rescans such charts instead.
+
+def build_filter_index(charts: list[dict]) -> dict:
+    """Map each filter to the charts and sources it affects, and each chart to its filters."""
+    from api.services.chart_storage import load_chart
+    from api.services.duckdb_service import filter_param_names
+
+    by_chart: dict[str, dict] = {}
+    by_filter: dict[str, dict[str, list[str]]] = {}
+    for ref in charts:
+        chart_id = ref.get("chart_id", "")
+        if chart_id in by_chart:
+            continue
+        chart = load_chart(chart_id)
+        if chart is None:
+            continue
+        names = sorted(filter_param_names(chart.sql))
+        by_chart[chart_id] = {
+            "filters": names,
+            "source_id": chart.source_id,
+            "chart_updated_at": chart.updated_at,
+        }
+        for name in names:
+            entry = by_filter.setdefault(name, {"charts": [], "sources": []})
+            entry["charts"].append(chart_id)
+            if chart.source_id not in entry["sources"]:
+                entry["sources"].append(chart.source_id)
+    return {"charts": by_chart, "filters": by_filter}
+
+
+def chart_filter_names(dashboard: SavedDashboard, chart) -> set[str]:
+    """Filters ``chart`` (a SavedChart on ``dashboard``) depends on, from the index when it is current."""
+    entry = ((dashboard.filter_index or {}).get("charts") or {}).get(chart.id)
+    if entry is not None and entry.get("chart_updated_at") == chart.updated_at:
+        return set(entry["filters"])
+    from api.services.duckdb_service import filter_param_names
+    return filter_param_names(chart.sql)
+
+
 def delete_dashboard(dashboard_id: str) -> bool:
     """Delete a dashboard."""
     if not _validate_id(dashboard_id):
@@ -2,30 +2,199 @@
 DuckDB service for data ingestion, schema inspection, and query execution.
 Manages in-memory DuckDB connections with uploaded data from CSV, parquet,
 or Snowflake sources.
+
+Set ``DUCKDB_DATABASE`` to a file path to keep tables, views and the source
+catalog on disk across restarts (relative paths resolve against
+``STORAGE_LOCAL_DIR``). The default ``:memory:`` re-ingests every upload at
+startup.
+
+Reads run on per-query cursors of the shared database so dashboards can be
+served concurrently; ``self._lock`` only serialises DDL/ingest on the main
+connection. ``DUCKDB_MAX_CONCURRENT_QUERIES`` caps how many reads execute at
+once (default: CPU count).
+
+Resource limits (``memory_limit``, ``threads``, ``temp_directory`` for
+spilling, ``preserve_insertion_order``) are applied when the database is
+opened, from ``DUCKDB_<SETTING>`` env vars or the ``duckdb:`` section of
+engine_config.yaml.
+
+Every file-backed source is stored canonically as a zstd-compressed Parquet
+file under ``uploads/<id>/``, which is what startup and reloads read; an
+uploaded CSV is kept next to it as the editable original (transforms rewrite
+it and call ``reload_source``, which re-exports the Parquet copy). Synced
+warehouse tables are stored as Parquet only. Sources from before this layout
+are migrated the first time they are loaded.
+
+``DUCKDB_LAZY_SOURCES=true`` (in-memory databases only) registers sources at
+startup as views over their Parquet file instead of loading them. A source is
+copied into an in-memory table once it has been queried
+``DUCKDB_LAZY_PROMOTE_AFTER`` times (default 3); when the materialized tables
+exceed ``DUCKDB_LAZY_MEMORY_MB`` (default 1024), the least recently queried
+ones are turned back into views.
+
+Column profiles (``SourceSchema``) are computed once per ingest and cached
+against the source's generation, which changes whenever its table is
+rebuilt; file-backed sources also persist the profile as
+``uploads/<id>/_profile.json``.
+
+Sources are reloaded at startup on a background worker pool, sources behind
+published dashboards and recently queried ones first; ``reload_status()``
+backs the ``/ready`` endpoint.
+
+``execute_query`` results are cached (see result_cache.py) under the
+rewritten SQL, params and the generations of the sources it reads; on a
+miss, identical queries already running are joined rather than re-run (see
+single_flight.py). Dashboard filter placeholders (``${inputs.name}``) are compiled to bound
+parameters, so the SQL text stays the same and a filter change only swaps
+the parameter vector.
 """
 
+import hashlib
+import heapq
+import itertools
+import json
+import os
 import re
 import uuid
-import csv
 import tempfile
 import threading
-from datetime import datetime, timezone
+import time
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass, field, replace
+from typing import TYPE_CHECKING, Callable
 
 import duckdb
 
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+from api.services.query_registry import QueryCancelledError, get_query_registry
+from api.services.result_cache import ResultCache, result_cache_budget
+from api.services.single_flight import SingleFlight
 from api.services.storage import get_storage
 
 # source_id values are 12-char hex strings from uuid4().hex[:12]
 _SAFE_SOURCE_ID_RE = re.compile(r"^[a-f0-9]{12}$")
 
+# Database settings that can be set from DUCKDB_<NAME> env vars or engine_config.yaml
+_RESOURCE_SETTINGS = ("memory_limit", "threads", "temp_directory", "preserve_insertion_order")
+# Per-table memory estimates: bytes per value of uncompressed in-memory
+# segments (anything else counts as 16, the size of a DuckDB string header)
+_SEGMENT_WIDTHS = {
+    "BOOLEAN": 1, "TINYINT": 1, "UTINYINT": 1, "SMALLINT": 2, "USMALLINT": 2,
+    "INTEGER": 4, "UINTEGER": 4, "FLOAT": 4, "DATE": 4,
+    "BIGINT": 8, "UBIGINT": 8, "DOUBLE": 8, "TIME": 8,
+    "TIMESTAMP": 8, "TIMESTAMP WITH TIME ZONE": 8, "VALIDITY": 0.125,
+}
+
+# CSV ingest: rows of the file head that sniff_csv inspects (see _plan_csv)
+_CSV_SNIFF_ROWS = 20_480
+
+# Canonical Parquet copies of sources (see module docstring)
+_PARQUET_COMPRESSION = "zstd"
+
+# Startup reload: sources queried within this many days count as hot, and a
+# query waits at most _RELOAD_WAIT_S for its source to finish reloading
+_HOT_ACCESS_DAYS = 7
+_RELOAD_WAIT_S = 120.0
+# Last-query time per source, saved at most every _ACCESS_FLUSH_S seconds
+_ACCESS_LOG_KEY = "duckdb/source_access.json"
+_ACCESS_FLUSH_S = 60.0
+
+# Notebook SQL sessions unused this long are closed (matches the kernel idle timeout)
+_NOTEBOOK_IDLE_S = 1800.0
+
+# File types accepted for upload/URL import, longest suffix first. Plain CSV
+# keeps its file; the others are read natively and stored as Parquet only.
+UPLOAD_SUFFIXES = (".csv.gz", ".csv.zst", ".parquet", ".ndjson", ".json", ".csv")
+
+# Catalog table (persistent mode only): one row per source, recording the file
+# fingerprint it was ingested from so unchanged files are not re-read on boot.
+_CATALOG_TABLE = "_sa_catalog"
+
+# Column profiling: min/max is reported for these types; tables past either
+# threshold get the approximate "fast" profile (see _inspect_table).
+_MINMAX_TYPES = ('INT', 'FLOAT', 'DOUBLE', 'DECIMAL', 'NUMERIC', 'DATE', 'TIMESTAMP')
+_PROFILE_FAST_ROWS = 5_000_000
+_PROFILE_FAST_COLUMNS = 200
+_PROFILE_SAMPLE_ROWS = 10_000
+_PROFILE_FILENAME = "_profile.json"
+
+# Process-wide source generations: each registered SourceMeta gets a fresh one,
+# so a cached profile is valid only while its generation is current.
+_generations = itertools.count(1)
+
+# Internal table references and SQL functions whose results must not be cached
+_SRC_TABLE_RE = re.compile(r"\bsrc_([a-f0-9]{12})\b")
+_IDENTIFIER_RE = re.compile(r"[a-z_][a-z0-9_]*")
+# Filter placeholders, plus the string literals and comments they must not be bound inside
+_FILTER_PARAM_RE = re.compile(r"\$\{inputs\.(\w+)\}")
+_FILTER_SCAN_RE = re.compile(r"'(?:[^']|'')*'|--[^\n]*|/\*.*?\*/|\$\{inputs\.(\w+)\}", re.DOTALL)
+
+_VOLATILE_SQL_RE = re.compile(
+    r"\b(random|setseed|uuid|gen_random_uuid|nextval|now|today|current_date|"
+    r"current_time|current_timestamp|get_current_time|get_current_timestamp)\b",
+    re.IGNORECASE,
+)
+
 
 @dataclass
 class SourceMeta:
     path: Path
     ingested_at: datetime
     view_name: str | None = None
+    storage_path: str | None = None  # e.g. "uploads/<id>/sales.csv"; None if not file-backed
+    generation: int = field(default_factory=lambda: next(_generations))
+    parquet_key: str | None = None  # canonical copy, e.g. "uploads/<id>/sales.parquet"
+    parquet_path: Path | None = None  # local path of parquet_key
+    content_hash: str | None = None  # SHA-256 of the backing file, once known (see _source_version)
+
+
+@dataclass
+class CsvIngestPlan:
+    """CSV dialect and column types sniffed from the head of a file (see _plan_csv)."""
+    delimiter: str
+    quote: str
+    escape: str
+    skip_rows: int
+    header: bool
+    columns: list[tuple[str, str]]  # (name, DuckDB type)
+    date_format: str | None = None
+    timestamp_format: str | None = None
+    sniff_ms: float = 0.0
+
+    def read_sql(self, path: Path, *, pin_types: bool = True) -> str:
+        """Build the read_csv() call for one full parse of ``path``.
+
+        With ``pin_types`` the sniffed column types are used as-is; otherwise
+        DuckDB detects types over the whole file (keeping the sniffed dialect).
+        """
+        options = [
+            f"delim='{_sql_string(self.delimiter)}'",
+            f"quote='{_sql_string(self.quote)}'",
+            f"escape='{_sql_string(self.escape)}'",
+            f"skip={self.skip_rows}",
+            f"header={'true' if self.header else 'false'}",
+        ]
+        if pin_types:
+            columns = ", ".join(f"'{_sql_string(name)}': '{_sql_string(ctype)}'" for name, ctype in self.columns)
+            options += ["auto_detect=false", f"columns={{{columns}}}"]
+            if self.date_format:
+                options.append(f"dateformat='{_sql_string(self.date_format)}'")
+            if self.timestamp_format:
+                options.append(f"timestampformat='{_sql_string(self.timestamp_format)}'")
+        else:
+            options.append("sample_size=-1")
+        return f"read_csv('{_sql_string(str(path))}', {', '.join(options)})"
+
+    def describe(self) -> str:
+        return (
+            f"delim={self.delimiter!r} quote={self.quote!r} skip={self.skip_rows} "
+            f"header={self.header} columns={len(self.columns)} (sniffed in {self.sniff_ms:.0f} ms)"
+        )
 
 
 @dataclass
@@ -48,23 +217,330 @@ class SourceSchema:
     columns: list[ColumnInfo]
 
 
-@dataclass
 class QueryResult:
-    columns: list[str]
-    rows: list[dict]
-    row_count: int
+    """Query result held column-wise.
+
+    ``execute_query`` fills it from a pyarrow Table; ``column_data`` (one list
+    per column) and ``rows`` (one dict per row) are converted on first access,
+    so columnar and Arrow responses never build per-row dicts.
+    """
+
+    def __init__(
+        self,
+        columns: list[str],
+        rows: list[dict] | None = None,
+        row_count: int | None = None,
+        *,
+        table: "pa.Table | None" = None,
+        column_types: list[str] | None = None,
+    ):
+        self.columns = columns
+        self.column_types = column_types or []
+        self.table = table
+        self._rows = rows
+        self._column_data: list[list] | None = None
+        if row_count is None:
+            row_count = table.num_rows if table is not None else len(rows or [])
+        self.row_count = row_count
+
+    @property
+    def rows(self) -> list[dict]:
+        if self._rows is None:
+            self._rows = [dict(zip(self.columns, values)) for values in zip(*self.column_data)]
+        return self._rows
+
+    @property
+    def column_data(self) -> list[list]:
+        if self._column_data is None:
+            if self.table is not None:
+                types = self.column_types or [""] * self.table.num_columns
+                self._column_data = [
+                    _arrow_column_to_python(self.table.column(i), types[i])
+                    for i in range(self.table.num_columns)
+                ]
+            else:
+                self._column_data = [[row.get(c) for row in self._rows or []] for c in self.columns]
+        return self._column_data
+
+    def to_columnar(self) -> dict:
+        """``{columns, data: [[col0...], [col1...]], row_count}`` for JSON responses."""
+        return {"columns": self.columns, "data": self.column_data, "row_count": self.row_count}
+
+    def to_arrow_ipc(self) -> bytes:
+        """Serialize the result as an Arrow IPC stream."""
+        import pyarrow as pa
+
+        table = self.table
+        if table is None:
+            table = pa.Table.from_arrays([pa.array(col) for col in self.column_data], names=self.columns)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+
+@dataclass
+class _NotebookSession:
+    """A notebook's own cursor: TEMP tables and SET options persist between its cells."""
+    conn: duckdb.DuckDBPyConnection
+    lock: threading.Lock = field(default_factory=threading.Lock)  # one cell at a time
+    last_used: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class _ReloadProgress:
+    """State of the startup reload (guarded by DuckDBService._reload_lock)."""
+    started: float = field(default_factory=time.monotonic)
+    planned: threading.Event = field(default_factory=threading.Event)  # sources listed and queued
+    total: int = 0
+    hot: set[str] = field(default_factory=set)
+    pending: dict[str, threading.Event] = field(default_factory=dict)  # queued or running
+    names: dict[str, str] = field(default_factory=dict)  # source_id -> filename it registers under
+    done: threading.Event = field(default_factory=threading.Event)  # every source attempted
+    running: set[str] = field(default_factory=set)
+    loaded: int = 0
+    failed: int = 0
+    finished: float | None = None
 
 
 class DuckDBService:
     """Manages CSV uploads and queries via DuckDB."""
 
     def __init__(self) -> None:
-        self._conn = duckdb.connect(":memory:")
+        self._database = _resolve_database_path()
+        self._persistent = self._database != ":memory:"
+        settings = _resource_config()
+        if settings:
+            print(f"[DuckDB] Resource settings: {settings}")
+        self._conn = duckdb.connect(self._database, config=settings)
+        # Serialises DDL / ingest on self._conn; reads use query_cursor() instead
         self._lock = threading.RLock()
+        self._cursor_lock = threading.Lock()
+        self._query_slots = threading.BoundedSemaphore(_max_concurrent_queries())
+        self._idle_cursors: list[duckdb.DuckDBPyConnection] = []  # execute_query only; see _pooled_cursor()
+        self._notebook_sessions: dict[str, _NotebookSession] = {}  # notebook_id -> session
         self._sources: dict[str, SourceMeta] = {}
+        self._profiles: dict[str, tuple[int, SourceSchema]] = {}  # source_id -> (generation, schema)
+        self._results = ResultCache(result_cache_budget())
+        self._in_flight = SingleFlight()  # identical concurrent queries share one execution
+        # Lazy sources: views over Parquet (source_id -> queries since registered)
+        # and the tables promoted from them (source_id -> estimated bytes, LRU first)
+        self._lazy_mode = _lazy_sources_enabled() and not self._persistent
+        self._lazy_lock = threading.Lock()
+        self._lazy_hits: dict[str, int] = {}
+        self._materialized: OrderedDict[str, int] = OrderedDict()
         self._storage = get_storage()
-        # Ensure the uploads directory exists (storage.write() creates parents on demand)
-        self._reload_uploaded_sources()
+        if self._persistent:
+            self._ensure_catalog()
+        # Startup reload runs in the background; see reload_status() and _await_source()
+        self._access_log: dict[str, float] = self._load_access_log()
+        self._access_flushed = time.time()
+        self._reload_lock = threading.Lock()
+        self._reload = _ReloadProgress()
+        self._reload_queue: list[tuple[int, int, str]] = []  # heap of (priority, order, source_id)
+        threading.Thread(target=self._run_startup_reload, name="duckdb-reload", daemon=True).start()
+
+    @contextmanager
+    def query_cursor(self):
+        """Yield a dedicated cursor for one read query.
+
+        Each cursor is an independent connection to the same database, so
+        queries run in parallel instead of queueing on ``self._lock``. Blocks
+        while DUCKDB_MAX_CONCURRENT_QUERIES queries are already running.
+        The cursor is bound to the caller's registered query (if any) so it
+        can be interrupted on timeout or cancellation.
+        """
+        with self._query_slots:
+            with self._cursor_lock:
+                cursor = self._conn.cursor()
+            try:
+                with _interruptible(cursor):
+                    yield cursor
+            finally:
+                cursor.close()
+
+    @contextmanager
+    def _pooled_cursor(self):
+        """Like query_cursor(), but reuses cursors instead of opening one per query.
+
+        Only execute_query uses these: it runs validated read-only SQL, so no
+        session state (SET, open transactions) can leak between requests.
+        """
+        with self._query_slots:
+            with self._cursor_lock:
+                cursor = self._idle_cursors.pop() if self._idle_cursors else self._conn.cursor()
+            try:
+                with _interruptible(cursor):
+                    yield cursor
+            finally:
+                with self._cursor_lock:
+                    self._idle_cursors.append(cursor)
+
+    # ── Notebook SQL sessions ───────────────────────────────────────────────
+
+    def execute_notebook_sql(self, notebook_id: str, sql: str) -> tuple[list[str], list[tuple]]:
+        """Run a notebook SQL cell on the notebook's own cursor; return (columns, rows).
+
+        The cursor is kept until close_notebook_session() (or _NOTEBOOK_IDLE_S
+        without use), so state set up by one cell is visible to the next.
+        Anything but a single read-only statement takes self._lock, like all
+        other DDL. Counts against DUCKDB_MAX_CONCURRENT_QUERIES and can be
+        interrupted like a query_cursor() query.
+        """
+        session = self._notebook_session(notebook_id)
+        read_only = self._is_read_only_sql(sql) and ";" not in sql.strip().rstrip(";")
+        with session.lock, self._query_slots:
+            session.last_used = time.monotonic()
+            with _interruptible(session.conn), (nullcontext() if read_only else self._lock):
+                result = session.conn.execute(sql)
+                if result.description is None:
+                    return [], []
+                return [desc[0] for desc in result.description], result.fetchall()
+
+    def close_notebook_session(self, notebook_id: str) -> None:
+        """Discard a notebook's SQL session state (waits for a running cell)."""
+        with self._cursor_lock:
+            session = self._notebook_sessions.pop(notebook_id, None)
+        if session is not None:
+            with session.lock:
+                session.conn.close()
+
+    def _notebook_session(self, notebook_id: str) -> _NotebookSession:
+        now = time.monotonic()
+        with self._cursor_lock:
+            for nid, idle in list(self._notebook_sessions.items()):
+                if now - idle.last_used > _NOTEBOOK_IDLE_S and idle.lock.acquire(blocking=False):
+                    del self._notebook_sessions[nid]
+                    idle.conn.close()
+                    idle.lock.release()
+            session = self._notebook_sessions.get(notebook_id)
+            if session is None:
+                session = self._notebook_sessions[notebook_id] = _NotebookSession(self._conn.cursor())
+            session.last_used = now
+            return session
+
+    # ── Persistent catalog ──────────────────────────────────────────────────
+
+    def _ensure_catalog(self) -> None:
+        """Create the source catalog table in the on-disk database."""
+        with self._lock:
+            self._conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {_CATALOG_TABLE} (
+                    source_id VARCHAR PRIMARY KEY,
+                    storage_path VARCHAR,
+                    filename VARCHAR NOT NULL,
+                    view_name VARCHAR,
+                    file_size BIGINT,
+                    file_mtime_ns BIGINT,
+                    content_hash VARCHAR,
+                    ingested_at VARCHAR NOT NULL
+                )
+            """)
+
+    def _load_catalog(self) -> dict[str, dict]:
+        """Return catalog rows keyed by source_id (empty in memory mode)."""
+        if not self._persistent:
+            return {}
+        with self._lock:
+            result = self._conn.execute(f"SELECT * FROM {_CATALOG_TABLE}")
+            columns = [desc[0] for desc in result.description]
+            return {row[0]: dict(zip(columns, row)) for row in result.fetchall()}
+
+    def _existing_tables(self) -> set[str]:
+        """Return the names of all base tables in the main schema."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT table_name FROM duckdb_tables() WHERE schema_name = 'main'"
+            ).fetchall()
+        return {r[0] for r in rows}
+
+    def _record_catalog(self, source_id: str, *, content_hash: str | None = None) -> None:
+        """Upsert the catalog row for a registered source (no-op in memory mode).
+
+        File-backed sources record size, mtime and a SHA-256 of the file the
+        table is loaded from (the Parquet copy when there is one) so the next
+        startup can tell whether the table is still current.
+        """
+        if not self._persistent:
+            return
+        meta = self._sources.get(source_id)
+        if meta is None:
+            return
+        backing_key, backing_path = _backing_file(meta)
+        size = mtime_ns = None
+        if backing_key:
+            try:
+                size, mtime_ns = _file_fingerprint(backing_path)
+                if content_hash is None:
+                    content_hash = _file_sha256(backing_path)
+            except OSError:
+                size = mtime_ns = content_hash = None
+        meta.content_hash = content_hash
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {_CATALOG_TABLE} VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    source_id, backing_key, meta.path.name, meta.view_name,
+                    size, mtime_ns, content_hash, meta.ingested_at.isoformat(),
+                ],
+            )
+
+    def _forget_catalog(self, source_id: str) -> None:
+        """Remove a source's catalog row (no-op in memory mode)."""
+        if not self._persistent:
+            return
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {_CATALOG_TABLE} WHERE source_id = ?", [source_id])
+
+    def _catalog_entry_is_current(self, entry: dict, storage_path: str, local_path: Path) -> bool:
+        """Return True if the stored file still matches the catalog fingerprint.
+
+        Size and mtime are checked first; when only the mtime differs (e.g. the
+        S3 local cache was re-downloaded) the content hash decides.
+        """
+        if entry["storage_path"] != storage_path:
+            return False
+        try:
+            size, mtime_ns = _file_fingerprint(local_path)
+        except OSError:
+            return False
+        if size != entry["file_size"]:
+            return False
+        if mtime_ns == entry["file_mtime_ns"]:
+            return True
+        if not entry["content_hash"] or _file_sha256(local_path) != entry["content_hash"]:
+            return False
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE {_CATALOG_TABLE} SET file_mtime_ns = ? WHERE source_id = ?",
+                [mtime_ns, entry["source_id"]],
+            )
+        return True
+
+    def _restore_from_catalog(self, source_id: str, entry: dict, meta: SourceMeta) -> None:
+        """Register a source whose table already exists in the on-disk database.
+
+        ``meta`` describes the source's files; its view name and ingest time
+        come from the catalog row.
+        """
+        table_name = f"src_{source_id}"
+        view_name = entry["view_name"]
+        if view_name:
+            try:
+                with self._lock:
+                    self._conn.execute(
+                        f'CREATE OR REPLACE VIEW "{view_name}" AS SELECT * FROM {table_name}'
+                    )
+            except duckdb.Error:
+                view_name = None
+        if not view_name:
+            view_name = self._create_friendly_view(source_id, table_name, entry["filename"])
+        meta.ingested_at = datetime.fromisoformat(entry["ingested_at"])
+        meta.view_name = view_name
+        meta.content_hash = entry["content_hash"]
+        self._sources[source_id] = meta
+        if view_name != entry["view_name"]:
+            self._record_catalog(source_id, content_hash=entry["content_hash"])
 
     def _make_view_name(self, filename: str) -> str:
         """Derive a unique, SQL-safe view name from a filename.
@@ -115,63 +591,342 @@ class DuckDBService:
             except Exception:
                 pass
 
-    def _reload_uploaded_sources(self) -> None:
-        """Re-ingest all CSVs from uploads/ on startup.
+    def _run_startup_reload(self) -> None:
+        try:
+            self._reload_uploaded_sources()
+        except Exception as e:
+            print(f"[DuckDB] Startup reload failed: {e}")
+        finally:
+            # Never leave queries waiting on a reload that stopped
+            with self._reload_lock:
+                for event in self._reload.pending.values():
+                    event.set()
+                self._reload.pending.clear()
+                self._reload.finished = self._reload.finished or time.monotonic()
+            self._reload.planned.set()
+            self._reload.done.set()
 
-        Each subdirectory name is the original source_id. This ensures charts
-        that reference src_{source_id} tables survive server restarts.
+    def _reload_uploaded_sources(self) -> None:
+        """Reload every source in uploads/ on startup (runs on a background thread).
+
+        Each subdirectory name is the original source_id. Tables are loaded
+        from the source's Parquet copy; a directory holding only a CSV (stored
+        before Parquet became the canonical format) is parsed once and gets
+        its Parquet copy written. This ensures charts that reference
+        src_{source_id} tables survive server restarts.
+
+        Sources are loaded by ``DUCKDB_RELOAD_WORKERS`` threads, hot sources
+        first (see _reload_order); a query for a source that is still queued
+        moves it to the front and waits for it. Progress is reported by
+        reload_status().
         """
         all_files = self._storage.list("uploads")
-        if not all_files:
-            return
 
-        # Group files by source_id subdirectory, pick only .csv files
-        csv_by_source: dict[str, str] = {}  # source_id -> storage path
+        # Group files by source_id subdirectory: the first .csv and .parquet of each
+        files_by_source: dict[str, dict[str, str]] = {}  # source_id -> {"csv"|"parquet": storage path}
         for fpath in sorted(all_files):
             # fpath is like "uploads/<source_id>/file.csv"
             parts = fpath.split("/")
             if len(parts) < 3:
                 continue
             source_id = parts[1]
-            filename = parts[2]
+            filename = parts[2].lower()
             if not _SAFE_SOURCE_ID_RE.match(source_id):
                 print(f"[DuckDB] Skipping unsafe source_id directory: {source_id!r}")
                 continue
-            if filename.lower().endswith(".csv") and source_id not in csv_by_source:
-                csv_by_source[source_id] = fpath
-
-        count = 0
-        for source_id, storage_path in sorted(csv_by_source.items()):
-            local_path = self._storage.get_local_path(storage_path)
-            table_name = f"src_{source_id}"
-            try:
-                delimiter = self._detect_delimiter(local_path)
+            kind = "csv" if filename.endswith(".csv") else "parquet" if filename.endswith(".parquet") else None
+            if kind:
+                files_by_source.setdefault(source_id, {}).setdefault(kind, fpath)
+
+        catalog = self._load_catalog()
+        existing_tables = self._existing_tables() if self._persistent else set()
+
+        # Sources without a stored file live only in the database. They are
+        # cheap to restore, so do it before lookups stop waiting on the plan.
+        reused = 0
+        leftover = {}
+        for source_id, entry in catalog.items():
+            if source_id in files_by_source:
+                continue  # Consumed by the workers
+            if entry["storage_path"] is None and f"src_{source_id}" in existing_tables:
                 with self._lock:
-                    self._conn.execute(f"""
-                        CREATE OR REPLACE TABLE {table_name} AS
-                        SELECT * FROM read_csv_auto('{_sql_string(str(local_path))}', delim='{delimiter}', header=true)
-                    """)
-                filename = local_path.name
-                view_name = self._create_friendly_view(source_id, table_name, filename)
-                self._sources[source_id] = SourceMeta(
-                    path=local_path,
-                    ingested_at=datetime.fromtimestamp(local_path.stat().st_mtime, tz=timezone.utc),
-                    view_name=view_name,
-                )
-                count += 1
-            except (duckdb.Error, UnicodeDecodeError, ValueError) as e:
-                print(f"[DuckDB] Skipping {source_id}/{local_path.name}: {e}")
+                    self._restore_from_catalog(
+                        source_id, entry,
+                        SourceMeta(path=Path(entry["filename"]), ingested_at=datetime.now(timezone.utc)),
+                    )
+                reused += 1
+            else:
+                leftover[source_id] = entry
+
+        order, hot = self._reload_order(set(files_by_source))
+        with self._reload_lock:
+            self._reload.total = len(order)
+            self._reload.hot = hot
+            self._reload.pending = {sid: threading.Event() for sid in order}
+            # What find_source_by_filename() will match once each source loads
+            self._reload.names = {
+                sid: Path(files.get("csv") or files["parquet"]).name for sid, files in files_by_source.items()
+            }
+            self._reload_queue = [(rank, rank, sid) for rank, sid in enumerate(order)]
+            heapq.heapify(self._reload_queue)
+        self._reload.planned.set()
+
+        outcomes: dict[str, int] = {"loaded": 0, "migrated": 0, "reused": 0, "skipped": 0}
+
+        def work() -> None:
+            while True:
+                with self._reload_lock:
+                    source_id = None
+                    while self._reload_queue:
+                        _, _, candidate = heapq.heappop(self._reload_queue)
+                        if candidate in self._reload.pending and candidate not in self._reload.running:
+                            source_id = candidate
+                            self._reload.running.add(source_id)
+                            break
+                if source_id is None:
+                    return
+                outcome = None
+                try:
+                    outcome = self._reload_one(
+                        source_id, files_by_source[source_id], catalog.get(source_id), existing_tables,
+                    )
+                except (duckdb.Error, OSError, UnicodeDecodeError, ValueError) as e:
+                    print(f"[DuckDB] Skipping {source_id}: {e}")
+                except Exception as e:
+                    print(f"[DuckDB] Skipping {source_id}: unexpected error: {e}")
+                with self._reload_lock:
+                    self._reload.running.discard(source_id)
+                    event = self._reload.pending.pop(source_id)
+                    if outcome:
+                        outcomes[outcome] += 1
+                        self._reload.loaded += 1
+                    else:
+                        self._reload.failed += 1
+                event.set()
+
+        workers = [
+            threading.Thread(target=work, name=f"duckdb-reload-{i}", daemon=True)
+            for i in range(min(_reload_workers(), len(order)))
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        reused += outcomes["reused"]
+        if self._persistent:
+            # Everything else left in the catalog has lost its file
+            for source_id, entry in leftover.items():
+                self._drop_orphan(source_id, entry["view_name"])
+            for table_name in existing_tables:
+                if table_name.startswith("src_") and table_name[4:] not in self._sources:
+                    self._drop_orphan(table_name[4:], None)
+
+        with self._reload_lock:
+            self._reload.finished = time.monotonic()
+            elapsed = self._reload.finished - self._reload.started
+        if outcomes["loaded"]:
+            how = "Registered" if self._lazy_mode else "Reloaded"
+            print(f"[DuckDB] {how} {outcomes['loaded']} source(s) from Parquet")
+        if outcomes["migrated"]:
+            print(f"[DuckDB] Converted {outcomes['migrated']} CSV-only source(s) to Parquet")
+        if reused:
+            print(f"[DuckDB] Reused {reused} unchanged source(s) from {self._database}")
+        if order:
+            print(f"[DuckDB] Startup reload finished in {elapsed:.1f} s "
+                  f"({len(hot)} hot, {self._reload.failed} failed, {len(workers)} worker(s))")
+
+    def _reload_one(
+        self,
+        source_id: str,
+        files: dict[str, str],
+        entry: dict | None,
+        existing_tables: set[str],
+    ) -> str:
+        """Load one source at startup; returns "loaded", "migrated", "reused" or "skipped"."""
+        if source_id in self._sources:
+            return "skipped"  # Re-ingested since the reload started
+        csv_key = files.get("csv")
+        parquet_key = files.get("parquet")
+        table_name = f"src_{source_id}"
+        if parquet_key:
+            parquet_path = self._storage.get_local_path(parquet_key)
+            meta = SourceMeta(
+                # The CSV (if kept) names the source; it is not downloaded
+                path=parquet_path.with_name(Path(csv_key).name) if csv_key else parquet_path,
+                ingested_at=datetime.fromtimestamp(parquet_path.stat().st_mtime, tz=timezone.utc),
+                storage_path=csv_key or parquet_key,
+                parquet_key=parquet_key,
+                parquet_path=parquet_path,
+            )
+            if (
+                entry
+                and table_name in existing_tables
+                and self._catalog_entry_is_current(entry, parquet_key, parquet_path)
+            ):
+                with self._lock:
+                    self._restore_from_catalog(source_id, entry, meta)
+                return "reused"
+            relation = "VIEW" if self._lazy_mode else "TABLE"
+            # A cursor of its own, so sources load in parallel rather than queueing on self._lock
+            with self._side_cursor() as cursor:
+                cursor.execute(f"""
+                    CREATE OR REPLACE {relation} {table_name} AS
+                    SELECT * FROM read_parquet('{_sql_string(str(parquet_path))}')
+                """)
+            if self._lazy_mode:
+                with self._lazy_lock:
+                    self._lazy_hits[source_id] = 0
+            outcome = "loaded"
+        else:
+            local_path = self._storage.get_local_path(csv_key)
+            self._load_csv(table_name, local_path)
+            meta = SourceMeta(
+                path=local_path,
+                ingested_at=datetime.fromtimestamp(local_path.stat().st_mtime, tz=timezone.utc),
+                storage_path=csv_key,
+            )
+            self._persist_parquet(source_id, meta)
+            outcome = "migrated"
+        with self._lock:
+            if source_id in self._sources:
+                return "skipped"
+            # View names are deduplicated against registered sources
+            meta.view_name = self._create_friendly_view(source_id, table_name, meta.path.name)
+            self._sources[source_id] = meta
+        self._record_catalog(source_id)
+        return outcome
+
+    def _reload_order(self, source_ids: set[str]) -> tuple[list[str], set[str]]:
+        """Order sources for the startup reload and pick the hot ones.
+
+        Hot sources are those behind published dashboards and charts, and
+        those queried in the last _HOT_ACCESS_DAYS days (most recent first);
+        they load first and gate reload_status()["ready"]. The rest follow
+        in id order.
+        """
+        published: set[str] = set()
+        try:
+            # Imported here: the storage modules are only needed for this
+            from api.services.chart_storage import list_charts
+            from api.services.dashboard_storage import list_dashboards
+
+            charts = list_charts()
+            chart_sources = {c.id: c.source_id for c in charts}
+            published.update(c.source_id for c in charts if c.status == "published")
+            for dashboard in list_dashboards():
+                if dashboard.status != "published":
+                    continue
+                for ref in dashboard.charts:
+                    sid = chart_sources.get(ref.get("chart_id"))
+                    if sid:
+                        published.add(sid)
+        except Exception as e:
+            print(f"[DuckDB] Could not read dashboards to prioritise reload: {e}")
+
+        cutoff = time.time() - _HOT_ACCESS_DAYS * 86400
+        recent = sorted(
+            (sid for sid, at in self._access_log.items() if at >= cutoff and sid in source_ids),
+            key=lambda sid: self._access_log[sid],
+            reverse=True,
+        )
+        first = sorted(published & source_ids)
+        order = first + [sid for sid in recent if sid not in published]
+        hot = set(order)
+        order += sorted(source_ids - hot)
+        return order, hot
+
+    def _await_source(self, source_id: str) -> None:
+        """If ``source_id`` is still queued for the startup reload, load it next and wait."""
+        if not self._reload.planned.is_set():
+            self._reload.planned.wait(_RELOAD_WAIT_S)
+        with self._reload_lock:
+            event = self._reload.pending.get(source_id)
+            if event is None:
+                return
+            if source_id not in self._reload.running:
+                heapq.heappush(self._reload_queue, (-1, -1, source_id))
+        if not event.wait(_RELOAD_WAIT_S):
+            print(f"[DuckDB] Gave up waiting {_RELOAD_WAIT_S:g} s for {source_id} to reload")
+
+    def _pending_named(self, filename: str) -> list[str]:
+        """Sources queued for the startup reload that will register under ``filename``."""
+        if not self._reload.planned.is_set():
+            self._reload.planned.wait(_RELOAD_WAIT_S)
+        with self._reload_lock:
+            return [
+                sid for sid in self._reload.pending
+                if (name := self._reload.names.get(sid)) and filename in (name, Path(name).stem)
+            ]
+
+    def reload_status(self) -> dict:
+        """Startup reload progress; ``ready`` once every hot source has been attempted.
+
+        Sources that are still loading do not make lookups miss: queries and
+        lookups by id or filename wait for them (see _await_source), and
+        list_source_ids() waits for the whole reload.
+        """
+        with self._reload_lock:
+            progress = self._reload
+            pending = set(progress.pending)
+            hot_pending = len(progress.hot & pending)
+            end = progress.finished or time.monotonic()
+            return {
+                "ready": progress.planned.is_set() and hot_pending == 0,
+                "complete": progress.finished is not None,
+                "loaded": progress.loaded,
+                "failed": progress.failed,
+                "total": progress.total,
+                "hot_loaded": len(progress.hot) - hot_pending,
+                "hot_total": len(progress.hot),
+                "elapsed_s": round(end - progress.started, 2),
+            }
+
+    def _record_access(self, source_id: str) -> None:
+        """Note that a source was queried (orders the next startup reload)."""
+        now = time.time()
+        self._access_log[source_id] = now
+        if now - self._access_flushed < _ACCESS_FLUSH_S:
+            return
+        self._access_flushed = now
+        cutoff = now - _HOT_ACCESS_DAYS * 86400
+        snapshot = {sid: at for sid, at in list(self._access_log.items()) if at >= cutoff}
+        try:
+            self._storage.write_text(_ACCESS_LOG_KEY, json.dumps(snapshot))
+        except Exception as e:
+            print(f"[DuckDB] Could not save source access times: {e}")
 
-        if count:
-            print(f"[DuckDB] Reloaded {count} CSV source(s) from disk")
+    def _load_access_log(self) -> dict[str, float]:
+        try:
+            data = json.loads(self._storage.read_text(_ACCESS_LOG_KEY))
+            return {str(k): float(v) for k, v in data.items()}
+        except FileNotFoundError:
+            return {}
+        except (ValueError, TypeError, AttributeError) as e:
+            print(f"[DuckDB] Ignoring unreadable {_ACCESS_LOG_KEY}: {e}")
+            return {}
+
+    def _drop_orphan(self, source_id: str, view_name: str | None) -> None:
+        """Drop a persisted table/view whose source no longer exists in storage."""
+        with self._lock:
+            try:
+                if view_name:
+                    self._conn.execute(f'DROP VIEW IF EXISTS "{view_name}"')
+                self._conn.execute(f'DROP TABLE IF EXISTS "src_{source_id}"')
+            except duckdb.Error as e:
+                print(f"[DuckDB] Could not drop orphaned source {source_id}: {e}")
+        self._forget_catalog(source_id)
 
     def ingest_csv(self, file_path: Path, filename: str, *, source_id: str | None = None) -> SourceSchema:
         """Load a CSV file into DuckDB and return schema information.
 
-        If the initial parse fails (e.g. extra header/metadata lines), retries
-        by skipping 1–5 leading rows before giving up.
+        The dialect (delimiter, quoting, leading metadata lines to skip,
+        header) and column types are sniffed once from the head of the file,
+        then the file is parsed exactly once (see _load_csv).
 
-        Pass an existing ``source_id`` to reuse it (e.g. when replacing a file).
+        ``file_path`` is moved into storage, not copied; stage it with
+        ``storage.staging_path()`` to make that a rename. Pass an existing
+        ``source_id`` to reuse it (e.g. when replacing a file).
         """
         source_id = source_id or uuid.uuid4().hex[:12]
 
@@ -180,120 +935,195 @@ class DuckDBService:
         if not safe_filename:
             safe_filename = "upload.csv"
         storage_key = f"uploads/{source_id}/{safe_filename}"
-        # Write to storage first (so S3 has the file before get_local_path tries to read it)
-        self._storage.write(storage_key, file_path.read_bytes())
+        # Move into storage first (so S3 has the file before get_local_path tries to read it)
+        self._storage.write_file(storage_key, file_path)
+        return self.ingest_stored_csv(storage_key, filename, source_id=source_id)
+
+    def ingest_stored_csv(self, storage_key: str, filename: str, *, source_id: str) -> SourceSchema:
+        """Load a CSV already stored at ``storage_key`` (``uploads/<source_id>/...``).
+
+        Used by ingest_csv and by resumable uploads, whose chunks are
+        assembled in storage. The table is built as a shadow and swapped in
+        (see _swap_in), so an existing source keeps serving until then. On
+        failure a new source's files are deleted; a source being replaced
+        keeps its table and loses only the bad file.
+        """
         stored_path = self._storage.get_local_path(storage_key)
 
         table_name = f"src_{source_id}"
+        shadow = _shadow_table(source_id)
 
-        # Detect delimiter
-        delimiter = self._detect_delimiter(stored_path)
-
-        # Try parsing, retrying with skip=N if the file has extra lines at the top
-        first_error = None
         success = False
         try:
-            for skip in [0, 1, 2, 3, 4, 5]:
-                try:
-                    skip_clause = f", skip={skip}" if skip > 0 else ""
-                    with self._lock:
-                        self._conn.execute(f"""
-                            CREATE OR REPLACE TABLE {table_name} AS
-                            SELECT * FROM read_csv_auto(
-                                '{_sql_string(str(stored_path))}', delim='{delimiter}', header=true{skip_clause}
-                            )
-                        """)
-                        # Verify we got at least 1 column and 1 row
-                        row_count = self._conn.execute(
-                            f"SELECT COUNT(*) FROM {table_name}"
-                        ).fetchone()[0]
-                        col_count = len(self._conn.execute(
-                            f"DESCRIBE {table_name}"
-                        ).fetchall())
-                    if col_count >= 1 and row_count >= 1:
-                        if skip > 0:
-                            print(f"[DuckDB] Parsed {filename} after skipping {skip} leading line(s)")
-                        success = True
-                        break
-                except (duckdb.Error, UnicodeDecodeError) as e:
-                    if first_error is None:
-                        first_error = e
-                    continue
+            try:
+                self._load_csv(shadow, stored_path, label=filename)
+                with self._side_cursor() as cursor:
+                    # Verify we got at least 1 column and 1 row
+                    row_count = cursor.execute(f"SELECT COUNT(*) FROM {shadow}").fetchone()[0]
+                    col_count = len(cursor.execute(f"DESCRIBE {shadow}").fetchall())
+                success = col_count >= 1 and row_count >= 1
+            except (duckdb.Error, UnicodeDecodeError) as e:
+                print(f"[DuckDB] Could not parse {filename}: {str(e).splitlines()[0]}")
         except BaseException:
             # Unexpected error (OSError, MemoryError, etc.) — clean up files and table
-            self._storage.delete_tree(f"uploads/{source_id}")
-            try:
-                with self._lock:
-                    self._conn.execute(f"DROP TABLE IF EXISTS {table_name}")
-            except Exception:
-                pass
+            self._discard_failed_build(source_id, storage_key)
             raise
 
         if not success:
-            # All attempts failed — clean up and raise a user-friendly message
-            self._storage.delete_tree(f"uploads/{source_id}")
-            try:
-                with self._lock:
-                    self._conn.execute(f"DROP TABLE IF EXISTS {table_name}")
-            except Exception:
-                pass
+            # Parsing failed — clean up and raise a user-friendly message
+            self._discard_failed_build(source_id, storage_key)
             raise ValueError(
                 f"Could not parse \"{filename}\". "
                 "Check that the file is a valid CSV with a header row."
             )
 
-        # Register source only after successful table creation
-        view_name = self._create_friendly_view(source_id, table_name, filename)
-        self._sources[source_id] = SourceMeta(
+        # Swap the new table in and register it only after it was built
+        self._swap_in(source_id)
+        meta = SourceMeta(
             path=stored_path,
             ingested_at=datetime.now(timezone.utc),
-            view_name=view_name,
+            view_name=self._friendly_view_for(source_id, table_name, filename),
+            storage_path=storage_key,
         )
+        self._persist_parquet(source_id, meta)
+        self._sources[source_id] = meta
+        self._results.invalidate_source(source_id)
+        self._record_catalog(source_id)
+        self._track_materialized(source_id)
 
         # Get schema info
         schema = self._inspect_table(table_name, source_id, filename)
+        self._remember_profile(source_id, self._sources[source_id], schema)
         return schema
 
-    def ingest_parquet(self, parquet_path: Path, table_name_hint: str, *, source_id: str | None = None) -> SourceSchema:
-        """Load a parquet file into DuckDB and return schema information.
+    def ingest_file(self, file_path: Path, filename: str, *, source_id: str | None = None) -> SourceSchema:
+        """Load an uploaded file of any type in UPLOAD_SUFFIXES, chosen by ``filename``.
 
-        Pass an existing ``source_id`` to reuse it (e.g. when re-syncing from Snowflake).
+        Plain CSV goes through ingest_csv. Parquet, compressed CSV and
+        JSON/NDJSON are read by DuckDB's native readers straight into the
+        table and stored as Parquet only; ``file_path`` must keep the
+        original suffix (compression is detected from it) and is left for
+        the caller to delete. Raises ValueError if the file cannot be read.
         """
-        source_id = source_id or uuid.uuid4().hex[:12]
-        table_name = f"src_{source_id}"
+        stem, suffix = split_upload_name(filename)
+        if suffix is None:
+            raise ValueError(f"Unsupported file type: {Path(filename).name}")
+        if suffix == ".csv":
+            return self.ingest_csv(file_path, filename, source_id=source_id)
+
+        path_sql = _sql_string(str(file_path))
+        readers = {
+            ".parquet": f"read_parquet('{path_sql}')",
+            ".json": f"read_json('{path_sql}', format = 'auto')",
+            ".ndjson": f"read_json('{path_sql}', format = 'newline_delimited')",
+        }
+
+        def load(table_name: str) -> None:
+            if suffix in readers:
+                with self._lock:
+                    self._conn.execute(f"CREATE OR REPLACE TABLE {table_name} AS SELECT * FROM {readers[suffix]}")
+            else:
+                self._load_csv(table_name, file_path, label=filename)
 
         try:
+            return self._ingest_table(load, stem, source_id=source_id)
+        except duckdb.Error as e:
+            detail = str(e).splitlines()[0].replace(str(file_path), Path(filename).name)
+            raise ValueError(f"Could not read \"{Path(filename).name}\": {detail}") from e
+
+    def ingest_parquet(self, parquet_path: Path, table_name_hint: str, *, source_id: str | None = None) -> SourceSchema:
+        """Load a parquet file into DuckDB and return schema information.
+
+        The table is stored as ``uploads/<id>/<name>.parquet`` so it survives
+        restarts; ``parquet_path`` itself may be a temp file. Pass an existing
+        ``source_id`` to reuse it (e.g. when re-syncing from Snowflake).
+        """
+        def load(table_name: str) -> None:
             with self._lock:
                 self._conn.execute(f"""
                     CREATE OR REPLACE TABLE {table_name} AS
                     SELECT * FROM read_parquet('{_sql_string(str(parquet_path))}')
                 """)
-            # Store a clean synthetic path based on the friendly name (the temp
-            # file is deleted immediately after ingest, so its path is useless).
-            # Deduplicate: if "orders.csv" exists, try "orders_2.csv", etc.
+
+        return self._ingest_table(load, table_name_hint, source_id=source_id)
+
+    def ingest_query(self, sql: str, source_id: str, table_name_hint: str) -> SourceSchema:
+        """Materialize the result of a read-only query on ``source_id`` as a new source.
+
+        The table is built in DuckDB with ``CREATE TABLE ... AS <query>``, so
+        column types carry over exactly and no rows pass through Python; it
+        is then stored as Parquet like any other table-only source. Raises
+        ValueError if the SQL is not read-only or returns no rows.
+        """
+        if not _SAFE_SOURCE_ID_RE.match(source_id):
+            raise ValueError(f"Invalid source_id: {source_id}")
+        self._await_source(source_id)
+        self._record_access(source_id)
+        processed_sql = self._rewrite_source_sql(sql, source_id)
+
+        def load(table_name: str) -> None:
+            with self._side_cursor() as cursor, _interruptible(cursor):
+                cursor.execute(f"CREATE OR REPLACE TABLE {table_name} AS {processed_sql}")
+                if cursor.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0] == 0:
+                    raise ValueError("Query returned no data")
+
+        return self._ingest_table(load, table_name_hint)
+
+    def _ingest_table(
+        self,
+        load: Callable[[str], None],
+        table_name_hint: str,
+        *,
+        source_id: str | None = None,
+    ) -> SourceSchema:
+        """Create a source whose table is built by ``load(table_name)`` and stored as Parquet only."""
+        source_id = source_id or uuid.uuid4().hex[:12]
+        table_name = f"src_{source_id}"
+        replacing = source_id in self._sources
+
+        try:
+            load(_shadow_table(source_id))
+            self._swap_in(source_id)
+            # Name the source after the friendly name (the temp file is
+            # deleted immediately after ingest, so its path is useless).
+            # Deduplicate: if "orders.parquet" exists, try "orders_2.parquet", etc.
             clean_stem = re.sub(r'[^\w\s-]', '', table_name_hint).strip().replace(' ', '_') or 'query_result'
-            candidate = f"{clean_stem}.csv"
+            candidate = f"{clean_stem}.parquet"
             existing_names = {m.path.name for sid, m in self._sources.items() if sid != source_id}
             if candidate in existing_names:
                 n = 2
-                while f"{clean_stem}_{n}.csv" in existing_names:
+                while f"{clean_stem}_{n}.parquet" in existing_names:
                     n += 1
-                candidate = f"{clean_stem}_{n}.csv"
-            view_name = self._create_friendly_view(source_id, table_name, candidate)
-            self._sources[source_id] = SourceMeta(
+                candidate = f"{clean_stem}_{n}.parquet"
+            view_name = self._friendly_view_for(source_id, table_name, candidate)
+            meta = SourceMeta(
                 path=Path(candidate),
                 ingested_at=datetime.now(timezone.utc),
                 view_name=view_name,
             )
+            # The table replaces whatever was stored for this source before
+            for stale in self._storage.list(f"uploads/{source_id}/"):
+                if stale.lower().endswith(".csv"):
+                    self._storage.delete(stale)
+            if self._persist_parquet(source_id, meta):
+                meta.path = meta.parquet_path
+                meta.storage_path = meta.parquet_key
+            self._sources[source_id] = meta
+            self._results.invalidate_source(source_id)
+            self._record_catalog(source_id)
+            self._track_materialized(source_id)
             schema = self._inspect_table(table_name, source_id, candidate)
+            self._remember_profile(source_id, self._sources[source_id], schema)
             return schema
         except Exception:
-            self._sources.pop(source_id, None)
-            try:
-                with self._lock:
-                    self._conn.execute(f"DROP TABLE IF EXISTS {table_name}")
-            except Exception:
-                pass
+            self._drop_shadow(source_id)
+            if not replacing:
+                self._sources.pop(source_id, None)
+                try:
+                    with self._lock:
+                        self._conn.execute(f"DROP TABLE IF EXISTS {table_name}")
+                except Exception:
+                    pass
             raise
 
     def ingest_from_snowflake(
@@ -431,53 +1261,172 @@ class DuckDBService:
         return self.execute_query(f"SELECT * FROM {table_name} LIMIT {limit}", source_id)
 
     def reload_source(self, source_id: str) -> None:
-        """Re-create a DuckDB table from the CSV in storage (without re-uploading).
+        """Re-create a DuckDB table from the source's files in storage (without re-uploading).
 
         Used after transforms modify the CSV in-place so the DuckDB table
-        reflects the updated file without overwriting it with a stale local cache.
+        reflects the updated file without overwriting it with a stale local
+        cache; the Parquet copy is re-exported from the new table. Sources
+        without a CSV are reloaded from their Parquet file. The old table
+        serves queries until the rebuilt one is swapped in.
         """
         if not _SAFE_SOURCE_ID_RE.match(source_id):
             raise ValueError(f"Invalid source_id: {source_id}")
 
-        # Find the CSV in storage
         prefix = f"uploads/{source_id}/"
         all_files = self._storage.list(prefix)
-        csv_path = next(
-            (f for f in all_files if f.lower().endswith(".csv")), None
-        )
-        if not csv_path:
-            raise FileNotFoundError(f"No CSV found for source {source_id}")
+        csv_path = next((f for f in all_files if f.lower().endswith(".csv")), None)
+        parquet_key = next((f for f in all_files if f.lower().endswith(".parquet")), None)
+        if not csv_path and not parquet_key:
+            raise FileNotFoundError(f"No CSV or Parquet file found for source {source_id}")
 
         # Invalidate stale local cache so S3 backend re-downloads the updated file
-        self._storage.invalidate_local_cache(csv_path)
-        local_path = self._storage.get_local_path(csv_path)
+        source_key = csv_path or parquet_key
+        self._storage.invalidate_local_cache(source_key)
+        local_path = self._storage.get_local_path(source_key)
         table_name = f"src_{source_id}"
-        delimiter = self._detect_delimiter(local_path)
+        shadow = _shadow_table(source_id)
+        try:
+            if csv_path:
+                self._load_csv(shadow, local_path)
+            else:
+                with self._side_cursor() as cursor:
+                    cursor.execute(f"""
+                        CREATE OR REPLACE TABLE {shadow} AS
+                        SELECT * FROM read_parquet('{_sql_string(str(local_path))}')
+                    """)
+        except BaseException:
+            self._drop_shadow(source_id)
+            raise
+        self._swap_in(source_id)
+        view_name = self._friendly_view_for(source_id, table_name, local_path.name)
+        meta = SourceMeta(
+            path=local_path,
+            ingested_at=datetime.now(timezone.utc),
+            view_name=view_name,
+            storage_path=source_key,
+        )
+        if csv_path:
+            self._persist_parquet(source_id, meta)
+        else:
+            meta.parquet_key, meta.parquet_path = parquet_key, local_path
+        self._sources[source_id] = meta
+        self._results.invalidate_source(source_id)
+        self._record_catalog(source_id)
+        self._track_materialized(source_id)
+
+    def drop_source(self, source_id: str) -> bool:
+        """Drop a source's table and friendly view and forget it.
+
+        Files in storage are left alone — callers delete ``uploads/<id>/``
+        themselves when the source is going away for good.
+        Returns True if the source was registered.
+        """
+        if not _SAFE_SOURCE_ID_RE.match(source_id):
+            raise ValueError(f"Invalid source_id: {source_id}")
+        self._drop_friendly_view(source_id)
+        self._drop_lazy_view(source_id)
+        with self._lazy_lock:
+            self._materialized.pop(source_id, None)
         with self._lock:
-            self._conn.execute(f"""
-                CREATE OR REPLACE TABLE {table_name} AS
-                SELECT * FROM read_csv_auto(
-                    '{_sql_string(str(local_path))}', delim='{delimiter}', header=true
+            try:
+                self._conn.execute(f"DROP TABLE IF EXISTS src_{source_id}")
+            except Exception:
+                pass
+            # Remove inside lock to avoid race with concurrent iterators
+            meta = self._sources.pop(source_id, None)
+            self._profiles.pop(source_id, None)
+            self._forget_catalog(source_id)
+        self._results.invalidate_source(source_id)
+        return meta is not None
+
+    def rename_source(self, source_id: str, new_name: str) -> Path:
+        """Rename a source's stored file (the display filename) and return the new path.
+
+        Sources stored only as Parquet keep the ``.parquet`` extension.
+        """
+        meta = self._sources.get(source_id)
+        if not meta:
+            raise KeyError(source_id)
+        old_path = meta.path
+        safe_new_name = Path(new_name).name  # sanitize
+        parquet_only = meta.parquet_key is not None and meta.storage_path == meta.parquet_key
+        if parquet_only:
+            safe_new_name = f"{Path(safe_new_name).stem}.parquet"
+        new_path = old_path.parent / safe_new_name
+        if old_path != new_path:
+            old_key = f"uploads/{source_id}/{old_path.name}"
+            new_key = f"uploads/{source_id}/{safe_new_name}"
+            self._storage.rename(old_key, new_key)
+            meta.path = new_path
+            meta.storage_path = new_key
+            if parquet_only:
+                meta.parquet_key, meta.parquet_path = new_key, new_path
+            self._record_catalog(source_id)
+        return new_path
+
+    def persist_source(self, source_id: str) -> None:
+        """Re-export a source's Parquet copy after its table was altered in place."""
+        meta = self._sources.get(source_id)
+        if meta is None or meta.parquet_key is None:
+            return
+        self._persist_parquet(source_id, meta)
+        self._record_catalog(source_id)
+
+    def ensure_csv(self, source_id: str) -> tuple[Path, str]:
+        """Return ``(local_path, storage_key)`` of the source's CSV, exporting one if needed.
+
+        Sources stored only as Parquet (synced tables) get a CSV written from
+        their table, which then becomes the file transforms edit.
+        """
+        meta = self._sources.get(source_id)
+        if meta is None:
+            raise KeyError(source_id)
+        if meta.storage_path and meta.storage_path.lower().endswith(".csv"):
+            return meta.path, meta.storage_path
+        storage_key = f"uploads/{source_id}/{meta.path.stem}.csv"
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp_path = Path(tmp_dir) / "export.csv"
+            with self._lock:
+                self._conn.execute(
+                    f"COPY src_{source_id} TO '{_sql_string(str(tmp_path))}' (FORMAT csv, HEADER)"
                 )
-            """)
-        # Preserve existing view name if present, otherwise create new one
-        old_meta = self._sources.get(source_id)
-        old_view = old_meta.view_name if old_meta else None
-        if old_view:
-            # Re-create same view (table was replaced)
+            self._storage.write(storage_key, tmp_path.read_bytes())
+        self._storage.invalidate_local_cache(storage_key)
+        meta.path = self._storage.get_local_path(storage_key)
+        meta.storage_path = storage_key
+        self._record_catalog(source_id)
+        return meta.path, storage_key
+
+    def _persist_parquet(self, source_id: str, meta: SourceMeta) -> bool:
+        """Write the source's table to its canonical Parquet file and record it on ``meta``.
+
+        Returns False (leaving ``meta`` untouched) if the export fails; the
+        source still works but is reloaded from its CSV, if any.
+        """
+        storage_key = f"uploads/{source_id}/{meta.path.stem}.parquet"
+        try:
+            # COPY straight to a staging file next to the destination, then move it into place
+            staged = self._storage.staging_path(storage_key)
             try:
                 with self._lock:
                     self._conn.execute(
-                        f'CREATE OR REPLACE VIEW "{old_view}" AS SELECT * FROM {table_name}'
+                        f"COPY src_{source_id} TO '{_sql_string(str(staged))}' "
+                        f"(FORMAT parquet, COMPRESSION {_PARQUET_COMPRESSION})"
                     )
-            except Exception:
-                old_view = None
-        view_name = old_view or self._create_friendly_view(source_id, table_name, local_path.name)
-        self._sources[source_id] = SourceMeta(
-            path=local_path,
-            ingested_at=datetime.now(timezone.utc),
-            view_name=view_name,
-        )
+                self._storage.write_file(storage_key, staged)
+            finally:
+                staged.unlink(missing_ok=True)
+            # A rename changes the stem: drop copies written under the old name
+            for stale in self._storage.list(f"uploads/{source_id}/"):
+                if stale.lower().endswith(".parquet") and stale != storage_key:
+                    self._storage.delete(stale)
+            meta.parquet_path = self._storage.get_local_path(storage_key)
+        except (duckdb.Error, OSError) as e:
+            print(f"[DuckDB] Could not write Parquet copy of {source_id}: {e}")
+            return False
+        meta.parquet_key = storage_key
+        meta.content_hash = None  # The backing file changed
+        return True
 
     @staticmethod
     def _is_read_only_sql(sql: str) -> bool:
@@ -492,17 +1441,8 @@ class DuckDBService:
         m = re.match(r'\s*(\w+)', stripped)
         return bool(m) and m.group(1).upper() in ("SELECT", "WITH", "EXPLAIN")
 
-    def execute_query(self, sql: str, source_id: str, params: dict[str, str | int | float] | None = None) -> QueryResult:
-        """Execute a SQL query against an uploaded source's table.
-
-        Args:
-            sql: SQL query, optionally containing ${inputs.name} placeholders.
-            source_id: The source to query against.
-            params: Optional dict of filter param values to substitute for ${inputs.name}.
-        """
-        if not _SAFE_SOURCE_ID_RE.match(source_id):
-            raise ValueError(f"Invalid source_id: {source_id}")
-
+    def _rewrite_source_sql(self, sql: str, source_id: str) -> str:
+        """Validate read-only SQL and point its table references at ``src_<source_id>``."""
         # Enforce read-only: only SELECT / WITH / EXPLAIN are allowed
         if not self._is_read_only_sql(sql):
             raise ValueError("Only SELECT, WITH, and EXPLAIN statements are allowed.")
@@ -539,20 +1479,409 @@ class DuckDBService:
                     # No recognizable table reference found; if it's a simple query, wrap it
                     if "FROM" not in processed_sql.upper():
                         processed_sql = f"SELECT * FROM {table_name} LIMIT 100"
+        return processed_sql
+
+    def execute_query(self, sql: str, source_id: str, params: dict[str, str | int | float] | None = None) -> QueryResult:
+        """Execute a SQL query against an uploaded source's table.
+
+        Args:
+            sql: SQL query, optionally containing ${inputs.name} placeholders.
+            source_id: The source to query against.
+            params: Optional dict of filter param values to substitute for ${inputs.name}.
+        """
+        if not _SAFE_SOURCE_ID_RE.match(source_id):
+            raise ValueError(f"Invalid source_id: {source_id}")
+        self._await_source(source_id)
+        self._record_access(source_id)
+
+        processed_sql = self._rewrite_source_sql(sql, source_id)
 
-        # Substitute ${inputs.name} filter placeholders with parameterized values
+        # Compile ${inputs.name} filter placeholders to bound parameters ($1, $2, ...)
+        param_values: list[str | int | float | bool] = []
+        unbound_sql = processed_sql
         if params:
-            processed_sql = self._substitute_filter_params(processed_sql, params)
+            processed_sql, param_values = self._compile_filter_params(processed_sql, params)
+
+        # Keyed on the rewritten SQL, the params and the generation of every
+        # source read, so a rebuilt source never shares a stale result
+        flight_key = None
+        referenced = None
+        if not _VOLATILE_SQL_RE.search(processed_sql):
+            referenced = self._referenced_sources(processed_sql, source_id)
+            flight_key = (
+                processed_sql,
+                tuple(sorted((k, repr(v)) for k, v in (params or {}).items())),
+                tuple(sorted((sid, self._sources[sid].generation) for sid in referenced if sid in self._sources)),
+            )
+        cache_key = flight_key if self._results.enabled else None
+        if cache_key is not None:
+            cached = self._results.get(cache_key)
+            if cached is not None:
+                return QueryResult(columns=cached.columns, table=cached.table, column_types=cached.column_types)
+
+        if self._lazy_mode:
+            self._note_access(referenced or self._referenced_sources(processed_sql, source_id))
+
+        def run() -> tuple[list[str], list[str], "pa.Table | None"]:
+            with self._pooled_cursor() as cursor:
+                if param_values:
+                    try:
+                        result = cursor.execute(processed_sql, param_values)
+                    except (duckdb.BinderException, duckdb.InvalidInputException, duckdb.ParserException):
+                        # A placeholder in a position DuckDB cannot bind; these fail before running
+                        result = cursor.execute(self._substitute_filter_params(unbound_sql, params))
+                else:
+                    result = cursor.execute(processed_sql)
+                if result.description is None:
+                    return [], [], None
+                columns = [desc[0] for desc in result.description]
+                column_types = [str(desc[1]) for desc in result.description]
+                # to_arrow_table() supersedes fetch_arrow_table() in newer DuckDB releases
+                fetch_arrow = getattr(result, "to_arrow_table", None) or result.fetch_arrow_table
+                table = fetch_arrow()
+            if cache_key is not None:
+                self._results.put(cache_key, columns, column_types, table, referenced)
+            return columns, column_types, table
+
+        if flight_key is None:
+            columns, column_types, table = run()
+        else:
+            # A leader cancelled by its own deadline or client is retried, not shared
+            columns, column_types, table = self._in_flight.do(
+                flight_key, run,
+                check=get_query_registry().raise_if_cancelled,
+                retry_on=(QueryCancelledError,),
+            )
+        if table is None:
+            return QueryResult(columns=[], rows=[], row_count=0)
+        return QueryResult(columns=columns, table=table, column_types=column_types)
+
+    def data_version(self, sql: str, source_id: str) -> tuple | None:
+        """Versions of every source ``sql`` reads, for conditional requests.
+
+        Two calls returning the same value guarantee the query would return
+        the same rows, across restarts and on every replica sharing the
+        storage (see _source_version). Returns None when that cannot be
+        shown: the SQL is invalid or volatile (random(), now(), ...), or
+        reads a source that is not loaded.
+        """
+        if not _SAFE_SOURCE_ID_RE.match(source_id):
+            return None
+        self._await_source(source_id)
+        try:
+            processed_sql = self._rewrite_source_sql(sql, source_id)
+        except ValueError:
+            return None
+        if _VOLATILE_SQL_RE.search(processed_sql):
+            return None
+        versions = []
+        for sid in sorted(self._referenced_sources(processed_sql, source_id)):
+            meta = self._sources.get(sid)
+            version = self._source_version(meta) if meta else None
+            if version is None:
+                return None
+            versions.append((sid, version))
+        return tuple(versions)
+
+    def _source_version(self, meta: SourceMeta) -> str | None:
+        """Persisted fingerprint of a source's data (None if it cannot be read).
+
+        For file-backed sources this is the SHA-256 of the file the table is
+        loaded from (the Parquet copy when there is one): it comes from the
+        catalog or is hashed once per registration, and is reset whenever that
+        file is rewritten. Sources that live only in the database use their
+        catalog ingest time.
+        """
+        if meta.content_hash is None:
+            storage_key, local_path = _backing_file(meta)
+            if not storage_key:
+                return f"ingested:{meta.ingested_at.isoformat()}"
+            try:
+                meta.content_hash = _file_sha256(local_path)
+            except OSError:
+                return None
+        return meta.content_hash
+
+    def _referenced_sources(self, sql: str, source_id: str) -> set[str]:
+        """Return the source_ids a query reads: its own plus any src_ tables or friendly views named in it."""
+        referenced = {source_id, *_SRC_TABLE_RE.findall(sql)}
+        identifiers = set(_IDENTIFIER_RE.findall(sql.lower()))
+        for sid, meta in list(self._sources.items()):
+            if meta.view_name and meta.view_name in identifiers:
+                referenced.add(sid)
+        return referenced
+
+    def result_cache_metrics(self) -> dict:
+        """Hit/miss counts and memory use of the query result cache."""
+        return self._results.metrics()
+
+    def coalescing_metrics(self) -> dict:
+        """How many execute_query calls shared an identical in-flight query."""
+        return self._in_flight.metrics()
+
+    def memory_usage(self) -> dict:
+        """Current DuckDB memory use, overall and estimated per table.
+
+        Table sizes are estimated from each table's storage segments: on-disk
+        blocks for persisted data, value count x type width for in-memory
+        segments (string payloads past the 12-byte inline limit and indexes
+        are not included). ``components`` is DuckDB's own buffer accounting.
+        """
+        with self.query_cursor() as cursor:
+            settings = dict(zip(
+                _RESOURCE_SETTINGS,
+                cursor.execute(
+                    "SELECT " + ", ".join(f"current_setting('{name}')" for name in _RESOURCE_SETTINGS)
+                ).fetchone(),
+            ))
+            db_size = cursor.execute(
+                "SELECT block_size, memory_usage, memory_limit FROM pragma_database_size() "
+                "WHERE database_name = current_database()"
+            ).fetchone()
+            block_size = db_size[0] if db_size else 0
+            components = [
+                {"tag": tag, "memory_bytes": mem, "temporary_storage_bytes": tmp}
+                for tag, mem, tmp in cursor.execute(
+                    "SELECT tag, memory_usage_bytes, temporary_storage_bytes FROM duckdb_memory() "
+                    "WHERE memory_usage_bytes > 0 OR temporary_storage_bytes > 0 "
+                    "ORDER BY memory_usage_bytes DESC"
+                ).fetchall()
+            ]
+            spill = cursor.execute("SELECT count(*), coalesce(sum(size), 0) FROM duckdb_temporary_files()").fetchone()
+            table_rows = cursor.execute(
+                "SELECT table_name, estimated_size, column_count FROM duckdb_tables() "
+                "WHERE schema_name = 'main' AND database_name = current_database()"
+            ).fetchall()
+            tables = []
+            for name, rows, columns in table_rows:
+                if name.startswith("_sa_"):
+                    continue
+                source_id = name[4:] if name.startswith("src_") else None
+                meta = self._sources.get(source_id) if source_id else None
+                tables.append({
+                    "table": name,
+                    "source_id": source_id if meta else None,
+                    "filename": meta.path.name if meta else None,
+                    "rows": rows,
+                    "columns": columns,
+                    "estimated_bytes": self._estimate_table_bytes(cursor, name, block_size),
+                })
+        tables.sort(key=lambda t: t["estimated_bytes"], reverse=True)
+        usage = {
+            "settings": settings,
+            "memory_usage": db_size[1] if db_size else None,
+            "memory_limit": db_size[2] if db_size else settings["memory_limit"],
+            "components": components,
+            "spill_files": spill[0],
+            "spill_bytes": spill[1],
+            "tables": tables,
+        }
+        if self._lazy_mode:
+            with self._lazy_lock:
+                usage["lazy_sources"] = {
+                    "views": len(self._lazy_hits),
+                    "materialized": len(self._materialized),
+                    "materialized_bytes": sum(self._materialized.values()),
+                    "budget_bytes": _lazy_memory_budget(),
+                    "promote_after": _lazy_promote_after(),
+                }
+        return usage
 
+    @staticmethod
+    def _estimate_table_bytes(conn: duckdb.DuckDBPyConnection, table_name: str, block_size: int) -> int:
+        """Estimate a table's size from its segments (see memory_usage)."""
+        widths = " ".join(f"WHEN '{t}' THEN {w}" for t, w in _SEGMENT_WIDTHS.items())
+        blocks, in_memory = conn.execute(
+            f"SELECT count(DISTINCT block_id), "
+            f"coalesce(sum(count * CASE segment_type {widths} ELSE 16 END) "
+            f"FILTER (WHERE block_id IS NULL), 0) "
+            f"FROM pragma_storage_info('{_sql_string(table_name)}')"
+        ).fetchone()
+        return int(blocks * block_size + in_memory)
+
+    # ── Lazy sources ────────────────────────────────────────────────────────
+
+    def materialize_source(self, source_id: str) -> None:
+        """Load a lazily registered source into a table (e.g. before ALTER TABLE)."""
+        if source_id in self._lazy_hits:
+            self._promote(source_id)
+
+    def _note_access(self, source_ids: set[str]) -> None:
+        """Count a query against lazy sources and promote the ones that became hot."""
+        promote = []
+        with self._lazy_lock:
+            for sid in source_ids:
+                if sid in self._materialized:
+                    self._materialized.move_to_end(sid)
+                elif sid in self._lazy_hits:
+                    self._lazy_hits[sid] += 1
+                    if self._lazy_hits[sid] >= _lazy_promote_after():
+                        promote.append(sid)
+        for sid in promote:
+            self._promote(sid)
+
+    def _promote(self, source_id: str) -> None:
+        """Replace a source's Parquet view with an in-memory table."""
+        meta = self._sources.get(source_id)
         with self._lock:
-            result = self._conn.execute(processed_sql)
-            if result.description is None:
-                return QueryResult(columns=[], rows=[], row_count=0)
-            columns = [desc[0] for desc in result.description]
-            rows_raw = result.fetchall()
-        rows = [dict(zip(columns, row)) for row in rows_raw]
+            if source_id not in self._lazy_hits or meta is None or meta.parquet_path is None:
+                return
+            table_name = f"src_{source_id}"
+            try:
+                self._conn.execute("BEGIN TRANSACTION")
+                self._conn.execute(f"DROP VIEW IF EXISTS {table_name}")
+                self._conn.execute(
+                    f"CREATE TABLE {table_name} AS "
+                    f"SELECT * FROM read_parquet('{_sql_string(str(meta.parquet_path))}')"
+                )
+                self._conn.execute("COMMIT")
+            except duckdb.Error as e:
+                self._conn.execute("ROLLBACK")
+                print(f"[DuckDB] Could not load {source_id} into memory: {e}")
+                with self._lazy_lock:
+                    self._lazy_hits[source_id] = 0
+                return
+            with self._lazy_lock:
+                self._lazy_hits.pop(source_id, None)
+        self._track_materialized(source_id)
+
+    def _demote(self, source_id: str) -> None:
+        """Drop a materialized source's table and register its Parquet view again."""
+        meta = self._sources.get(source_id)
+        with self._lock:
+            with self._lazy_lock:
+                if source_id not in self._materialized:
+                    return
+            if meta is None or meta.parquet_path is None:
+                return
+            table_name = f"src_{source_id}"
+            try:
+                self._conn.execute("BEGIN TRANSACTION")
+                self._conn.execute(f"DROP TABLE IF EXISTS {table_name}")
+                self._conn.execute(
+                    f"CREATE VIEW {table_name} AS "
+                    f"SELECT * FROM read_parquet('{_sql_string(str(meta.parquet_path))}')"
+                )
+                self._conn.execute("COMMIT")
+            except duckdb.Error as e:
+                self._conn.execute("ROLLBACK")
+                print(f"[DuckDB] Could not unload {source_id} from memory: {e}")
+                return
+            with self._lazy_lock:
+                self._materialized.pop(source_id, None)
+                self._lazy_hits[source_id] = 0
+
+    def _track_materialized(self, source_id: str) -> None:
+        """Account for a source's in-memory table and unload LRU tables over budget."""
+        if not self._lazy_mode:
+            return
+        meta = self._sources.get(source_id)
+        if meta is None or meta.parquet_path is None:
+            return
+        with self._lock:
+            nbytes = self._estimate_table_bytes(self._conn, f"src_{source_id}", 0)
+        budget = _lazy_memory_budget()
+        victims = []
+        with self._lazy_lock:
+            self._materialized[source_id] = nbytes
+            self._materialized.move_to_end(source_id)
+            total = sum(self._materialized.values())
+            for sid, size in self._materialized.items():
+                if total <= budget:
+                    break
+                if sid != source_id:
+                    victims.append(sid)
+                    total -= size
+        for sid in victims:
+            self._demote(sid)
+
+    def _drop_lazy_view(self, source_id: str) -> None:
+        """Drop a source's Parquet view so a table can be created under its name."""
+        with self._lazy_lock:
+            if self._lazy_hits.pop(source_id, None) is None:
+                return
+        with self._lock:
+            self._conn.execute(f"DROP VIEW IF EXISTS src_{source_id}")
+
+    # ── Copy-on-write rebuilds ──
+    #
+    # Rebuilds load into a shadow table on a cursor of their own, without
+    # self._lock, then _swap_in() replaces src_<id> in one short transaction.
+    # Queries already running finish on the old table (DuckDB keeps it for
+    # their snapshot); later ones see the new one. Friendly views bind by
+    # name, so they follow the swap.
+
+    @contextmanager
+    def _side_cursor(self):
+        """Yield a fresh cursor for building a table without holding self._lock."""
+        with self._cursor_lock:
+            cursor = self._conn.cursor()
+        try:
+            yield cursor
+        finally:
+            cursor.close()
+
+    def _swap_in(self, source_id: str) -> None:
+        """Atomically replace src_<id> (table, lazy view, or nothing) with its shadow table."""
+        table_name = f"src_{source_id}"
+        with self._lock:
+            kind = self._conn.execute(
+                "SELECT table_type FROM information_schema.tables WHERE table_name = ?", [table_name],
+            ).fetchone()
+            try:
+                self._conn.execute("BEGIN TRANSACTION")
+                if kind:
+                    self._conn.execute(f"DROP {'VIEW' if kind[0] == 'VIEW' else 'TABLE'} {table_name}")
+                self._conn.execute(f"ALTER TABLE {_shadow_table(source_id)} RENAME TO {table_name}")
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        with self._lazy_lock:
+            self._lazy_hits.pop(source_id, None)
+
+    def _drop_shadow(self, source_id: str) -> None:
+        try:
+            with self._lock:
+                self._conn.execute(f"DROP TABLE IF EXISTS {_shadow_table(source_id)}")
+        except duckdb.Error:
+            pass
 
-        return QueryResult(columns=columns, rows=rows, row_count=len(rows))
+    def _discard_failed_build(self, source_id: str, storage_key: str) -> None:
+        """Clean up after a CSV failed to load: drop the shadow and the file that caused it.
+
+        A new source loses its whole directory. A source being replaced keeps
+        serving its current table; if the bad file overwrote its CSV, it falls
+        back to its Parquet copy.
+        """
+        self._drop_shadow(source_id)
+        meta = self._sources.get(source_id)
+        if meta is None:
+            self._storage.delete_tree(f"uploads/{source_id}")
+            return
+        try:
+            self._storage.delete(storage_key)
+        except FileNotFoundError:
+            pass
+        if meta.storage_path == storage_key and meta.parquet_key:
+            meta.storage_path, meta.path = meta.parquet_key, meta.parquet_path
+            self._record_catalog(source_id)
+
+    def _friendly_view_for(self, source_id: str, table_name: str, filename: str) -> str | None:
+        """Keep a rebuilt source's existing friendly view, or create one for a new source."""
+        old_meta = self._sources.get(source_id)
+        old_view = old_meta.view_name if old_meta else None
+        if old_view:
+            # Re-create same view (table was replaced)
+            try:
+                with self._lock:
+                    self._conn.execute(
+                        f'CREATE OR REPLACE VIEW "{old_view}" AS SELECT * FROM {table_name}'
+                    )
+                return old_view
+            except Exception:
+                pass
+        return self._create_friendly_view(source_id, table_name, filename)
 
     def get_distinct_values(self, source_id: str, column: str, limit: int = 500) -> list[str]:
         """Get distinct values for a column, useful for dropdown filter options."""
@@ -560,8 +1889,11 @@ class DuckDBService:
             raise ValueError(f"Invalid source_id: {source_id}")
         limit = max(1, min(limit, 10_000))  # Clamp to prevent DoS
         table_name = f"src_{source_id}"
-        with self._lock:
-            result = self._conn.execute(
+        self._await_source(source_id)
+        if self._lazy_mode:
+            self._note_access({source_id})
+        with self.query_cursor() as cursor:
+            result = cursor.execute(
                 f"SELECT DISTINCT CAST({q(column)} AS VARCHAR) AS val "
                 f"FROM {table_name} WHERE {q(column)} IS NOT NULL "
                 f"ORDER BY val LIMIT {limit}"
@@ -574,22 +1906,47 @@ class DuckDBService:
 
         Uses DuckDB-safe string escaping (single-quote doubling) to prevent injection.
         """
-        import re as _re
-        def _replacer(match: _re.Match) -> str:
+        def _replacer(match: re.Match) -> str:
             name = match.group(1)
             if name not in params:
                 return match.group(0)  # Leave unmatched placeholders as-is
-            val = params[name]
-            # Bool check must come before int (bool is a subclass of int in Python)
-            if isinstance(val, bool):
-                return "true" if val else "false"
-            if isinstance(val, (int, float)):
-                return str(val)
-            # String: escape single quotes by doubling
-            escaped = str(val).replace("'", "''")
-            return f"'{escaped}'"
-
-        return _re.sub(r'\$\{inputs\.(\w+)\}', _replacer, sql)
+            return _sql_literal(params[name])
+
+        return _FILTER_PARAM_RE.sub(_replacer, sql)
+
+    @classmethod
+    def _compile_filter_params(
+        cls, sql: str, params: dict[str, str | int | float],
+    ) -> tuple[str, list[str | int | float | bool]]:
+        """Turn ${inputs.name} placeholders into positional parameters.
+
+        Returns ``(template, values)``: the SQL with ``$1``, ``$2``, ... (one
+        per distinct name, reused on repeats) and the values to bind to them.
+        Placeholders inside string literals or comments cannot be bound, so
+        such queries fall back to inline substitution with no parameters.
+        """
+        positions: dict[str, int] = {}
+        values: list[str | int | float | bool] = []
+
+        def _replacer(match: re.Match) -> str:
+            name = match.group(1)
+            if name is None:
+                if _FILTER_PARAM_RE.search(match.group(0)):
+                    raise _InlineParams
+                return match.group(0)  # literal or comment without placeholders
+            if name not in params:
+                return match.group(0)  # Leave unmatched placeholders as-is
+            if name not in positions:
+                value = params[name]
+                values.append(value if isinstance(value, (str, int, float, bool)) else str(value))
+                positions[name] = len(values)
+            return f"${positions[name]}"
+
+        try:
+            template = _FILTER_SCAN_RE.sub(_replacer, sql)
+        except _InlineParams:
+            return cls._substitute_filter_params(sql, params), []
+        return template, values
 
     def find_source_by_filename(self, filename: str) -> str | None:
         """Return the source_id of an existing source with this filename, or None.
@@ -597,13 +1954,36 @@ class DuckDBService:
         Matches against both the full filename (e.g. ``sales.csv``) and the
         stem without extension (e.g. ``orders`` matching ``orders.parquet``).
         """
-        for sid, meta in self._sources.items():
+        # A source still queued for the startup reload is loaded first, so a
+        # re-upload or sync replaces it instead of creating a duplicate
+        for sid in self._pending_named(filename):
+            self._await_source(sid)
+        for sid, meta in list(self._sources.items()):
             if meta.path.name == filename or meta.path.stem == filename:
                 return sid
         return None
 
+    def get_source_meta(self, source_id: str) -> SourceMeta | None:
+        """Return a source's metadata, or None if there is no such source.
+
+        Waits for the source if the startup reload has not loaded it yet.
+        """
+        self._await_source(source_id)
+        return self._sources.get(source_id)
+
+    def has_source(self, source_id: str) -> bool:
+        """Return True if the source exists (waiting for it like get_source_meta)."""
+        return self.get_source_meta(source_id) is not None
+
+    def list_source_ids(self) -> list[str]:
+        """Return the ids of all sources, once the startup reload has attempted every one."""
+        if not self._reload.done.wait(_RELOAD_WAIT_S):
+            print(f"[DuckDB] Listing sources after waiting {_RELOAD_WAIT_S:g} s for the startup reload")
+        return list(self._sources)
+
     def is_csv_source(self, source_id: str) -> bool:
         """Return True if the source is an uploaded CSV (static data)."""
+        self._await_source(source_id)
         return source_id in self._sources
 
     def get_view_name(self, source_id: str) -> str | None:
@@ -620,49 +2000,151 @@ class DuckDBService:
         """Get schema information for an uploaded source."""
         if not _SAFE_SOURCE_ID_RE.match(source_id):
             raise ValueError(f"Invalid source_id: {source_id}")
+        self._await_source(source_id)
         table_name = f"src_{source_id}"
         meta = self._sources.get(source_id)
-        filename = meta.path.name if meta else "unknown"
-        return self._inspect_table(table_name, source_id, filename)
+        if meta is None:
+            return self._inspect_table(table_name, source_id, "unknown")
+
+        # Report the current filename: renames keep the cached profile valid
+        cached = self._profiles.get(source_id)
+        if cached and cached[0] == meta.generation:
+            return replace(cached[1], filename=meta.path.name)
+        generation = meta.generation
+        schema = self._load_persisted_profile(source_id, meta)
+        if schema is None:
+            schema = self._inspect_table(table_name, source_id, meta.path.name)
+            self._remember_profile(source_id, meta, schema)
+        else:
+            self._profiles[source_id] = (generation, schema)
+        return replace(schema, filename=meta.path.name)
 
-    def _inspect_table(self, table_name: str, source_id: str, filename: str) -> SourceSchema:
-        """Inspect a DuckDB table and return schema info."""
-        with self._lock:
-            # Get column types
-            desc = self._conn.execute(f"DESCRIBE {table_name}").fetchall()
+    def mark_source_changed(self, source_id: str) -> None:
+        """Invalidate a source's cached profile after its table was altered in place.
 
-            # Get row count
-            row_count = self._conn.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0]
+        Paths that rebuild the table (ingest, reload_source) register a new
+        SourceMeta and get a new generation automatically; this is for edits
+        like the geocoding ALTER/UPDATE that keep the same registration.
+        """
+        meta = self._sources.get(source_id)
+        if meta is None:
+            return
+        meta.generation = next(_generations)
+        meta.content_hash = None
+        self._profiles.pop(source_id, None)
+        self._results.invalidate_source(source_id)
+        if meta.storage_path:
+            try:
+                self._storage.delete(f"uploads/{source_id}/{_PROFILE_FILENAME}")
+            except Exception:
+                pass
 
-            columns: list[ColumnInfo] = []
-            for col_name, col_type, *_ in desc:
-                # Sample values
-                samples = self._conn.execute(
-                    f"SELECT DISTINCT CAST({q(col_name)} AS VARCHAR) FROM {table_name} "
-                    f"WHERE {q(col_name)} IS NOT NULL LIMIT 5"
-                ).fetchall()
-                sample_values = [str(s[0]) for s in samples]
+    # ── Profile cache ───────────────────────────────────────────────────────
 
-                # Null count
-                null_count = self._conn.execute(
-                    f"SELECT COUNT(*) FROM {table_name} WHERE {q(col_name)} IS NULL"
-                ).fetchone()[0]
+    def _profile_key(self, meta: SourceMeta) -> str | None:
+        """Identify the file a persisted profile was computed from (None if not file-backed).
 
-                # Distinct count
-                distinct_count = self._conn.execute(
-                    f"SELECT COUNT(DISTINCT {q(col_name)}) FROM {table_name}"
-                ).fetchone()[0]
+        Uses the content hash rather than size/mtime, which change whenever
+        the file is re-downloaded from S3 on startup.
+        """
+        storage_key, _ = _backing_file(meta)
+        if not storage_key:
+            return None
+        return self._source_version(meta)
 
-                # Min/max for numeric and date types
-                min_val = max_val = None
-                if any(t in col_type.upper() for t in ['INT', 'FLOAT', 'DOUBLE', 'DECIMAL', 'NUMERIC', 'DATE', 'TIMESTAMP']):
-                    try:
-                        minmax = self._conn.execute(
-                            f"SELECT CAST(MIN({q(col_name)}) AS VARCHAR), CAST(MAX({q(col_name)}) AS VARCHAR) FROM {table_name}"
-                        ).fetchone()
-                        min_val, max_val = minmax[0], minmax[1]
-                    except duckdb.Error:
-                        pass
+    def _remember_profile(self, source_id: str, meta: SourceMeta, schema: SourceSchema) -> None:
+        """Cache a freshly computed profile and persist it next to the source file."""
+        self._profiles[source_id] = (meta.generation, schema)
+        key = self._profile_key(meta)
+        if key is None:
+            return
+        payload = {"key": key, "schema": asdict(schema)}
+        try:
+            self._storage.write(
+                f"uploads/{source_id}/{_PROFILE_FILENAME}",
+                json.dumps(payload).encode("utf-8"),
+            )
+        except Exception as e:
+            print(f"[DuckDB] Could not persist profile for {source_id}: {e}")
+
+    def _load_persisted_profile(self, source_id: str, meta: SourceMeta) -> SourceSchema | None:
+        """Return the persisted profile if it was computed from the current file."""
+        key = self._profile_key(meta)
+        storage_key = f"uploads/{source_id}/{_PROFILE_FILENAME}"
+        if key is None or not self._storage.exists(storage_key):
+            return None
+        try:
+            payload = json.loads(self._storage.read(storage_key))
+            if payload.get("key") != key:
+                return None
+            data = payload["schema"]
+            return SourceSchema(
+                source_id=source_id,
+                filename=data["filename"],
+                row_count=data["row_count"],
+                columns=[ColumnInfo(**c) for c in data["columns"]],
+            )
+        except (ValueError, KeyError, TypeError):
+            return None
+
+    def _inspect_table(self, table_name: str, source_id: str, filename: str) -> SourceSchema:
+        """Inspect a DuckDB table and return schema info.
+
+        Profiles every column in two scans: one wide aggregate for counts and
+        min/max, and one pass over a row sample for example values. Tables
+        past _PROFILE_FAST_ROWS rows or _PROFILE_FAST_COLUMNS columns use
+        approx_count_distinct and a reservoir sample instead of exact counts
+        and the leading rows.
+        """
+        with self.query_cursor() as cursor:
+            desc = cursor.execute(f"DESCRIBE {table_name}").fetchall()
+            col_defs = [(col_name, col_type) for col_name, col_type, *_ in desc]
+
+            estimate = cursor.execute(
+                "SELECT estimated_size FROM duckdb_tables() WHERE table_name = ?",
+                [table_name],
+            ).fetchone()
+            estimated_rows = estimate[0] if estimate and estimate[0] is not None else 0
+            fast = estimated_rows > _PROFILE_FAST_ROWS or len(col_defs) > _PROFILE_FAST_COLUMNS
+
+            # Scan 1: row count, non-null count, distinct count and min/max per column
+            with_minmax = True
+            stats = self._profile_aggregate(cursor, table_name, col_defs, approx=fast, with_minmax=True)
+            if stats is None:
+                # A column type without ordering broke MIN/MAX; profile without it
+                with_minmax = False
+                stats = self._profile_aggregate(cursor, table_name, col_defs, approx=fast, with_minmax=False)
+            row_count = stats[0]
+
+            # Scan 2: up to 5 distinct sample values per column from a row sample
+            samples: list[list[str]] = [[] for _ in col_defs]
+            if col_defs and row_count:
+                sample_source = (
+                    f"(SELECT * FROM {table_name} USING SAMPLE reservoir({_PROFILE_SAMPLE_ROWS} ROWS))"
+                    if fast else
+                    f"(SELECT * FROM {table_name} LIMIT {_PROFILE_SAMPLE_ROWS})"
+                )
+                sample_exprs = ", ".join(
+                    f"list_slice(list(DISTINCT CAST({q(name)} AS VARCHAR)) "
+                    f"FILTER (WHERE {q(name)} IS NOT NULL), 1, 5)"
+                    for name, _ in col_defs
+                )
+                samples = list(cursor.execute(f"SELECT {sample_exprs} FROM {sample_source}").fetchone())
+
+            columns: list[ColumnInfo] = []
+            per_col = 4 if with_minmax else 2
+            for idx, (col_name, col_type) in enumerate(col_defs):
+                base = 1 + idx * per_col
+                non_null, distinct_count = stats[base], stats[base + 1]
+                min_val, max_val = (stats[base + 2], stats[base + 3]) if with_minmax else (None, None)
+                null_count = row_count - non_null
+                sample_values = [str(v) for v in (samples[idx] or [])]
+                if not sample_values and non_null and not fast:
+                    # Sparse column with no values in the leading rows
+                    sample_values = [str(r[0]) for r in cursor.execute(
+                        f"SELECT DISTINCT CAST({q(col_name)} AS VARCHAR) FROM {table_name} "
+                        f"WHERE {q(col_name)} IS NOT NULL LIMIT 5"
+                    ).fetchall()]
 
                 columns.append(ColumnInfo(
                     name=col_name,
@@ -682,25 +2164,117 @@ class DuckDBService:
             columns=columns,
         )
 
-    def _detect_delimiter(self, path: Path) -> str:
-        """Auto-detect CSV delimiter.
+    @staticmethod
+    def _profile_aggregate(
+        cursor: duckdb.DuckDBPyConnection,
+        table_name: str,
+        col_defs: list[tuple[str, str]],
+        *,
+        approx: bool,
+        with_minmax: bool,
+    ) -> tuple | None:
+        """Run the single wide aggregate behind _inspect_table.
+
+        Returns ``(row_count, non_null, distinct[, min, max], ...)`` with
+        min/max only for numeric and date columns (None elsewhere), or None
+        if ``with_minmax`` is set and the aggregate fails.
+        """
+        exprs = ["COUNT(*)"]
+        for col_name, col_type in col_defs:
+            col = q(col_name)
+            exprs.append(f"COUNT({col})")
+            exprs.append(f"approx_count_distinct({col})" if approx else f"COUNT(DISTINCT {col})")
+            if with_minmax:
+                if any(t in col_type.upper() for t in _MINMAX_TYPES):
+                    exprs.append(f"CAST(MIN({col}) AS VARCHAR)")
+                    exprs.append(f"CAST(MAX({col}) AS VARCHAR)")
+                else:
+                    exprs.append("NULL")
+                    exprs.append("NULL")
+        try:
+            return cursor.execute(f"SELECT {', '.join(exprs)} FROM {table_name}").fetchone()
+        except duckdb.Error:
+            if with_minmax:
+                return None
+            raise
+
+    # ── CSV ingest planning ─────────────────────────────────────────────────
+
+    def _plan_csv(self, path: Path) -> CsvIngestPlan:
+        """Sniff a CSV's dialect and column types from its first _CSV_SNIFF_ROWS rows.
+
+        DuckDB's sniff_csv detects the delimiter, quoting, header and the
+        number of leading metadata lines to skip in one pass over the sample.
+        Quote/escape characters that do not occur in the sample fall back to
+        the RFC 4180 double quote so quoted fields later in the file still
+        parse.
+        """
+        started = time.monotonic()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT Delimiter, Quote, Escape, SkipRows, HasHeader, Columns, DateFormat, TimestampFormat "
+                f"FROM sniff_csv('{_sql_string(str(path))}', sample_size={_CSV_SNIFF_ROWS})"
+            ).fetchone()
+        delimiter, quote, escape, skip_rows, header, columns, date_format, timestamp_format = row
+        quote = '"' if quote in (None, "", "(empty)") else quote
+        escape = quote if escape in (None, "", "(empty)") else escape
+        return CsvIngestPlan(
+            delimiter=delimiter,
+            quote=quote,
+            escape=escape,
+            skip_rows=int(skip_rows or 0),
+            header=bool(header),
+            columns=[(col["name"], col["type"]) for col in columns],
+            date_format=date_format,
+            timestamp_format=timestamp_format,
+            sniff_ms=(time.monotonic() - started) * 1000,
+        )
+
+    def _load_csv(self, table_name: str, path: Path, *, label: str | None = None) -> CsvIngestPlan:
+        """Create ``table_name`` from a CSV with a single full parse, and log the plan used.
 
-        The returned delimiter is escaped for safe use in SQL strings
-        (single quotes doubled).
+        If a column's sniffed type does not hold past the sample, the file is
+        parsed once more with types detected over the whole file.
         """
-        with open(path, 'r', newline='', encoding='utf-8', errors='replace') as f:
-            sample = f.read(8192)
-        _SAFE_DELIMITERS = {',', '\t', '|', ';', ' ', ':'}
+        label = label or path.name
+        plan = self._plan_csv(path)
+        started = time.monotonic()
         try:
-            dialect = csv.Sniffer().sniff(sample)
-            delim = dialect.delimiter
-        except csv.Error:
-            delim = ','
-        # Only allow known-safe delimiters to prevent SQL injection via crafted CSVs
-        if delim not in _SAFE_DELIMITERS:
-            delim = ','
-        # Escape single quotes to prevent SQL injection when interpolated
-        return delim.replace("'", "''")
+            with self._side_cursor() as cursor:
+                cursor.execute(f"CREATE OR REPLACE TABLE {table_name} AS SELECT * FROM {plan.read_sql(path)}")
+        except duckdb.ConversionException as e:
+            print(f"[DuckDB] {label}: sniffed types failed past the sample ({str(e).splitlines()[0]}); "
+                  "re-detecting types over the whole file")
+            with self._side_cursor() as cursor:
+                cursor.execute(
+                    f"CREATE OR REPLACE TABLE {table_name} AS SELECT * FROM {plan.read_sql(path, pin_types=False)}"
+                )
+        print(f"[DuckDB] Parsed {label}: {plan.describe()}, full parse {time.monotonic() - started:.2f} s")
+        return plan
+
+
+def _shadow_table(source_id: str) -> str:
+    """Name of the table a source is rebuilt into before it is swapped in."""
+    return f"src_{source_id}__next"
+
+
+def filter_param_names(sql: str) -> set[str]:
+    """Names of the ``${inputs.name}`` filter placeholders in ``sql``.
+
+    Includes placeholders inside string literals and comments, which are
+    substituted inline, so this is every filter that can change the query.
+    """
+    return set(_FILTER_PARAM_RE.findall(sql or ""))
+
+
+def split_upload_name(filename: str) -> tuple[str, str | None]:
+    """Split ``filename`` into (stem, suffix from UPLOAD_SUFFIXES); suffix is None if unsupported."""
+    name = Path(filename).name
+    lower = name.lower()
+    for suffix in UPLOAD_SUFFIXES:
+        if lower.endswith(suffix) and len(name) > len(suffix):
+            return name[: -len(suffix)], suffix
+    return Path(name).stem, None
 
 
 def q(col_name: str) -> str:
@@ -712,6 +2286,189 @@ def q(col_name: str) -> str:
     return f'"{escaped}"'
 
 
+def _file_fingerprint(path: Path) -> tuple[int, int]:
+    """Return (size, mtime_ns) for a local file."""
+    st = path.stat()
+    return st.st_size, st.st_mtime_ns
+
+
+def _file_sha256(path: Path) -> str:
+    """Hash a local file in 1 MiB chunks."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+@contextmanager
+def _interruptible(cursor: duckdb.DuckDBPyConnection):
+    """Attach ``cursor`` to the current registered query for its duration.
+
+    Turns the InterruptException raised by a deadline or cancel into
+    QueryCancelledError carrying the reason.
+    """
+    registry = get_query_registry()
+    query = registry.attach_cursor(cursor)
+    try:
+        yield
+    except duckdb.InterruptException as e:
+        if query is not None and query.cancel_reason:
+            raise QueryCancelledError(f"Query cancelled: {query.cancel_reason}") from e
+        raise
+    finally:
+        registry.detach_cursor(query)
+
+
+class _InlineParams(Exception):
+    """Filter placeholders cannot be bound as parameters; substitute them inline."""
+
+
+def _sql_literal(val: object) -> str:
+    """Render a filter value as a DuckDB literal (strings single-quote escaped)."""
+    # Bool check must come before int (bool is a subclass of int in Python)
+    if isinstance(val, bool):
+        return "true" if val else "false"
+    if isinstance(val, (int, float)):
+        return str(val)
+    # String: escape single quotes by doubling
+    escaped = str(val).replace("'", "''")
+    return f"'{escaped}'"
+
+
+def _arrow_column_to_python(column: "pa.ChunkedArray", duckdb_type: str) -> list:
+    """Convert an Arrow column to Python values matching DuckDB's fetchall().
+
+    Arrow maps a few DuckDB types differently: HUGEINT arrives as
+    decimal128(38, 0), INTERVAL as MonthDayNano, MAP as a list of pairs and
+    BIT as its packed bytes.
+    """
+    kind = duckdb_type.upper()
+    if kind.startswith("TIMESTAMP_NS"):
+        import pyarrow as pa
+
+        column = column.cast(pa.timestamp("us"), safe=False)
+    values = column.to_pylist()
+    if kind in ("HUGEINT", "UHUGEINT"):
+        return [None if v is None else int(v) for v in values]
+    if kind == "INTERVAL":
+        return [
+            None if v is None
+            else timedelta(days=v.months * 30 + v.days, microseconds=v.nanoseconds // 1000)
+            for v in values
+        ]
+    if kind.startswith("MAP("):
+        return [None if v is None else dict(v) for v in values]
+    if kind == "BIT":
+        return [None if v is None else _decode_bit(v) for v in values]
+    return values
+
+
+def _decode_bit(packed: bytes) -> str:
+    """Decode DuckDB's BIT storage (padding-count byte, then bits) to a '0101' string."""
+    bits = "".join(f"{b:08b}" for b in packed[1:])
+    return bits[packed[0]:]
+
+
+def _backing_file(meta: SourceMeta) -> tuple[str | None, Path]:
+    """Return ``(storage_key, local_path)`` of the file a source's table is loaded from."""
+    if meta.parquet_key and meta.parquet_path:
+        return meta.parquet_key, meta.parquet_path
+    return meta.storage_path, meta.path
+
+
+def _reload_workers() -> int:
+    """Read DUCKDB_RELOAD_WORKERS (default: CPU count, at most 4)."""
+    raw = os.environ.get("DUCKDB_RELOAD_WORKERS", "").strip()
+    try:
+        value = int(raw) if raw else min(4, os.cpu_count() or 1)
+    except ValueError:
+        value = min(4, os.cpu_count() or 1)
+    return max(1, value)
+
+
+def _max_concurrent_queries() -> int:
+    """Read DUCKDB_MAX_CONCURRENT_QUERIES (default: CPU count, at least 1)."""
+    raw = os.environ.get("DUCKDB_MAX_CONCURRENT_QUERIES", "").strip()
+    try:
+        value = int(raw) if raw else (os.cpu_count() or 4)
+    except ValueError:
+        value = os.cpu_count() or 4
+    return max(1, value)
+
+
+def _lazy_sources_enabled() -> bool:
+    return os.environ.get("DUCKDB_LAZY_SOURCES", "false").lower() == "true"
+
+
+def _lazy_promote_after() -> int:
+    """Read DUCKDB_LAZY_PROMOTE_AFTER (default 3 queries)."""
+    raw = os.environ.get("DUCKDB_LAZY_PROMOTE_AFTER", "").strip()
+    try:
+        return max(1, int(raw)) if raw else 3
+    except ValueError:
+        return 3
+
+
+def _lazy_memory_budget() -> int:
+    """Read DUCKDB_LAZY_MEMORY_MB (default 1024) as a byte budget for materialized sources."""
+    raw = os.environ.get("DUCKDB_LAZY_MEMORY_MB", "").strip()
+    try:
+        mb = float(raw) if raw else 1024.0
+    except ValueError:
+        mb = 1024.0
+    return max(0, int(mb * 1024 * 1024))
+
+
+def _resource_config() -> dict[str, str]:
+    """DuckDB resource settings for duckdb.connect(config=...).
+
+    ``DUCKDB_MEMORY_LIMIT`` (e.g. "4GB"), ``DUCKDB_THREADS``,
+    ``DUCKDB_TEMP_DIRECTORY`` and ``DUCKDB_PRESERVE_INSERTION_ORDER`` take
+    precedence over the matching keys of the ``duckdb:`` section in
+    engine_config.yaml; unset settings keep DuckDB's defaults. A relative
+    temp directory resolves against the local storage directory.
+    """
+    try:
+        from engine.config import get_config
+        file_settings = get_config().duckdb_settings
+    except FileNotFoundError:
+        file_settings = {}
+
+    config: dict[str, str] = {}
+    for name in _RESOURCE_SETTINGS:
+        value = os.environ.get(f"DUCKDB_{name.upper()}", "").strip()
+        if not value and file_settings.get(name) is not None:
+            raw = file_settings[name]
+            value = str(raw).lower() if isinstance(raw, bool) else str(raw).strip()
+        if value:
+            config[name] = value
+
+    if "temp_directory" in config:
+        path = Path(config["temp_directory"])
+        if not path.is_absolute():
+            path = Path(os.environ.get("STORAGE_LOCAL_DIR", "data")) / path
+        path.mkdir(parents=True, exist_ok=True)
+        config["temp_directory"] = str(path.resolve())
+    return config
+
+
+def _resolve_database_path() -> str:
+    """Resolve ``DUCKDB_DATABASE`` to a duckdb.connect() target.
+
+    Relative paths land under the local storage directory so the database
+    file sits next to ``uploads/``.
+    """
+    target = os.environ.get("DUCKDB_DATABASE", "").strip() or ":memory:"
+    if target == ":memory:":
+        return target
+    path = Path(target)
+    if not path.is_absolute():
+        path = Path(os.environ.get("STORAGE_LOCAL_DIR", "data")) / path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return str(path.resolve())
+
+
 def _sql_string(value: str) -> str:
     """Escape a value for use inside a SQL single-quoted string literal.
 
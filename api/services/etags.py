@@ -0,0 +1,34 @@
+"""
+Strong ETags for chart and dashboard data responses.
+
+A chart's data depends only on its saved config and SQL, the filter params
+and the data in the sources the SQL reads. DuckDBService.data_version()
+reports a persisted fingerprint of each of those sources (the content hash
+of its stored file), so a tag built from all of these can be compared
+against ``If-None-Match`` before any SQL runs, and stays the same across
+restarts and on every replica serving the same storage.
+"""
+
+from __future__ import annotations
+
+import hashlib
+
+from pydantic_core import to_json
+from starlette.requests import Request
+
+
+def strong_etag(*parts: object) -> str:
+    """Quoted strong ETag over ``parts`` (anything pydantic can serialise to JSON)."""
+    digest = hashlib.sha256(to_json(list(parts))).hexdigest()[:32]
+    return f'"{digest}"'
+
+
+def etag_matches(request: Request | None, etag: str) -> bool:
+    """True if the request's If-None-Match lists ``etag`` (or is ``*``)."""
+    if request is None:
+        return False
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = {c.strip().removeprefix("W/") for c in header.split(",")}
+    return "*" in candidates or etag in candidates
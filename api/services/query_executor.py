@@ -0,0 +1,271 @@
+"""
+Bounded executor for blocking DuckDB work called from async route handlers.
+
+The routers are ``async def`` but DuckDBService is synchronous: calling it
+directly parks the event loop for the duration of the query, so a slow
+aggregation stalls every other request (health checks included). The
+awaitable wrappers below run that work on a dedicated, sized thread pool and
+record queue depth / wait time so saturation is visible.
+
+``DUCKDB_EXECUTOR_WORKERS`` sizes the pool (default: the read-query cap from
+``DUCKDB_MAX_CONCURRENT_QUERIES`` plus two, so ingests are not starved by a
+full set of reads).
+
+Queries started through ``run_query`` (and the ``execute_query`` wrapper) are
+registered in the query registry with a deadline for their class, and are
+cancelled when the requesting client disconnects.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, TypeVar
+
+from starlette.requests import Request
+
+from .duckdb_service import (
+    QueryResult,
+    SourceSchema,
+    _max_concurrent_queries,
+    get_duckdb_service,
+)
+from .query_registry import QueryCancelledError, current_query, get_query_registry
+
+T = TypeVar("T")
+
+# Number of recent wait samples kept for the p95 figure
+_WAIT_WINDOW = 500
+# How often a running query checks whether its client is still connected
+_DISCONNECT_POLL_S = 0.5
+
+
+class QueryExecutor:
+    """Sized ThreadPoolExecutor with queue-depth and wait-time accounting."""
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="duckdb-exec")
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._cancelled = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._run_total = 0.0
+        self._recent_waits: deque[float] = deque(maxlen=_WAIT_WINDOW)
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run ``fn(*args, **kwargs)`` on the pool and await its result."""
+        submitted = time.monotonic()
+
+        def _call() -> T:
+            started = time.monotonic()
+            waited = started - submitted
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+                self._recent_waits.append(waited)
+            ok = False
+            try:
+                result = fn(*args, **kwargs)
+                ok = True
+                return result
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._run_total += time.monotonic() - started
+                    if ok:
+                        self._completed += 1
+                    else:
+                        self._failed += 1
+
+        with self._lock:
+            self._queued += 1
+        # Carry context variables (e.g. the registered query) into the worker thread
+        future = self._pool.submit(contextvars.copy_context().run, _call)
+        future.add_done_callback(self._on_done)
+        return await asyncio.wrap_future(future)
+
+    def _on_done(self, future: Future) -> None:
+        # A job cancelled while still queued never reaches _call()
+        if future.cancelled():
+            with self._lock:
+                self._queued -= 1
+                self._cancelled += 1
+
+    def metrics(self) -> dict:
+        """Snapshot of pool utilisation and queue wait times (milliseconds)."""
+        with self._lock:
+            started = self._completed + self._failed + self._running
+            recent = sorted(self._recent_waits)
+            p95 = recent[int(len(recent) * 0.95) - 1] if len(recent) >= 20 else (recent[-1] if recent else 0.0)
+            return {
+                "max_workers": self.max_workers,
+                "queue_depth": self._queued,
+                "running": self._running,
+                "completed": self._completed,
+                "failed": self._failed,
+                "cancelled": self._cancelled,
+                "wait_ms_avg": round(self._wait_total / started * 1000, 2) if started else 0.0,
+                "wait_ms_p95": round(p95 * 1000, 2),
+                "wait_ms_max": round(self._wait_max * 1000, 2),
+                "run_ms_avg": round(self._run_total / (self._completed + self._failed) * 1000, 2)
+                if (self._completed + self._failed) else 0.0,
+            }
+
+
+_executor: QueryExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def get_query_executor() -> QueryExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = QueryExecutor(_executor_workers())
+    return _executor
+
+
+def _executor_workers() -> int:
+    raw = os.environ.get("DUCKDB_EXECUTOR_WORKERS", "").strip()
+    try:
+        value = int(raw) if raw else _max_concurrent_queries() + 2
+    except ValueError:
+        value = _max_concurrent_queries() + 2
+    return max(1, value)
+
+
+# ── Awaitable wrappers ───────────────────────────────────────────────────────
+
+async def run_blocking(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run any blocking callable (e.g. a transform step) on the query executor."""
+    return await get_query_executor().run(fn, *args, **kwargs)
+
+
+async def run_query(
+    fn: Callable[..., T],
+    *args: Any,
+    sql: str,
+    query_class: str,
+    user: dict | None = None,
+    source_id: str | None = None,
+    request: Request | None = None,
+    **kwargs: Any,
+) -> T:
+    """Run a DuckDB query callable as a registered, cancellable query.
+
+    ``query_class`` ("chart", "ai" or "adhoc") selects the deadline; pass the
+    ``request`` to cancel the query if the client goes away. Raises
+    QueryCancelledError when the query is interrupted.
+    """
+    if request is not None and await request.is_disconnected():
+        raise QueryCancelledError("Query cancelled: client disconnected")
+    registry = get_query_registry()
+    entry = registry.start(
+        sql,
+        query_class,
+        user=(user.get("email") or user.get("id")) if user else None,
+        source_id=source_id,
+    )
+    token = current_query.set(entry)
+    watcher = asyncio.create_task(_cancel_on_disconnect(request, entry.id)) if request is not None else None
+    try:
+        return await run_blocking(fn, *args, **kwargs)
+    except asyncio.CancelledError:
+        registry.cancel(entry.id, "request cancelled")
+        raise
+    finally:
+        current_query.reset(token)
+        if watcher is not None:
+            watcher.cancel()
+        registry.finish(entry.id)
+
+
+async def _cancel_on_disconnect(request: Request, query_id: str) -> None:
+    while True:
+        await asyncio.sleep(_DISCONNECT_POLL_S)
+        if await request.is_disconnected():
+            get_query_registry().cancel(query_id, "client disconnected")
+            return
+
+
+async def execute_query(
+    sql: str,
+    source_id: str,
+    params: dict[str, str | int | float] | None = None,
+    *,
+    query_class: str = "chart",
+    user: dict | None = None,
+    request: Request | None = None,
+) -> QueryResult:
+    return await run_query(
+        get_duckdb_service().execute_query, sql, source_id, params=params,
+        sql=sql, query_class=query_class, user=user, source_id=source_id, request=request,
+    )
+
+
+async def data_version(sql: str, source_id: str) -> tuple | None:
+    return await run_blocking(get_duckdb_service().data_version, sql, source_id)
+
+
+async def has_source(source_id: str) -> bool:
+    return await run_blocking(get_duckdb_service().has_source, source_id)
+
+
+async def list_source_ids() -> list[str]:
+    return await run_blocking(get_duckdb_service().list_source_ids)
+
+
+async def find_source_by_filename(filename: str) -> str | None:
+    return await run_blocking(get_duckdb_service().find_source_by_filename, filename)
+
+
+async def drop_source(source_id: str) -> None:
+    await run_blocking(get_duckdb_service().drop_source, source_id)
+
+
+async def get_schema(source_id: str) -> SourceSchema:
+    return await run_blocking(get_duckdb_service().get_schema, source_id)
+
+
+async def get_preview(source_id: str, limit: int = 10) -> QueryResult:
+    return await run_blocking(get_duckdb_service().get_preview, source_id, limit)
+
+
+async def ingest_csv(file_path: Path, filename: str, *, source_id: str | None = None) -> SourceSchema:
+    return await run_blocking(get_duckdb_service().ingest_csv, file_path, filename, source_id=source_id)
+
+
+async def ingest_file(file_path: Path, filename: str, *, source_id: str | None = None) -> SourceSchema:
+    return await run_blocking(get_duckdb_service().ingest_file, file_path, filename, source_id=source_id)
+
+
+async def ingest_stored_csv(storage_key: str, filename: str, *, source_id: str) -> SourceSchema:
+    return await run_blocking(get_duckdb_service().ingest_stored_csv, storage_key, filename, source_id=source_id)
+
+
+async def ingest_parquet(parquet_path: Path, table_name_hint: str, *, source_id: str | None = None) -> SourceSchema:
+    return await run_blocking(get_duckdb_service().ingest_parquet, parquet_path, table_name_hint, source_id=source_id)
+
+
+async def ingest_query(sql: str, source_id: str, table_name_hint: str, *, user: dict | None = None) -> SourceSchema:
+    return await run_query(
+        get_duckdb_service().ingest_query, sql, source_id, table_name_hint,
+        sql=sql, query_class="adhoc", user=user, source_id=source_id,
+    )
+
+
+async def reload_source(source_id: str) -> None:
+    await run_blocking(get_duckdb_service().reload_source, source_id)
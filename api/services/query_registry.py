@@ -0,0 +1,210 @@
+"""
+Registry of in-flight DuckDB queries: deadlines, listing, and cancellation.
+
+The async query layer (query_executor.run_query) registers each query with a
+class-specific deadline and binds it to the executing thread through a
+context variable. DuckDBService attaches the cursor it runs on, so a query can
+be stopped with DuckDB's ``interrupt()`` when its deadline passes, when an
+admin cancels it, or when the client that asked for it disconnects.
+
+Deadlines (seconds, 0 = none) are read per query class from
+``DUCKDB_QUERY_TIMEOUT_<CLASS>``: chart (saved chart/dashboard SQL, default
+30), ai (AI-generated or AI-built SQL, default 60) and adhoc (user-written
+SQL, default 120).
+"""
+
+from __future__ import annotations
+
+import contextvars
+import os
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+import duckdb
+
+_DEFAULT_TIMEOUTS = {"chart": 30.0, "ai": 60.0, "adhoc": 120.0}
+_SQL_PREVIEW_CHARS = 500
+
+
+class QueryCancelledError(RuntimeError):
+    """A query was interrupted by its deadline, an admin, or a client disconnect."""
+
+
+@dataclass
+class RunningQuery:
+    id: str
+    sql: str
+    query_class: str
+    user: str | None
+    source_id: str | None
+    started_at: datetime
+    started: float  # time.monotonic()
+    deadline: float | None  # monotonic; None = no limit
+    timeout_s: float | None
+    cursor: duckdb.DuckDBPyConnection | None = field(default=None, repr=False)
+    cancel_reason: str | None = None
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "sql": self.sql[:_SQL_PREVIEW_CHARS],
+            "query_class": self.query_class,
+            "user": self.user,
+            "source_id": self.source_id,
+            "started_at": self.started_at.isoformat(),
+            "elapsed_s": round(time.monotonic() - self.started, 3),
+            "timeout_s": self.timeout_s,
+            "state": "cancelling" if self.cancel_reason else ("running" if self.cursor else "queued"),
+        }
+
+
+# The query the current thread/task is working for (copied into executor threads)
+current_query: contextvars.ContextVar[RunningQuery | None] = contextvars.ContextVar(
+    "current_query", default=None,
+)
+
+
+class QueryRegistry:
+    def __init__(self) -> None:
+        self._queries: dict[str, RunningQuery] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._watchdog: threading.Thread | None = None
+        self._timed_out = 0
+        self._cancelled = 0
+
+    def start(
+        self,
+        sql: str,
+        query_class: str,
+        *,
+        user: str | None = None,
+        source_id: str | None = None,
+    ) -> RunningQuery:
+        timeout = query_timeout(query_class)
+        now = time.monotonic()
+        entry = RunningQuery(
+            id=uuid.uuid4().hex[:12],
+            sql=sql,
+            query_class=query_class,
+            user=user,
+            source_id=source_id,
+            started_at=datetime.now(timezone.utc),
+            started=now,
+            deadline=now + timeout if timeout else None,
+            timeout_s=timeout,
+        )
+        with self._lock:
+            self._queries[entry.id] = entry
+            if entry.deadline is not None:
+                self._ensure_watchdog()
+                self._wakeup.notify()
+        return entry
+
+    def finish(self, query_id: str) -> None:
+        with self._lock:
+            self._queries.pop(query_id, None)
+
+    def cancel(self, query_id: str, reason: str = "cancelled by an administrator") -> bool:
+        """Interrupt a query; returns False if it is no longer running."""
+        with self._lock:
+            entry = self._queries.get(query_id)
+            if entry is None:
+                return False
+            self._cancel_locked(entry, reason)
+            return True
+
+    def list(self) -> list[dict]:
+        with self._lock:
+            entries = sorted(self._queries.values(), key=lambda e: e.started)
+            return [e.to_dict() for e in entries]
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "running": len(self._queries),
+                "timed_out": self._timed_out,
+                "cancelled": self._cancelled,
+            }
+
+    # ── Cursor binding (called by DuckDBService) ──
+
+    def attach_cursor(self, cursor: duckdb.DuckDBPyConnection) -> RunningQuery | None:
+        """Bind ``cursor`` to the current query, if any; raise if it was already cancelled."""
+        entry = current_query.get()
+        if entry is None:
+            return None
+        with self._lock:
+            if entry.cancel_reason:
+                raise QueryCancelledError(f"Query cancelled: {entry.cancel_reason}")
+            entry.cursor = cursor
+        return entry
+
+    def detach_cursor(self, entry: RunningQuery | None) -> None:
+        # Must run before the cursor is reused, so a late cancel cannot hit another query
+        if entry is None:
+            return
+        with self._lock:
+            entry.cursor = None
+
+    def raise_if_cancelled(self) -> None:
+        """Raise QueryCancelledError if the current query has been cancelled (for queries with no cursor yet)."""
+        entry = current_query.get()
+        if entry is not None and entry.cancel_reason:
+            raise QueryCancelledError(f"Query cancelled: {entry.cancel_reason}")
+
+    # ── Internals ──
+
+    def _cancel_locked(self, entry: RunningQuery, reason: str) -> None:
+        if entry.cancel_reason:
+            return
+        entry.cancel_reason = reason
+        self._cancelled += 1
+        if entry.cursor is not None:
+            try:
+                entry.cursor.interrupt()
+            except duckdb.Error:
+                pass
+
+    def _ensure_watchdog(self) -> None:
+        if self._watchdog is None or not self._watchdog.is_alive():
+            self._watchdog = threading.Thread(target=self._watch, name="duckdb-query-deadlines", daemon=True)
+            self._watchdog.start()
+
+    def _watch(self) -> None:
+        with self._lock:
+            while True:
+                now = time.monotonic()
+                next_deadline = None
+                for entry in self._queries.values():
+                    if entry.deadline is None or entry.cancel_reason:
+                        continue
+                    if entry.deadline <= now:
+                        self._timed_out += 1
+                        self._cancel_locked(
+                            entry,
+                            f"exceeded the {entry.timeout_s:g}s limit for {entry.query_class} queries",
+                        )
+                    elif next_deadline is None or entry.deadline < next_deadline:
+                        next_deadline = entry.deadline
+                self._wakeup.wait(timeout=None if next_deadline is None else next_deadline - now)
+
+
+_registry = QueryRegistry()
+
+
+def get_query_registry() -> QueryRegistry:
+    return _registry
+
+
+def query_timeout(query_class: str) -> float | None:
+    """Deadline in seconds for a query class (None = unlimited)."""
+    raw = os.environ.get(f"DUCKDB_QUERY_TIMEOUT_{query_class.upper()}", "").strip()
+    try:
+        value = float(raw) if raw else _DEFAULT_TIMEOUTS.get(query_class, 0.0)
+    except ValueError:
+        value = _DEFAULT_TIMEOUTS.get(query_class, 0.0)
+    return value if value > 0 else None
@@ -0,0 +1,124 @@
+"""
+In-process cache of query results for DuckDB sources.
+
+Uploaded sources are static until they are replaced, transformed or dropped,
+so re-running a chart's SQL on every dashboard view rescans data that has not
+changed. Results are cached as Arrow tables under a key built from the
+rewritten SQL, the filter params and the generation of every source the query
+references; a rebuilt source gets a new generation, so stale entries can never
+be served and are purged eagerly by ``invalidate_source``.
+
+The budget is the Arrow buffer size of the cached tables
+(``DUCKDB_RESULT_CACHE_MB``, default 256; 0 disables the cache). Least
+recently used entries are evicted first.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+# Results bigger than this fraction of the budget are not cached at all
+_MAX_ENTRY_FRACTION = 0.25
+
+
+@dataclass
+class CachedResult:
+    columns: list[str]
+    column_types: list[str]
+    table: "pa.Table"
+    nbytes: int
+    source_ids: frozenset[str]
+
+
+class ResultCache:
+    """Byte-budgeted LRU of query results, invalidated per source."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[tuple, CachedResult] = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def get(self, key: tuple) -> CachedResult | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry
+
+    def put(
+        self,
+        key: tuple,
+        columns: list[str],
+        column_types: list[str],
+        table: "pa.Table",
+        source_ids: set[str],
+    ) -> None:
+        nbytes = table.nbytes
+        if not self.enabled or nbytes > self.max_bytes * _MAX_ENTRY_FRACTION:
+            return
+        entry = CachedResult(columns, column_types, table, nbytes, frozenset(source_ids))
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old.nbytes
+            self._entries[key] = entry
+            self._bytes += nbytes
+            while self._bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+                self._evictions += 1
+
+    def invalidate_source(self, source_id: str) -> int:
+        """Drop every entry that read from ``source_id``; returns how many."""
+        with self._lock:
+            stale = [k for k, e in self._entries.items() if source_id in e.source_ids]
+            for key in stale:
+                self._bytes -= self._entries.pop(key).nbytes
+            return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def metrics(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+            }
+
+
+def result_cache_budget() -> int:
+    """Read DUCKDB_RESULT_CACHE_MB (default 256) as a byte budget."""
+    raw = os.environ.get("DUCKDB_RESULT_CACHE_MB", "").strip()
+    try:
+        mb = float(raw) if raw else 256.0
+    except ValueError:
+        mb = 256.0
+    return max(0, int(mb * 1024 * 1024))
@@ -0,0 +1,106 @@
+"""
+Single-flight execution of identical concurrent queries.
+
+When a published dashboard is shared widely, many viewers load it at once and
+each request runs the same chart SQL. ``SingleFlight.do`` lets the first
+caller for a key (the leader) run the work while identical callers that
+arrive before it finishes wait and share its result or error. Nothing is kept
+once the leader finishes, so this is not a cache: it also helps when results
+are uncacheable or the result cache is cold.
+
+DuckDBService keys calls like the result cache: rewritten SQL, filter params
+and the generation of every source the query reads.
+"""
+
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+# How often a waiting caller checks whether it has been cancelled
+_WAIT_POLL_S = 0.1
+
+
+@dataclass
+class _Call(Generic[T]):
+    done: threading.Event = field(default_factory=threading.Event)
+    result: T | None = None
+    error: BaseException | None = None
+    waiters: int = 0
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key into one execution."""
+
+    def __init__(self) -> None:
+        self._calls: dict[tuple, _Call] = {}
+        self._lock = threading.Lock()
+        self._executions = 0
+        self._coalesced = 0
+        self._rejoined = 0
+        self._max_waiters = 0
+
+    def do(
+        self,
+        key: tuple,
+        fn: Callable[[], T],
+        *,
+        check: Callable[[], None] | None = None,
+        retry_on: tuple[type[BaseException], ...] = (),
+    ) -> T:
+        """Run ``fn()``, or wait for an identical call already running and share its outcome.
+
+        ``check`` is called periodically while waiting and may raise to stop
+        waiting (e.g. when the caller's own query is cancelled). If the leader
+        fails with one of ``retry_on`` — an error tied to the leader's request
+        rather than to the query — waiters try again instead of sharing it.
+        """
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                leader = call is None
+                if leader:
+                    call = self._calls[key] = _Call()
+                    self._executions += 1
+                else:
+                    call.waiters += 1
+                    self._coalesced += 1
+                    self._max_waiters = max(self._max_waiters, call.waiters)
+
+            if leader:
+                try:
+                    call.result = fn()
+                    return call.result
+                except BaseException as e:
+                    call.error = e
+                    raise
+                finally:
+                    # Unregister before waking waiters, so later arrivals start a fresh call
+                    with self._lock:
+                        self._calls.pop(key, None)
+                    call.done.set()
+
+            while not call.done.wait(_WAIT_POLL_S):
+                if check is not None:
+                    check()
+            if call.error is None:
+                return call.result
+            if not isinstance(call.error, retry_on):
+                raise call.error
+            with self._lock:
+                self._rejoined += 1
+
+    def metrics(self) -> dict:
+        with self._lock:
+            requests = self._executions + self._coalesced
+            return {
+                "in_flight": len(self._calls),
+                "executions": self._executions,
+                "coalesced": self._coalesced,
+                "coalesced_rate": round(self._coalesced / requests, 4) if requests else 0.0,
+                "max_waiters": self._max_waiters,
+                "rejoined": self._rejoined,
+            }
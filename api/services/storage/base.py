@@ -4,7 +4,14 @@ StorageBackend abstract base class.
 Defines the contract for all storage implementations (local filesystem, S3, etc.).
 """
 
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+import uuid
 from abc import ABC, abstractmethod
+from pathlib import Path
 
 
 class StorageBackend(ABC):
@@ -58,6 +65,77 @@ class StorageBackend(ABC):
     def delete_tree(self, prefix: str) -> None:
         """Delete all files under a prefix (like rm -rf). No-op if prefix doesn't exist."""
 
+    # ── Streaming writes (non-abstract, override in subclasses) ─────
+
+    def staging_path(self, path: str) -> Path:
+        """Return a fresh local file path to stage content destined for ``path``.
+
+        Large files are streamed to this path and then handed to write_file().
+        Backends override it to stage next to the final location, so that
+        write_file() is a rename rather than a copy.
+        """
+        fd, tmp_name = tempfile.mkstemp(suffix=Path(path).suffix)
+        os.close(fd)
+        return Path(tmp_name)
+
+    def write_file(self, path: str, local_file: Path) -> None:
+        """Store a local file at ``path``, consuming (moving) the local file.
+
+        The default reads the file into memory and calls write(); backends
+        override it to move or stream the file instead.
+        """
+        local_file = Path(local_file)
+        self.write(path, local_file.read_bytes())
+        local_file.unlink(missing_ok=True)
+
+    # ── Multipart uploads (non-abstract, override in subclasses) ────
+    #
+    # Parts may arrive in any order and be re-sent; nothing is visible at
+    # ``path`` until complete_multipart(). The default assembles the parts
+    # in one local file (each part written at its byte offset) and stores it
+    # with write_file().
+
+    def _multipart_dir(self) -> Path:
+        return Path(tempfile.gettempdir()) / "story-analytics-multipart"
+
+    def _multipart_file(self, upload_id: str) -> Path:
+        if not upload_id.isalnum():
+            raise ValueError(f"Invalid upload id: {upload_id!r}")
+        return self._multipart_dir() / upload_id
+
+    def create_multipart(self, path: str) -> str:
+        """Start a multipart upload to ``path`` and return its upload id."""
+        upload_id = uuid.uuid4().hex
+        part_file = self._multipart_file(upload_id)
+        part_file.parent.mkdir(parents=True, exist_ok=True)
+        part_file.touch()
+        return upload_id
+
+    def upload_part(self, path: str, upload_id: str, part_number: int, offset: int, data: bytes) -> str:
+        """Store one part (1-based ``part_number``, starting at byte ``offset``); return its ETag.
+
+        Raises:
+            FileNotFoundError: If the upload does not exist (completed or aborted).
+        """
+        part_file = self._multipart_file(upload_id)
+        if not part_file.exists():
+            raise FileNotFoundError(f"Multipart upload not found: {upload_id}")
+        with open(part_file, "r+b") as f:
+            f.seek(offset)
+            f.write(data)
+        return hashlib.md5(data).hexdigest()
+
+    def complete_multipart(self, path: str, upload_id: str, parts: list[tuple[int, str]]) -> None:
+        """Assemble the uploaded ``(part_number, etag)`` parts into ``path``."""
+        part_file = self._multipart_file(upload_id)
+        if not part_file.exists():
+            raise FileNotFoundError(f"Multipart upload not found: {upload_id}")
+        self.write_file(path, part_file)
+
+    def abort_multipart(self, path: str, upload_id: str) -> None:
+        """Discard a multipart upload and its parts. No-op if it no longer exists."""
+        self._multipart_file(upload_id).unlink(missing_ok=True)
+
     # ── Local-only helpers (non-abstract, override in subclasses) ───
 
     def get_local_path(self, path: str):
@@ -59,6 +59,34 @@ class LocalStorageBackend(StorageBackend):
                 pass
             raise
 
+    def staging_path(self, path: str) -> Path:
+        # Stage in the destination directory so write_file() is an atomic rename
+        full = self._resolve(path)
+        full.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=str(full.parent), suffix=".tmp")
+        os.close(fd)
+        return Path(tmp_name)
+
+    def write_file(self, path: str, local_file: Path) -> None:
+        full = self._resolve(path)
+        full.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.replace(str(local_file), str(full))
+        except OSError:
+            # Different filesystem: copy into a temp file beside the target, then rename
+            tmp = self.staging_path(path)
+            try:
+                shutil.copyfile(str(local_file), str(tmp))
+                os.replace(str(tmp), str(full))
+            except BaseException:
+                tmp.unlink(missing_ok=True)
+                raise
+            Path(local_file).unlink(missing_ok=True)
+
+    def _multipart_dir(self) -> Path:
+        # Inside the base directory, so completing an upload is a rename
+        return Path(self._base_dir) / ".multipart"
+
     def delete(self, path: str) -> None:
         full = self._resolve(path)
         if not full.exists():
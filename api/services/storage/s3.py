@@ -5,6 +5,8 @@ All paths are treated as S3 keys within a single bucket.
 Uses boto3 for all operations.
 """
 
+from __future__ import annotations
+
 import os
 import tempfile
 from pathlib import Path
@@ -40,6 +42,62 @@ class S3StorageBackend(StorageBackend):
     def write(self, path: str, data: bytes) -> None:
         self._client.put_object(Bucket=self._bucket, Key=path, Body=data)
 
+    def staging_path(self, path: str) -> Path:
+        # Stage inside the download cache so write_file() leaves the file cached
+        local = Path(_S3_CACHE_DIR) / path
+        local.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=str(local.parent), suffix=".tmp")
+        os.close(fd)
+        return Path(tmp_name)
+
+    def write_file(self, path: str, local_file: Path) -> None:
+        # upload_file streams from disk (multipart for large files)
+        self._client.upload_file(str(local_file), self._bucket, path)
+        local = Path(_S3_CACHE_DIR) / path
+        local.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.replace(str(local_file), str(local))
+        except OSError:
+            Path(local_file).unlink(missing_ok=True)
+            self.invalidate_local_cache(path)
+
+    def create_multipart(self, path: str) -> str:
+        response = self._client.create_multipart_upload(Bucket=self._bucket, Key=path)
+        return response["UploadId"]
+
+    def upload_part(self, path: str, upload_id: str, part_number: int, offset: int, data: bytes) -> str:
+        try:
+            response = self._client.upload_part(
+                Bucket=self._bucket, Key=path, UploadId=upload_id,
+                PartNumber=part_number, Body=data,
+            )
+        except ClientError as exc:
+            if exc.response["Error"]["Code"] == "NoSuchUpload":
+                raise FileNotFoundError(f"Multipart upload not found: {upload_id}") from exc
+            raise
+        return response["ETag"]
+
+    def complete_multipart(self, path: str, upload_id: str, parts: list[tuple[int, str]]) -> None:
+        try:
+            self._client.complete_multipart_upload(
+                Bucket=self._bucket, Key=path, UploadId=upload_id,
+                MultipartUpload={"Parts": [
+                    {"PartNumber": number, "ETag": etag} for number, etag in sorted(parts)
+                ]},
+            )
+        except ClientError as exc:
+            if exc.response["Error"]["Code"] == "NoSuchUpload":
+                raise FileNotFoundError(f"Multipart upload not found: {upload_id}") from exc
+            raise
+        self.invalidate_local_cache(path)
+
+    def abort_multipart(self, path: str, upload_id: str) -> None:
+        try:
+            self._client.abort_multipart_upload(Bucket=self._bucket, Key=path, UploadId=upload_id)
+        except ClientError as exc:
+            if exc.response["Error"]["Code"] != "NoSuchUpload":
+                raise
+
     def delete(self, path: str) -> None:
         try:
             self._client.head_object(Bucket=self._bucket, Key=path)
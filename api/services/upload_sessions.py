@@ -0,0 +1,282 @@
+"""
+Resumable upload sessions for large CSV files.
+
+A client creates a session (filename + total size), PUTs numbered chunks in
+any order, asks which byte ranges have arrived, and finally completes the
+session, which assembles the chunks in storage (an S3 multipart upload, or
+positioned writes into one local file) and ingests the result.
+
+Session state is a JSON file per session under ``upload_sessions/`` in the
+storage backend, so an interrupted upload can be resumed after a network blip
+or a server restart. Sessions that are not completed within
+``UPLOAD_SESSION_TTL_HOURS`` (default 24) are aborted.
+
+Chunk size comes from ``UPLOAD_CHUNK_MB`` (default 8, minimum 5 — the
+smallest S3 multipart part); sessions are limited to
+``UPLOAD_SESSION_MAX_MB`` (default 10240).
+"""
+
+import json
+import logging
+import math
+import os
+import re
+import threading
+import uuid
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from api.services.storage import get_storage
+
+logger = logging.getLogger(__name__)
+
+_storage = get_storage()
+
+_SAFE_ID_RE = re.compile(r"^[a-f0-9]{1,32}$")
+
+# S3 rejects multipart parts under 5 MB (except the last) and uploads over 10,000 parts
+_MIN_CHUNK_BYTES = 5 * 1024 * 1024
+_MAX_PARTS = 10_000
+
+# Serialises updates to a session's state file (chunks may arrive in parallel)
+_locks: dict[str, threading.Lock] = {}
+_locks_guard = threading.Lock()
+
+
+@dataclass
+class UploadSession:
+    """State of one resumable upload."""
+    id: str
+    filename: str
+    size: int
+    chunk_size: int
+    source_id: str
+    storage_key: str
+    upload_id: str
+    replace: bool
+    user_id: str | None
+    created_at: str
+    state: str = "open"  # open | finalizing | complete | failed
+    parts: dict[str, str] = field(default_factory=dict)  # chunk index -> ETag
+    error: str | None = None
+
+    @property
+    def total_chunks(self) -> int:
+        return max(1, math.ceil(self.size / self.chunk_size))
+
+    def chunk_length(self, index: int) -> int:
+        """Expected byte length of chunk ``index``."""
+        if index == self.total_chunks - 1:
+            return self.size - index * self.chunk_size
+        return self.chunk_size
+
+    def missing_chunks(self) -> list[int]:
+        return [i for i in range(self.total_chunks) if str(i) not in self.parts]
+
+    def received_ranges(self) -> list[list[int]]:
+        """Received bytes as merged ``[start, end)`` ranges."""
+        ranges: list[list[int]] = []
+        for index in sorted(int(i) for i in self.parts):
+            start = index * self.chunk_size
+            end = start + self.chunk_length(index)
+            if ranges and ranges[-1][1] == start:
+                ranges[-1][1] = end
+            else:
+                ranges.append([start, end])
+        return ranges
+
+    def to_dict(self) -> dict:
+        return {
+            "session_id": self.id,
+            "filename": self.filename,
+            "size": self.size,
+            "chunk_size": self.chunk_size,
+            "total_chunks": self.total_chunks,
+            "received_ranges": self.received_ranges(),
+            "received_bytes": sum(end - start for start, end in self.received_ranges()),
+            "missing_chunks": self.missing_chunks(),
+            "state": self.state,
+            "source_id": self.source_id if self.state == "complete" else None,
+            "error": self.error,
+            "created_at": self.created_at,
+            "expires_at": (datetime.fromisoformat(self.created_at) + _session_ttl()).isoformat(),
+        }
+
+
+def _key(session_id: str) -> str:
+    return f"upload_sessions/{session_id}.json"
+
+
+def _lock_for(session_id: str) -> threading.Lock:
+    with _locks_guard:
+        return _locks.setdefault(session_id, threading.Lock())
+
+
+def _save(session: UploadSession) -> None:
+    _storage.write_text(_key(session.id), json.dumps(asdict(session)))
+
+
+def _env_float(name: str, default: float) -> float:
+    raw = os.environ.get(name, "").strip()
+    try:
+        return float(raw) if raw else default
+    except ValueError:
+        return default
+
+
+def max_session_bytes() -> int:
+    """Read UPLOAD_SESSION_MAX_MB (default 10240) as bytes."""
+    return int(max(1.0, _env_float("UPLOAD_SESSION_MAX_MB", 10240.0)) * 1024 * 1024)
+
+
+def _chunk_bytes(size: int) -> int:
+    chunk = max(_MIN_CHUNK_BYTES, int(_env_float("UPLOAD_CHUNK_MB", 8.0) * 1024 * 1024))
+    # Grow the chunk for very large files so the part count stays under S3's limit
+    return max(chunk, math.ceil(size / _MAX_PARTS))
+
+
+def _session_ttl() -> timedelta:
+    return timedelta(hours=max(0.1, _env_float("UPLOAD_SESSION_TTL_HOURS", 24.0)))
+
+
+# ── Public API ───────────────────────────────────────────────────────────────
+
+def create_session(
+    filename: str,
+    size: int,
+    *,
+    source_id: str | None = None,
+    replace: bool = False,
+    user_id: str | None = None,
+) -> UploadSession:
+    """Start a resumable upload of ``size`` bytes for ``filename``.
+
+    Pass an existing ``source_id`` with ``replace=True`` to overwrite that
+    source when the upload completes.
+    """
+    purge_expired()
+    source_id = source_id or uuid.uuid4().hex[:12]
+    safe_filename = Path(filename).name or "upload.csv"
+    storage_key = f"uploads/{source_id}/{safe_filename}"
+    session = UploadSession(
+        id=uuid.uuid4().hex[:16],
+        filename=filename,
+        size=size,
+        chunk_size=_chunk_bytes(size),
+        source_id=source_id,
+        storage_key=storage_key,
+        upload_id=_storage.create_multipart(storage_key),
+        replace=replace,
+        user_id=user_id,
+        created_at=datetime.now(timezone.utc).isoformat(),
+    )
+    _save(session)
+    return session
+
+
+def load_session(session_id: str) -> UploadSession | None:
+    """Load a session by id. Returns None if not found or the id is unsafe."""
+    if not _SAFE_ID_RE.match(session_id):
+        return None
+    try:
+        data = json.loads(_storage.read_text(_key(session_id)))
+    except FileNotFoundError:
+        return None
+    except (json.JSONDecodeError, TypeError):
+        logger.warning("Corrupt upload session %s", session_id)
+        return None
+    return UploadSession(**data)
+
+
+def write_chunk(session: UploadSession, index: int, data: bytes) -> UploadSession:
+    """Store chunk ``index`` of an open session and record it; returns the updated session.
+
+    Raises ValueError if the chunk index or length is wrong, or the session
+    is no longer accepting chunks. Re-sending a chunk overwrites it.
+    """
+    if not 0 <= index < session.total_chunks:
+        raise ValueError(f"Chunk index must be between 0 and {session.total_chunks - 1}")
+    expected = session.chunk_length(index)
+    if len(data) != expected:
+        raise ValueError(f"Chunk {index} must be exactly {expected} bytes (got {len(data)})")
+    if session.state != "open":
+        raise ValueError(f"Upload session is {session.state}")
+
+    etag = _storage.upload_part(
+        session.storage_key, session.upload_id, index + 1, index * session.chunk_size, data,
+    )
+    with _lock_for(session.id):
+        current = load_session(session.id)
+        if current is None or current.state != "open":
+            raise ValueError("Upload session is no longer open")
+        current.parts[str(index)] = etag
+        _save(current)
+    return current
+
+
+def begin_finalize(session_id: str) -> UploadSession:
+    """Mark a fully received session as finalizing and assemble it in storage.
+
+    Raises ValueError if chunks are missing or the session is not open.
+    """
+    with _lock_for(session_id):
+        session = load_session(session_id)
+        if session is None:
+            raise FileNotFoundError(f"Upload session not found: {session_id}")
+        if session.state != "open":
+            raise ValueError(f"Upload session is {session.state}")
+        missing = session.missing_chunks()
+        if missing:
+            raise ValueError(f"{len(missing)} chunk(s) not received yet, starting with chunk {missing[0]}")
+        session.state = "finalizing"
+        _save(session)
+
+    try:
+        _storage.complete_multipart(
+            session.storage_key,
+            session.upload_id,
+            [(int(index) + 1, etag) for index, etag in session.parts.items()],
+        )
+    except Exception as e:
+        finish_session(session, error=f"Could not assemble upload: {e}")
+        raise
+    return session
+
+
+def finish_session(session: UploadSession, *, error: str | None = None) -> None:
+    """Record the outcome of finalizing a session."""
+    with _lock_for(session.id):
+        session.state = "failed" if error else "complete"
+        session.error = error
+        _save(session)
+
+
+def abort_session(session: UploadSession) -> None:
+    """Discard a session and any chunks it has received."""
+    if session.state == "open":
+        try:
+            _storage.abort_multipart(session.storage_key, session.upload_id)
+        except Exception:
+            logger.warning("Could not abort multipart upload for session %s", session.id)
+    try:
+        _storage.delete(_key(session.id))
+    except FileNotFoundError:
+        pass
+    with _locks_guard:
+        _locks.pop(session.id, None)
+
+
+def purge_expired() -> int:
+    """Abort sessions older than the TTL. Returns how many were removed."""
+    cutoff = datetime.now(timezone.utc) - _session_ttl()
+    removed = 0
+    for key in _storage.list("upload_sessions"):
+        session_id = Path(key).stem
+        session = load_session(session_id)
+        if session is None or session.state == "finalizing":
+            continue
+        if datetime.fromisoformat(session.created_at) < cutoff:
+            abort_session(session)
+            removed += 1
+    return removed
@@ -68,6 +68,11 @@ class Config:
         """Get the React frontend URL."""
         return self._config.get("app", {}).get("frontend_url", "http://localhost:3001")
 
+    @property
+    def duckdb_settings(self) -> dict[str, Any]:
+        """Get DuckDB resource settings (memory_limit, threads, temp_directory, ...)."""
+        return self._config.get("duckdb", {}) or {}
+
     def get_snowflake_config(self) -> dict[str, Any]:
         """Load and return the Snowflake connection configuration.
 